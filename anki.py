@@ -0,0 +1,358 @@
+"""Anki ``.apkg`` import and export for verse decks.
+
+An ``.apkg`` is a zip holding one SQLite collection (``collection.anki2``
+or ``.anki21``; Anki 2.1.50+ may write a zstd-compressed ``.anki21b``,
+read when the optional ``zstandard`` package is installed). Both
+directions stream:
+
+* import copies the collection out of the zip in chunks to a temp file,
+  then walks ``notes`` with a cursor and writes CSV rows as it goes
+* export reads the deck CSV row by row into a temp collection, then
+  streams that file into the zip
+
+so converting a shared deck of a few hundred MB needs memory for one row
+plus SQLite's page cache, not for the collection.
+
+Note fields are mapped by name (``location``/``verse_krv``/``verse_niv``
+or common aliases such as ``Reference``, ``개역개정``, ``NIV``); note types
+without recognised names use their first field as the location and the
+second as the Korean text. Export writes one "B-Anki Verse" note type
+(two cards: location → verse and verse → location) and turns the study
+session's results into review-log entries (score ≥ 80 Good, ≥ 50 Hard,
+otherwise Again).
+
+    python anki.py import shared.apkg -o data/shared.csv
+    python anki.py export "data/kpccw 2026 성경암송.csv" -o kpccw.apkg
+"""
+import argparse
+import csv
+import hashlib
+import html
+import importlib.util
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import zipfile
+
+from verse_search import DECK_COLUMNS
+
+COPY_CHUNK_BYTES = 1 << 20
+INSERT_BATCH = 1000
+COLLECTION_MEMBERS = ("collection.anki21b", "collection.anki21", "collection.anki2")
+FIELD_ALIASES = {
+    "location": {"location", "reference", "ref", "장절", "위치", "front", "앞면"},
+    "verse_krv": {"verse_krv", "krv", "개역개정", "korean", "한글", "back", "뒷면"},
+    "verse_niv": {"verse_niv", "niv", "english", "영어"},
+}
+MODEL_NAME = "B-Anki Verse"
+
+_TAG = re.compile(r"<[^>]+>")
+_BREAK = re.compile(r"<br\s*/?>|</div>|</p>", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+_SCHEMA = """
+CREATE TABLE col (id integer primary key, crt integer not null, mod integer not null,
+    scm integer not null, ver integer not null, dty integer not null, usn integer not null,
+    ls integer not null, conf text not null, models text not null, decks text not null,
+    dconf text not null, tags text not null);
+CREATE TABLE notes (id integer primary key, guid text not null, mid integer not null,
+    mod integer not null, usn integer not null, tags text not null, flds text not null,
+    sfld integer not null, csum integer not null, flags integer not null, data text not null);
+CREATE TABLE cards (id integer primary key, nid integer not null, did integer not null,
+    ord integer not null, mod integer not null, usn integer not null, type integer not null,
+    queue integer not null, due integer not null, ivl integer not null, factor integer not null,
+    reps integer not null, lapses integer not null, left integer not null, odue integer not null,
+    odid integer not null, flags integer not null, data text not null);
+CREATE TABLE revlog (id integer primary key, cid integer not null, usn integer not null,
+    ease integer not null, ivl integer not null, lastIvl integer not null, factor integer not null,
+    time integer not null, type integer not null);
+CREATE TABLE graves (usn integer not null, oid integer not null, type integer not null);
+"""
+
+# Built after the bulk insert, which is faster than maintaining them row by row.
+_INDEXES = """
+CREATE INDEX ix_notes_usn on notes (usn);
+CREATE INDEX ix_cards_usn on cards (usn);
+CREATE INDEX ix_revlog_usn on revlog (usn);
+CREATE INDEX ix_cards_nid on cards (nid);
+CREATE INDEX ix_cards_sched on cards (did, queue, due);
+CREATE INDEX ix_revlog_cid on revlog (cid);
+CREATE INDEX ix_notes_csum on notes (csum);
+"""
+
+
+def zstd_available() -> bool:
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def strip_field(text: str) -> str:
+    """Anki field HTML to plain deck text."""
+    if "<" not in text and "&" not in text:
+        return _SPACES.sub(" ", text).strip()
+    text = _TAG.sub("", _BREAK.sub(" ", text))
+    return _SPACES.sub(" ", html.unescape(text)).strip()
+
+
+def _collection_member(archive: zipfile.ZipFile) -> str:
+    names = set(archive.namelist())
+    # Anki 2.1.50+ also writes a legacy collection.anki2 holding only an
+    # "update Anki" note, so never fall back to it when the real one is there.
+    if "collection.anki21b" in names and not zstd_available():
+        raise ValueError("새 형식(.anki21b) 덱입니다. zstandard 패키지를 설치하거나 "
+                         "Anki에서 '이전 버전 호환'으로 다시 내보내세요.")
+    for member in COLLECTION_MEMBERS:
+        if member in names:
+            return member
+    raise ValueError("Anki 컬렉션이 들어 있지 않은 파일입니다.")
+
+
+def _extract_collection(source, directory: str) -> str:
+    """Copy the collection out of the ``.apkg`` in chunks; returns its path."""
+    path = os.path.join(directory, "collection.sqlite")
+    with zipfile.ZipFile(source) as archive:
+        member = _collection_member(archive)
+        with archive.open(member) as src, open(path, "wb") as dst:
+            if member.endswith("b"):
+                import zstandard
+
+                with zstandard.ZstdDecompressor().stream_reader(src) as reader:
+                    shutil.copyfileobj(reader, dst, COPY_CHUNK_BYTES)
+            else:
+                shutil.copyfileobj(src, dst, COPY_CHUNK_BYTES)
+    return path
+
+
+def _field_names(conn: sqlite3.Connection) -> dict[int, list[str]]:
+    """Field names per note type id, from either collection schema."""
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    names: dict[int, list[str]] = {}
+    if "fields" in tables:
+        for ntid, _, name in conn.execute("SELECT ntid, ord, name FROM fields ORDER BY ntid, ord"):
+            names.setdefault(ntid, []).append(name)
+    else:
+        (models,) = conn.execute("SELECT models FROM col").fetchone()
+        for mid, model in json.loads(models).items():
+            names[int(mid)] = [field["name"] for field in sorted(model["flds"], key=lambda f: f["ord"])]
+    return names
+
+
+def _column_map(fields: list[str]) -> dict[str, int]:
+    """Deck column -> field position for one note type."""
+    mapping = {}
+    for column, aliases in FIELD_ALIASES.items():
+        for i, name in enumerate(fields):
+            if name.strip().lower() in aliases and i not in mapping.values():
+                mapping[column] = i
+                break
+    if "location" not in mapping:
+        mapping = {"location": 0}
+        if len(fields) > 1:
+            mapping["verse_krv"] = 1
+    return mapping
+
+
+def iter_apkg_rows(source):
+    """Yield ``(location, verse_krv, verse_niv)`` per note of an ``.apkg``.
+
+    ``source`` is a path or a binary file object.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        conn = sqlite3.connect(_extract_collection(source, directory))
+        try:
+            maps = {mid: _column_map(fields) for mid, fields in _field_names(conn).items()}
+            for mid, flds in conn.execute("SELECT mid, flds FROM notes ORDER BY id"):
+                values = flds.split("\x1f")
+                mapping = maps.get(mid) or _column_map(values)
+                row = tuple(strip_field(values[mapping[column]])
+                            if column in mapping and mapping[column] < len(values) else ""
+                            for column in DECK_COLUMNS)
+                if row[0]:
+                    yield row
+        finally:
+            conn.close()
+
+
+def import_apkg(source, csv_path: str) -> int:
+    """Convert an ``.apkg`` to a deck CSV at ``csv_path``; returns the note count."""
+    os.makedirs(os.path.dirname(os.path.abspath(csv_path)), exist_ok=True)
+    tmp_path = f"{csv_path}.{os.getpid()}.tmp"
+    count = 0
+    try:
+        with open(tmp_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(DECK_COLUMNS)
+            for row in iter_apkg_rows(source):
+                writer.writerow(row)
+                count += 1
+        os.replace(tmp_path, csv_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return count
+
+
+def iter_deck_rows(csv_path: str):
+    """Yield ``(location, verse_krv, verse_niv)`` from a deck CSV without loading it whole."""
+    for encoding in ("utf-8-sig", "cp949"):
+        rows = 0
+        try:
+            with open(csv_path, encoding=encoding, newline="") as f:
+                reader = csv.reader(f)
+                header = [name.strip() for name in next(reader, [])]
+                if "location" not in header:
+                    raise ValueError("missing columns: location")
+                positions = [header.index(c) if c in header else None for c in DECK_COLUMNS]
+                for record in reader:
+                    if record:
+                        yield tuple(record[i] if i is not None and i < len(record) else "" for i in positions)
+                        rows += 1
+            return
+        except UnicodeDecodeError:
+            if rows:
+                raise
+
+
+def _model(model_id: int, deck_id: int, now: int) -> dict:
+    fields = [{"name": name, "ord": i, "sticky": False, "rtl": False, "font": "Arial",
+               "size": 20, "media": []} for i, name in enumerate(DECK_COLUMNS)]
+    back = "{{FrontSide}}<hr id=answer>"
+    templates = [
+        {"name": "장절 → 구절", "ord": 0, "did": None, "bqfmt": "", "bafmt": "",
+         "qfmt": "{{location}}", "afmt": back + "{{verse_krv}}<br><br>{{verse_niv}}"},
+        {"name": "구절 → 장절", "ord": 1, "did": None, "bqfmt": "", "bafmt": "",
+         "qfmt": "{{verse_krv}}", "afmt": back + "{{location}}"},
+    ]
+    return {"id": model_id, "name": MODEL_NAME, "type": 0, "mod": now, "usn": -1, "sortf": 0,
+            "did": deck_id, "tmpls": templates, "flds": fields, "tags": [], "vers": [],
+            "req": [[0, "any", [0]], [1, "any", [1]]], "latexPre": "", "latexPost": "",
+            "css": ".card { font-size: 22px; text-align: center; }"}
+
+
+def _deck(deck_id: int, name: str, now: int) -> dict:
+    return {"id": deck_id, "name": name, "desc": "", "mod": now, "usn": -1, "dyn": 0, "conf": 1,
+            "collapsed": False, "extendNew": 10, "extendRev": 50, "newToday": [0, 0],
+            "revToday": [0, 0], "lrnToday": [0, 0], "timeToday": [0, 0]}
+
+
+def _ease(result: dict) -> int:
+    """Anki answer button for a B-Anki result (1 Again, 2 Hard, 3 Good)."""
+    if "score" not in result:
+        return 3
+    return 3 if result["score"] >= 80 else 2 if result["score"] >= 50 else 1
+
+
+def _create_collection(path: str, deck_name: str, model_id: int, deck_id: int, now_s: int):
+    conn = sqlite3.connect(path)
+    # A scratch file that is zipped or discarded; no need for a journal.
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executescript(_SCHEMA)
+    default_deck = _deck(1, "Default", now_s)
+    conn.execute(
+        "INSERT INTO col VALUES (1, ?, ?, ?, 11, 0, 0, 0, ?, ?, ?, ?, '{}')",
+        (now_s, now_s * 1000, now_s * 1000,
+         json.dumps({"nextPos": 1, "activeDecks": [deck_id], "curDeck": deck_id}),
+         json.dumps({str(model_id): _model(model_id, deck_id, now_s)}, ensure_ascii=False),
+         json.dumps({"1": default_deck, str(deck_id): _deck(deck_id, deck_name, now_s)}, ensure_ascii=False),
+         json.dumps({"1": {"id": 1, "name": "Default", "mod": 0, "usn": 0, "maxTaken": 60,
+                           "autoplay": True, "timer": 0, "replayq": True, "dyn": False,
+                           "new": {"delays": [1, 10], "ints": [1, 4, 7], "initialFactor": 2500,
+                                   "order": 1, "perDay": 20},
+                           "rev": {"perDay": 200, "ease4": 1.3, "ivlFct": 1, "maxIvl": 36500},
+                           "lapse": {"delays": [10], "mult": 0, "minInt": 1, "leechFails": 8,
+                                     "leechAction": 0}}})),
+    )
+    return conn
+
+
+def export_apkg(rows, out, deck_name: str, results=None) -> int:
+    """Write ``rows`` (location, verse_krv, verse_niv) as an ``.apkg``.
+
+    ``out`` is a path or a binary file object. ``results`` maps row index to
+    a study result and becomes review history. Returns the note count.
+    """
+    results = results or {}
+    now_s = int(time.time())
+    base_id = now_s * 1000
+    model_id, deck_id = base_id, base_id + 1
+    count = 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "collection.anki2")
+        conn = _create_collection(path, deck_name, model_id, deck_id, now_s)
+        notes, cards, revlog = [], [], []
+
+        def flush():
+            conn.executemany("INSERT INTO notes VALUES (?,?,?,?,-1,'',?,?,?,0,'')", notes)
+            conn.executemany("INSERT INTO cards VALUES (?,?,?,?,?,-1,0,0,?,0,0,0,0,0,0,0,0,'')", cards)
+            conn.executemany("INSERT INTO revlog VALUES (?,?,-1,?,0,0,0,0,0)", revlog)
+            notes.clear()
+            cards.clear()
+            revlog.clear()
+
+        for i, row in enumerate(rows):
+            note_id = base_id + i
+            location = row[0]
+            # Same location in the same deck → same guid, so re-imports update notes.
+            guid = hashlib.sha1(f"{deck_name}\x1f{location}".encode("utf-8")).hexdigest()[:16]
+            csum = int(hashlib.sha1(location.encode("utf-8")).hexdigest()[:8], 16)
+            notes.append((note_id, guid, model_id, now_s, "\x1f".join(row), location, csum))
+            for ord_ in (0, 1):
+                cards.append((note_id * 2 + ord_, note_id, deck_id, ord_, now_s, i + 1))
+            if i in results:
+                revlog.append((note_id, note_id * 2, _ease(results[i])))
+            count += 1
+            if len(notes) >= INSERT_BATCH:
+                flush()
+        flush()
+        conn.executescript(_INDEXES)
+        conn.commit()
+        conn.close()
+
+        with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.write(path, "collection.anki2")
+            archive.writestr("media", "{}")
+    return count
+
+
+def export_deck_bytes(csv_path: str, deck_name: str, results=()) -> bytes:
+    """The deck CSV at ``csv_path`` as ``.apkg`` bytes (a picklable job for the app)."""
+    import io
+
+    buf = io.BytesIO()
+    export_apkg(iter_deck_rows(csv_path), buf, deck_name, dict(results))
+    return buf.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert between Anki .apkg files and verse CSV decks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help=".apkg -> deck CSV")
+    imp.add_argument("apkg")
+    imp.add_argument("-o", "--output", help="CSV path (default: data/<name>.csv)")
+    exp = sub.add_parser("export", help="deck CSV -> .apkg")
+    exp.add_argument("deck")
+    exp.add_argument("-o", "--output", help=".apkg path (default: <name>.apkg)")
+    exp.add_argument("--name", help="Anki deck name (default: CSV file name)")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        from storage import DATA_DIR
+
+        name = os.path.splitext(os.path.basename(args.apkg))[0]
+        output = args.output or os.path.join(DATA_DIR, f"{name}.csv")
+        count = import_apkg(args.apkg, output)
+    else:
+        name = args.name or os.path.splitext(os.path.basename(args.deck))[0]
+        output = args.output or f"{name}.apkg"
+        count = export_apkg(iter_deck_rows(args.deck), output, name)
+    print(output)
+    print(f"{count} notes converted", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,43 @@
+from __future__ import annotations
+
 import streamlit as st
-import streamlit.components.v1 as components
-import pandas as pd
-import random
 import os
 import time
+import functools
+import json
+import pickle
+import re
+import sqlite3
+import zipfile
+from concurrent.futures import CancelledError
+from typing import TYPE_CHECKING
+
+from anki import export_deck_bytes, import_apkg
+from certificate import (CERT_FORMATS, CERT_MIME_TYPES, certificate_cache_path, certificates_available,
+                         render_certificate_files)
+from jobs import JobExecutor, JobQueueFull, job_id
+from leaderboard import Leaderboard
+from loaders import (ORDERING_REQUIRED_COLUMNS, VERSE_REQUIRED_COLUMNS, VerseDeck, decode_csv_bytes,
+                     load_ordering_words, ordering_words, read_csv_columns, read_csv_file, read_csv_header)
+from ordering_engine import OrderingGame
+from precompile import artifact_file, quiz_table_path
+from rooms import NicknameTaken, Room, RoomRegistry
+from scoring import compute_word_match
+from shared_store import STORE_PATH, open_shared_store
+from speech import STT_LANGUAGES, Transcriber, TranscriberBusy, stt_available
+from storage import atomic_write
+from study_session import ORDER_CODE_DIGITS, StudySession, StudySessionStore
+from tts import TTS_RATES, TTS_VOICES, synthesize_file, tts_available, tts_cache_path
+from verse_ids import DeckIdRegistry, deck_ids
+from verse_search import VerseIndex, build_verse_index, corpus_files, export_deck_csv
+
+if TYPE_CHECKING:
+    # NumPy-backed; imported when a quiz or the word statistics first need them.
+    from reference_quiz import ReferenceQuiz
+    from word_stats import WordErrorStats, WordStatsRegistry
+
+# The Streamlit components module is imported on first use, so the theme
+# selection page renders without loading it.
 
 BIBLE_VERSIONS = {
     "개역개정": "verse_krv",
@@ -11,15 +45,68 @@ BIBLE_VERSIONS = {
 }
 
 DEFAULT_FILE = "kpccw 2026 성경암송.csv"
+LEADERBOARD_TTL = 10
+ROOM_REFRESH_SECONDS = 1.0
+TRANSCRIBE_POLL_SECONDS = 0.5
+JOB_POLL_SECONDS = 0.5
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 DEFAULT_FONT_SIZE = 28
 MIN_FONT_SIZE = 16
 MAX_FONT_SIZE = 60
 FONT_STEP = 4
+CLIENT_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "client_store")
+_client_store_component = None
+
+
+@st.cache_resource
+def get_shared_store():
+    """Map the shared read-only store once per worker process (None if not built).
+
+    ``serve.py`` passes its store in ``BANKI_SHARED_STORE``; a single process
+    maps the one ``precompile.py`` built for the current data, if any.
+    """
+    path = None if "BANKI_SHARED_STORE" in os.environ else artifact_file("store.bin")
+    return open_shared_store(path or STORE_PATH)
+
+
+@st.cache_resource(max_entries=64)
+def _load_verse_header(file_path: str, mtime: float) -> tuple[str, ...]:
+    return read_csv_header(file_path, VERSE_REQUIRED_COLUMNS)
+
+
+@st.cache_resource(max_entries=256)
+def _load_verse_column(file_path: str, mtime: float, column: str) -> tuple[str, ...]:
+    """Parse one deck column once per (path, mtime); every session shares it.
+
+    Columns are cached separately so a version nobody selected is never held.
+    """
+    return read_csv_file(file_path, usecols=(column,))[column]
+
+
+def _store_deck_columns(file_path: str):
+    store = get_shared_store()
+    if store is not None and store.is_current(file_path):
+        return store.deck_columns(os.path.basename(file_path))
+    return None
 
 
-def load_csv(file_path: str) -> pd.DataFrame:
-    return pd.read_csv(file_path)
+def deck_header(file_path: str) -> tuple[str, ...]:
+    """Column names of a deck; raises ValueError without a 'location' column."""
+    columns = _store_deck_columns(file_path)
+    if columns is not None:
+        return tuple(columns)
+    return _load_verse_header(file_path, os.path.getmtime(file_path))
+
+
+def load_csv(file_path: str, versions=None) -> VerseDeck:
+    """Load a deck projected to 'location' plus ``versions`` (all columns if None)."""
+    columns = _store_deck_columns(file_path)
+    if columns is not None:
+        deck = VerseDeck(columns)
+        return deck if versions is None else deck.project(("location", *versions))
+    mtime = os.path.getmtime(file_path)
+    names = _load_verse_header(file_path, mtime) if versions is None else ("location", *versions)
+    return VerseDeck({name: _load_verse_column(file_path, mtime, name) for name in names})
 
 
 def get_available_files() -> list[str]:
@@ -32,107 +119,157 @@ def get_available_files() -> list[str]:
     return files
 
 
-def init_session_state(df: pd.DataFrame, shuffle: bool):
-    indices = list(range(len(df)))
-    if shuffle:
-        random.shuffle(indices)
-    st.session_state.order = indices
-    st.session_state.current_idx = 0
-    st.session_state.show_verse = False
-    st.session_state.completed = set()
-    st.session_state.skipped = set()
-    st.session_state.started = True
-    st.session_state.history = []
-    st.session_state.mode_results = {}
-    st.session_state.dictation_submitted = False
-    st.session_state.dictation_input = ""
-    st.session_state.all_done = False
-    st.session_state.hint_word = None
-    st.session_state.learn_phase = "reading"
+@st.cache_resource
+def get_deck_id_registry() -> DeckIdRegistry:
+    return DeckIdRegistry()
 
 
-def inject_font_persistence_js():
-    """Inject JS to persist font size in localStorage and load on startup."""
-    st.markdown("""
-    <script>
-    (function() {
-        const saved = localStorage.getItem('banki_font_size');
-        if (saved) {
-            const event = new CustomEvent('banki_font_loaded', {detail: saved});
-            window.dispatchEvent(event);
-        }
-    })();
-    function saveBankiFont(size) {
-        localStorage.setItem('banki_font_size', size);
-    }
-    </script>
-    """, unsafe_allow_html=True)
+@st.cache_resource(max_entries=64)
+def _deck_identity(file_path: str, mtime: float, versions: tuple) -> tuple[str, tuple[str, ...]]:
+    """Verse IDs and deck version of one deck file version (saved for later remaps).
 
+    IDs hash only the ``versions`` in use, so an edit to another language's
+    text does not reset progress or word counts kept for these.
+    """
+    ids = deck_ids(load_csv(file_path, versions))
+    return get_deck_id_registry().register(ids), ids
 
-def get_font_size():
-    if "font_size" not in st.session_state:
-        st.session_state.font_size = DEFAULT_FONT_SIZE
-    return st.session_state.font_size
 
+def deck_identity(file_name: str, versions: tuple) -> tuple[str, tuple[str, ...]]:
+    file_path = os.path.join(DATA_DIR, file_name)
+    return _deck_identity(file_path, os.path.getmtime(file_path), tuple(versions))
 
-def compute_word_match(user_text: str, answer_text: str) -> dict:
-    """Compare user input with answer text word by word, ignoring spaces."""
-    def normalize(text):
-        return text.replace(" ", "").replace("\u3000", "")
 
-    def split_words(text):
-        return [w for w in text.split() if w]
+def sync_study_deck(study: StudySession) -> bool:
+    """Move ``study`` onto the current version of its deck file; True if it moved."""
+    try:
+        version, ids = deck_identity(study.file_name, study.verse_cols)
+    except (OSError, ValueError):
+        return False
+    if study.deck_version == version:
+        return False
+    mapping = get_deck_id_registry().mapping(study.deck_version, ids) if study.deck_version else None
+    if mapping is None:
+        # Version never recorded: positions are only trusted if the size still matches.
+        mapping = list(range(len(ids))) if study.size == len(ids) else []
+    study.remap(mapping, len(ids), version)
+    return True
 
-    answer_words = split_words(answer_text)
-    user_words = split_words(user_text)
 
-    user_joined = normalize(user_text)
-    answer_joined = normalize(answer_text)
+@st.cache_resource
+def get_study_store() -> StudySessionStore:
+    """Study sessions of this process; idle ones are spilled to disk."""
+    store = StudySessionStore()
+    store.start_evictor()
+    return store
 
-    if not answer_words:
-        return {"score": 100, "total_words": 0, "matched_words": 0,
-                "answer_words": [], "user_words": [], "word_results": []}
 
-    matched = 0
-    word_results = []
+@st.cache_resource
+def get_word_stats_registry() -> WordStatsRegistry:
+    """Per-word error counts of every deck version; flushed to disk in the background."""
+    from word_stats import WordStatsRegistry
 
-    for i, aw in enumerate(answer_words):
-        if i < len(user_words):
-            uw = user_words[i]
-            aw_norm = normalize(aw)
-            uw_norm = normalize(uw)
-            is_match = aw_norm == uw_norm
-            if is_match:
-                matched += 1
-            word_results.append({
-                "answer": aw,
-                "user": uw,
-                "match": is_match
-            })
-        else:
-            word_results.append({
-                "answer": aw,
-                "user": "",
-                "match": False
-            })
-
-    for i in range(len(answer_words), len(user_words)):
-        word_results.append({
-            "answer": "",
-            "user": user_words[i],
-            "match": False
-        })
-
-    score = round((matched / len(answer_words)) * 100) if answer_words else 0
-
-    return {
-        "score": score,
-        "total_words": len(answer_words),
-        "matched_words": matched,
-        "answer_words": answer_words,
-        "user_words": user_words,
-        "word_results": word_results,
-    }
+    registry = WordStatsRegistry()
+    registry.start_flusher()
+    return registry
+
+
+def get_word_stats(file_name: str, column: str) -> WordErrorStats:
+    file_path = os.path.join(DATA_DIR, file_name)
+    texts = load_csv(file_path, (column,)).column(column)
+    _, ids = deck_identity(file_name, (column,))
+    return get_word_stats_registry().get(f"{file_name}/{column}", texts, ids)
+
+
+def record_word_errors(card: int, verse_text: str, user_input: str):
+    """Add a dictation attempt to the shared per-word error counts."""
+    stats = get_word_stats(current_study().file_name, st.session_state.verse_col)
+    stats.record(card, compute_word_match(user_input, verse_text))
+
+
+def hint_word(card: int) -> str:
+    """Hint for ``card``, favouring the words learners most often get wrong."""
+    return get_word_stats(current_study().file_name, st.session_state.verse_col).hint_word(card)
+
+
+def current_study() -> StudySession | None:
+    """This tab's study session, resumed from the ?s= link or a spilled snapshot."""
+    token = st.session_state.get("study_token") or st.query_params.get("s")
+    study = get_study_store().get(token)
+    if study is None:
+        return None
+    if st.session_state.get("study_token") != token:
+        st.session_state.study_token = token
+        st.session_state.verse_col = study.verse_cols[0]
+        init_session_state()
+    if sync_study_deck(study):
+        init_session_state()
+        st.toast("덱이 수정되어 진행 상황을 새 덱에 맞췄습니다.")
+    return study
+
+
+def end_study():
+    """Drop this tab's study session and every session key but the browser prefs."""
+    get_study_store().discard(st.session_state.get("study_token"))
+    st.query_params.pop("s", None)
+    for key in list(st.session_state.keys()):
+        if key != "client_prefs":
+            del st.session_state[key]
+    st.session_state.client_progress_clear = True
+
+
+_CARD_WIDGET_KEY = re.compile(r"^(?:dictation|learn_typing|recite_audio)_(\d+)$")
+
+
+def clear_card_widgets(card: int):
+    """Forget text/audio widgets of cards other than ``card``."""
+    for key in list(st.session_state.keys()):
+        match = _CARD_WIDGET_KEY.match(key)
+        if match and int(match.group(1)) != card:
+            del st.session_state[key]
+
+
+def init_session_state():
+    """Reset the per-card UI flags (progress itself lives in the StudySession)."""
+    st.session_state.show_verse = False
+    st.session_state.dictation_submitted = False
+    st.session_state.dictation_input = ""
+    st.session_state.hint_word = None
+    st.session_state.learn_phase = "reading"
+    st.session_state.quiz_choice = None
+
+
+def render_verse(verse_text: str):
+    """Show the card's verse; with several versions selected, side by side."""
+    versions = st.session_state.get("card_versions") or {}
+    if len(versions) < 2:
+        html = f'<div class="verse-text">{verse_text}</div>'
+    else:
+        html = '<div class="verse-parallel">' + "".join(
+            f'<div><div class="verse-version">{label}</div><div class="verse-text">{text}</div></div>'
+            for label, text in versions.items()
+        ) + "</div>"
+    st.markdown(html, unsafe_allow_html=True)
+
+
+def render_match_score(result: dict):
+    """Render the score and word-by-word comparison of a compute_word_match result."""
+    score = result["score"]
+    score_class = "score-good" if score >= 80 else "score-ok" if score >= 50 else "score-bad"
+
+    st.markdown(
+        f'<div class="{score_class} score-display">{score}%</div>',
+        unsafe_allow_html=True
+    )
+    st.markdown(
+        f"**{result['matched_words']}** / {result['total_words']} 단어 일치",
+    )
+
+    comparison_html = render_word_comparison(result)
+    st.markdown(
+        f'<div class="dictation-result">{comparison_html}</div>',
+        unsafe_allow_html=True
+    )
 
 
 def render_word_comparison(result: dict):
@@ -159,7 +296,96 @@ def render_word_comparison(result: dict):
     return " ".join(html_parts)
 
 
-def render_certificate(name: str, results: dict, total: int, df: pd.DataFrame, verse_col: str):
+@st.cache_resource
+def get_job_executor() -> JobExecutor:
+    """One bounded background executor per process, shared by every session."""
+    return JobExecutor()
+
+
+def run_in_background(fn, *args, message: str, process: bool = False, cancellable: bool = False):
+    """Result of ``fn(*args)`` computed on the shared job executor, or None while it runs.
+
+    Identical work requested by other sessions shares one job. While it is
+    queued or running, a polling fragment shows ``message`` (with a cancel
+    button when ``cancellable``) and reruns the app once it finishes.
+    Raises ``JobQueueFull``, ``CancelledError`` or the job's own exception.
+    """
+    executor = get_job_executor()
+    key = job_id(fn, *args)
+    if key in st.session_state.setdefault("cancelled_jobs", set()):
+        raise CancelledError
+    executor.submit(fn, *args, process=process)
+    if not executor.done(key):
+        render_job_wait(key, message, cancellable)
+        return None
+    return executor.result(key)
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_job_wait(key: str, message: str, cancellable: bool):
+    """작업이 끝날 때까지 이 조각만 다시 실행하며 기다림"""
+    executor = get_job_executor()
+    if executor.done(key):
+        st.rerun(scope="app")
+    if not cancellable:
+        st.caption(message)
+        return
+    col_message, col_cancel = st.columns([4, 1])
+    col_message.caption(message)
+    if col_cancel.button("취소", key=f"cancel_job_{key}", use_container_width=True):
+        # A job that already started still finishes (and fills the cache);
+        # only this session stops waiting for it.
+        executor.cancel(key)
+        st.session_state.cancelled_jobs.add(key)
+        st.rerun(scope="app")
+
+
+def render_certificate_downloads(name: str, deck: str, score: str, details: tuple = (),
+                                 title: str = "수 료 증", key: str = "cert"):
+    """Offer the certificate as PNG/PDF downloads served from the file cache.
+
+    Files already in the cache are served directly. Missing ones are drawn
+    in the job executor's process pool, and the buttons appear when they
+    are ready.
+    """
+    if not certificates_available():
+        return
+    details = tuple(details)
+    paths = {fmt: certificate_cache_path(name, deck, score, details, fmt, title) for fmt in CERT_FORMATS}
+    if not all(os.path.exists(path) for path in paths.values()):
+        try:
+            paths = run_in_background(render_certificate_files, name, deck, score, details, title,
+                                      message="📜 수료증 파일을 만드는 중...", process=True)
+        except JobQueueFull:
+            st.caption("📜 수료증을 만드는 사람이 많습니다. 잠시 후 새로 고침해 주세요.")
+            return
+        except (ImportError, CancelledError):
+            return
+        except Exception as exc:
+            # A failed job is submitted again on the next rerun.
+            st.error(f"수료증을 만들지 못했습니다: {exc}")
+            if st.button("🔄 다시 시도", key=f"{key}_retry"):
+                st.rerun()
+            return
+        if paths is None:
+            return
+
+    cols = st.columns(len(paths))
+    for col, (fmt, path) in zip(cols, paths.items()):
+        with col:
+            with open(path, "rb") as f:
+                st.download_button(
+                    f"📥 {fmt.upper()} 저장",
+                    f.read(),
+                    file_name=f"{title.replace(' ', '')}_{name}.{fmt}",
+                    mime=CERT_MIME_TYPES[fmt],
+                    use_container_width=True,
+                    key=f"{key}_{fmt}",
+                )
+
+
+def render_certificate(name: str, results: dict, total: int, deck: VerseDeck, verse_col: str,
+                       deck_name: str = ""):
     """Render a completion certificate."""
     completed_count = len([r for r in results.values() if results])
     avg_score = 0
@@ -232,29 +458,35 @@ def render_certificate(name: str, results: dict, total: int, df: pd.DataFrame, v
     )
     st.markdown(html, unsafe_allow_html=True)
 
+    score_line = f"평균 정확도 {avg_score}% (등급 {grade})" if has_dictation else "완료"
+    render_certificate_downloads(
+        name_display, deck_name, score_line,
+        (f"성경 암송 {total}구절", time.strftime("%Y-%m-%d")),
+    )
+
     if has_dictation:
         with st.expander("구절별 상세 결과 보기"):
             for idx_key, res in results.items():
                 if "score" in res:
-                    row = df.iloc[idx_key]
+                    row = deck.row(idx_key)
                     icon = "✅" if res["score"] >= 80 else "⚠️" if res["score"] >= 50 else "❌"
                     st.markdown(f"{icon} **{row['location']}** — {res['score']}%")
 
 
 def inject_styles():
     """Inject all CSS styles."""
-    font_size = get_font_size()
+    font_size = DEFAULT_FONT_SIZE
     st.markdown(f"""
     <style>
         .verse-location {{
-            font-size: {max(font_size - 4, 14)}px;
+            font-size: max(14px, calc(var(--banki-font-size, {font_size}px) - 4px));
             font-weight: bold;
             color: #1e3a5f;
             text-align: center;
             margin-bottom: 10px;
         }}
         .verse-text {{
-            font-size: {font_size}px;
+            font-size: var(--banki-font-size, {font_size}px);
             line-height: 1.6;
             text-align: center;
             padding: 20px;
@@ -268,8 +500,27 @@ def inject_styles():
             justify-content: center;
             color: #1e293b;
         }}
+        .verse-parallel {{
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(240px, 1fr));
+            gap: 12px;
+        }}
+        .verse-version {{
+            font-size: 13px;
+            color: #64748b;
+            text-align: center;
+        }}
+        .heat-verse {{
+            line-height: 2;
+            margin-bottom: 12px;
+        }}
+        .heat-word {{
+            padding: 2px 4px;
+            margin-right: 4px;
+            border-radius: 4px;
+        }}
         .verse-hidden {{
-            font-size: {font_size}px;
+            font-size: var(--banki-font-size, {font_size}px);
             text-align: center;
             padding: 40px 20px;
             background: #f1f5f9;
@@ -289,7 +540,7 @@ def inject_styles():
             margin: 8px 0;
         }}
         .dictation-result {{
-            font-size: {max(font_size - 6, 14)}px;
+            font-size: max(14px, calc(var(--banki-font-size, {font_size}px) - 6px));
             line-height: 1.8;
             padding: 15px;
             background: #f8fafc;
@@ -307,7 +558,7 @@ def inject_styles():
         .score-ok {{ color: #f59e0b; }}
         .score-bad {{ color: #ef4444; }}
         .hint-display {{
-            font-size: {font_size}px;
+            font-size: var(--banki-font-size, {font_size}px);
             text-align: center;
             padding: 15px;
             background: #fffbeb;
@@ -328,6 +579,15 @@ def main():
     st.set_page_config(page_title="B-Anki", page_icon="📖", layout="centered")
 
     inject_styles()
+    sync_bgm_player()
+    get_transcriber()
+    on_study_page = st.session_state.get("selected_theme") == "verse" and current_study() is not None
+    if not on_study_page:
+        render_client_store()
+
+    # A ?s= link resumes a study session, even after the tab was closed
+    if st.session_state.get("selected_theme") is None and "s" in st.query_params and current_study():
+        st.session_state.selected_theme = "verse"
 
     # Theme selection
     if st.session_state.get("selected_theme") is None:
@@ -337,20 +597,23 @@ def main():
     # Theme 1: 성경 구절 암기
     if st.session_state.selected_theme == "verse":
         st.title("📖 성경암기")
-        if "setup_done" not in st.session_state:
-            st.session_state.setup_done = False
-        if not st.session_state.setup_done:
+        if current_study() is None:
             render_setup_page()
+            render_deck_builder()
+            render_anki_import()
+            render_word_heatmap()
         else:
             render_main_page()
         return
 
     # Theme 2: 단어 순서 외우기
     if st.session_state.selected_theme == "ordering":
-        if not st.session_state.get("ord_game_started", False):
-            render_ordering_setup()
-        else:
+        if st.session_state.get("ord_game_started", False):
             render_ordering_game()
+        elif st.session_state.get("ord_room_code"):
+            render_room_lobby()
+        else:
+            render_ordering_setup()
         return
 
 
@@ -369,152 +632,336 @@ def render_setup_page():
 
     selected_file = st.selectbox("학습할 파일", files, index=default_idx)
 
-    version_label = st.selectbox("성경 버전", list(BIBLE_VERSIONS.keys()))
+    saved_versions = [label for label in client_pref("versions", []) if label in BIBLE_VERSIONS]
+    version_labels = st.multiselect("성경 버전", list(BIBLE_VERSIONS),
+                                    default=saved_versions or [next(iter(BIBLE_VERSIONS))],
+                                    help="두 개 이상 고르면 나란히 표시합니다")
 
-    app_mode = st.radio("모드 선택", ["학습", "테스트"],
-                        captions=[
-                            "구절을 보고 암기한 후 가려서 확인합니다",
-                            "암기한 구절을 테스트합니다",
-                        ],
-                        horizontal=True)
+    app_modes = {"학습": "구절을 보고 암기한 후 가려서 확인합니다"}
+    if tts_available():
+        app_modes["듣기"] = "구절을 소리로 들으며 암기합니다"
+    app_modes["테스트"] = "암기한 구절을 테스트합니다"
+    app_mode = st.radio("모드 선택", list(app_modes), captions=list(app_modes.values()), horizontal=True)
 
     test_sub_mode = None
     if app_mode == "테스트":
-        test_sub_mode = st.radio("테스트 방식", ["암송", "받아쓰기"],
+        test_sub_mode = st.radio("테스트 방식", ["암송", "받아쓰기", "장절 맞히기"],
                                  captions=[
                                      "구절을 가리고 기억해서 확인합니다",
                                      "직접 타이핑하여 정확도를 확인합니다",
+                                     "구절을 보고 알맞은 장절을 고릅니다",
                                  ],
                                  horizontal=True)
 
-    shuffle = st.toggle("랜덤 순서", value=False)
+    shuffle = st.toggle("랜덤 순서", value=bool(client_pref("shuffle", False)))
+    order_code = ""
+    if shuffle:
+        order_code = st.text_input("순서 코드 (선택사항)", max_chars=ORDER_CODE_DIGITS,
+                                   placeholder="같은 코드를 넣은 사람끼리 같은 순서로 학습합니다")
 
     user_name = st.text_input("이름 (선택사항)", placeholder="이름을 입력하세요")
 
     if st.button("시작하기", type="primary", use_container_width=True):
-        verse_col = BIBLE_VERSIONS[version_label]
-        df = load_csv(os.path.join(DATA_DIR, selected_file))
-        if verse_col not in df.columns:
-            st.error(f"선택한 파일에 '{verse_col}' 열이 없습니다.")
+        if not version_labels:
+            st.error("성경 버전을 하나 이상 선택하세요.")
+            return
+        verse_cols = tuple(col for label, col in BIBLE_VERSIONS.items() if label in version_labels)
+        file_path = os.path.join(DATA_DIR, selected_file)
+        try:
+            header = deck_header(file_path)
+        except ValueError:
+            st.error("선택한 파일에 'location' 열이 없습니다.")
+            return
+        missing = [col for col in verse_cols if col not in header]
+        if missing:
+            st.error(f"선택한 파일에 '{missing[0]}' 열이 없습니다.")
             return
 
-        init_session_state(df, shuffle)
-        st.session_state.setup_done = True
-        st.session_state.loaded_file = selected_file
-        st.session_state.loaded_version = version_label
-        st.session_state.verse_col = verse_col
-        st.session_state.app_mode = app_mode
-        if app_mode == "테스트":
-            st.session_state.mode = test_sub_mode
-        else:
-            st.session_state.mode = "학습"
-        st.session_state.user_name = user_name.strip()
-        st.session_state.shuffle = shuffle
+        if order_code.strip() and not order_code.strip().isdigit():
+            st.error("순서 코드는 숫자로 입력하세요.")
+            return
+        deck_version, ids = deck_identity(selected_file, tuple(verse_cols))
+        study = get_study_store().create(
+            selected_file, verse_cols, app_mode, test_sub_mode if app_mode == "테스트" else app_mode,
+            user_name.strip(), shuffle, len(ids),
+            int(order_code) if order_code.strip() else None, deck_version,
+        )
+        st.session_state.study_token = study.token
+        st.session_state.verse_col = verse_cols[0]
+        st.query_params["s"] = study.token
+        set_client_prefs(versions=version_labels, shuffle=shuffle)
+        init_session_state()
         st.rerun()
 
 
+@st.cache_resource(max_entries=4)
+def _get_verse_index(signature: tuple) -> VerseIndex:
+    """Build the search index once per corpus version; every session shares it.
+
+    The index ``precompile.py`` pickled for this data is loaded instead when present.
+    """
+    path = artifact_file("verse_index.pickle")
+    if path is not None:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    return build_verse_index([file_path for file_path, _ in signature])
+
+
+def get_verse_index() -> VerseIndex:
+    return _get_verse_index(tuple((f, os.path.getmtime(f)) for f in corpus_files()))
+
+
+def valid_deck_name(name: str) -> bool:
+    """A deck name that is safe to save as ``data/<name>.csv``."""
+    return bool(name) and not any(c in name for c in "/\\") and not name.startswith(("bible_books_", "."))
+
+
+def render_deck_builder():
+    """검색해서 고른 구절로 새 덱(CSV)을 만들기"""
+    with st.expander("🛠️ 새 덱 만들기"):
+        picks = st.session_state.setdefault("builder_picks", [])
+        query = st.text_input("구절 검색", key="builder_query",
+                              placeholder="장절 또는 본문 (예: 빌립보서 4, 능력 주시는, strength)")
+        if query.strip():
+            index = get_verse_index()
+            started = time.perf_counter()
+            hits = index.search(query, limit=30)
+            st.caption(f"{len(index)}개 구절에서 {len(hits)}개 찾음 ({(time.perf_counter() - started) * 1000:.1f}ms)")
+            for doc_id in hits:
+                record = index.records[doc_id]
+                location, krv, niv, source = record
+                rcol1, rcol2 = st.columns([6, 1])
+                with rcol1:
+                    st.markdown(f"**{location}** {krv or niv}")
+                    st.caption(source)
+                with rcol2:
+                    if record in picks:
+                        st.button("✓", key=f"builder_add_{doc_id}", disabled=True)
+                    elif st.button("➕", key=f"builder_add_{doc_id}"):
+                        picks.append(record)
+                        st.rerun()
+
+        if not picks:
+            return
+        st.markdown(f"**고른 구절 {len(picks)}개**")
+        for i, (location, krv, niv, _) in enumerate(picks):
+            pcol1, pcol2 = st.columns([6, 1])
+            with pcol1:
+                st.markdown(f"{i + 1}. **{location}** {krv or niv}")
+            with pcol2:
+                if st.button("❌", key=f"builder_remove_{i}"):
+                    picks.pop(i)
+                    st.rerun()
+
+        deck_name = st.text_input("덱 이름", key="builder_name", placeholder="예: 청년부 여름수련회")
+        name = deck_name.strip()
+        data = export_deck_csv(picks)
+        dcol1, dcol2 = st.columns(2)
+        with dcol1:
+            st.download_button("📥 CSV 다운로드", data, file_name=f"{name or 'deck'}.csv",
+                               mime="text/csv", use_container_width=True)
+        with dcol2:
+            if st.button("💾 data/ 폴더에 저장", use_container_width=True, disabled=not name):
+                file_path = os.path.join(DATA_DIR, f"{name}.csv")
+                if not valid_deck_name(name):
+                    st.error("덱 이름에 쓸 수 없는 문자가 있습니다.")
+                elif os.path.exists(file_path):
+                    st.error(f"'{name}.csv' 파일이 이미 있습니다.")
+                else:
+                    atomic_write(file_path, data)
+                    st.session_state.builder_picks = []
+                    st.success(f"'{name}.csv'로 저장했습니다. 학습할 파일 목록에서 고를 수 있습니다.")
+
+
+def render_anki_import():
+    """Anki 덱(.apkg)을 data/ 폴더의 CSV 덱으로 가져오기"""
+    with st.expander("📦 Anki 덱 가져오기 (.apkg)"):
+        uploaded = st.file_uploader("Anki에서 내보낸 .apkg 파일", type=["apkg"], key="anki_upload")
+        if uploaded is None:
+            return
+        name = os.path.splitext(os.path.basename(uploaded.name.replace("\\", "/")))[0].strip()
+        file_path = os.path.join(DATA_DIR, f"{name}.csv")
+        if not valid_deck_name(name):
+            st.error("파일 이름을 바꿔서 다시 올려 주세요.")
+        elif os.path.exists(file_path):
+            st.error(f"'{name}.csv' 파일이 이미 있습니다.")
+        elif st.button("가져오기", type="primary", use_container_width=True):
+            try:
+                with st.spinner("Anki 덱을 변환하는 중..."):
+                    count = import_apkg(uploaded, file_path)
+            except (ValueError, OSError, zipfile.BadZipFile, sqlite3.DatabaseError) as exc:
+                st.error(f"가져오지 못했습니다: {exc}")
+            else:
+                st.success(f"{count}개 구절을 '{name}.csv'로 가져왔습니다. 학습할 파일 목록에서 고를 수 있습니다.")
+
+
+def render_anki_export(study: StudySession):
+    """이 덱과 학습 기록을 Anki 덱(.apkg)으로 내려받기 (누를 때만 백그라운드에서 생성)"""
+    if st.session_state.get("anki_export") != study.token:
+        if st.button("📦 Anki 덱 만들기 (.apkg)", use_container_width=True):
+            st.session_state.anki_export = study.token
+            st.rerun()
+        return
+    deck_name = os.path.splitext(study.file_name)[0]
+    try:
+        data = run_in_background(export_deck_bytes, os.path.join(DATA_DIR, study.file_name), deck_name,
+                                 tuple(sorted(study.mode_results.items())),
+                                 message="📦 Anki 덱을 만드는 중...", process=True)
+    except JobQueueFull:
+        st.caption("📦 내보내기를 기다리는 사람이 많습니다. 잠시 후 새로 고침해 주세요.")
+        return
+    except CancelledError:
+        return
+    except Exception as exc:
+        st.error(f"Anki 덱을 만들지 못했습니다: {exc}")
+        return
+    if data is not None:
+        st.download_button("📥 Anki 덱 저장 (.apkg)", data, file_name=f"{deck_name}.apkg",
+                           mime="application/octet-stream", use_container_width=True)
+
+
+def render_word_heatmap():
+    """리더용: 구절마다 학습자들이 자주 틀리는 단어를 색으로 표시"""
+    with st.expander("📊 자주 틀리는 단어 (리더용)"):
+        # The expander body runs on every rerun even when collapsed; load the
+        # statistics only once a leader asks for them.
+        if not st.toggle("통계 불러오기", key="heatmap_open"):
+            return
+        files = get_available_files()
+        if not files:
+            return
+        selected_file = st.selectbox("덱", files, key="heatmap_file")
+        label = st.radio("버전", list(BIBLE_VERSIONS), horizontal=True, key="heatmap_version")
+        column = BIBLE_VERSIONS[label]
+        file_path = os.path.join(DATA_DIR, selected_file)
+        try:
+            header = deck_header(file_path)
+        except ValueError:
+            header = ()
+        if column not in header:
+            st.info(f"이 덱에는 {label} 본문이 없습니다.")
+            return
+        stats = get_word_stats(selected_file, column)
+        hardest = stats.hardest(limit=20)
+        if not hardest:
+            st.caption("아직 받아쓰기 기록이 없습니다.")
+            return
+        st.caption("빨간색이 진할수록 많이 틀린 단어입니다 (빠뜨림 + 다르게 씀).")
+        locations = load_csv(file_path, (column,)).column("location")
+        for card, mean_rate in hardest:
+            attempts, missed, substituted = stats.counts(card).tolist()
+            words = "".join(
+                f'<span class="heat-word" style="background:rgba(239,68,68,{rate:.2f})" '
+                f'title="{tries}회 중 빠뜨림 {miss} · 다르게 씀 {sub}">{word}</span>'
+                for word, rate, tries, miss, sub in zip(stats.words[card], stats.error_rates(card).tolist(),
+                                                        attempts, missed, substituted)
+            )
+            st.markdown(f"**{locations[card]}** · 평균 오답률 {mean_rate:.0%} ({max(attempts)}회)")
+            st.markdown(f'<div class="heat-verse">{words}</div>', unsafe_allow_html=True)
+
+
 def render_main_page():
     """Render the main learning page."""
-    selected_file = st.session_state.loaded_file
+    study = current_study()
+    selected_file = study.file_name
     verse_col = st.session_state.verse_col
-    app_mode = st.session_state.app_mode
-    mode = st.session_state.mode
+    verse_cols = study.verse_cols
+    app_mode = study.app_mode
+    mode = study.mode
 
-    df = load_csv(os.path.join(DATA_DIR, selected_file))
-    total = len(df)
+    deck = load_csv(os.path.join(DATA_DIR, selected_file), verse_cols)
+    total = len(deck)
 
-    # --- Font size controls ---
-    font_size = get_font_size()
-    fcol1, fcol2, fcol3, fcol4 = st.columns([1, 1, 2, 1])
+    # --- Font size controls (applied in the browser, no rerun) ---
+    fcol1, fcol2 = st.columns([4, 1])
     with fcol1:
-        if st.button("A-", use_container_width=True, help="글자 작게"):
-            if font_size > MIN_FONT_SIZE:
-                st.session_state.font_size = font_size - FONT_STEP
-                st.rerun()
+        render_client_store(font_controls=True)
     with fcol2:
-        if st.button("A+", use_container_width=True, help="글자 크게"):
-            if font_size < MAX_FONT_SIZE:
-                st.session_state.font_size = font_size + FONT_STEP
-                st.rerun()
-    with fcol3:
-        st.caption(f"글자 크기: {font_size}px")
-    with fcol4:
         if st.button("처음부터", use_container_width=True):
-            st.session_state.setup_done = False
-            for key in list(st.session_state.keys()):
-                if key != "font_size":
-                    del st.session_state[key]
+            end_study()
             st.rerun()
 
     # --- Progress ---
-    completed_count = len(st.session_state.completed)
+    completed_count = len(study.completed)
     st.progress(completed_count / total if total else 0)
-    if app_mode == "학습":
-        mode_display = "학습"
+    if app_mode != "테스트":
+        mode_display = app_mode
     else:
         mode_display = f"테스트 ({mode})"
-    st.caption(f"진행: {completed_count} / {total}  |  모드: {mode_display}")
+    order_info = f"  |  순서 코드: {study.seed:0{ORDER_CODE_DIGITS}d}" if study.seed is not None else ""
+    st.caption(f"진행: {completed_count} / {total}  |  모드: {mode_display}{order_info}")
 
     # --- Check completion ---
-    if st.session_state.all_done:
+    if study.all_done:
         render_certificate(
-            st.session_state.user_name,
-            st.session_state.mode_results,
-            total, df, verse_col
+            study.user_name,
+            study.mode_results,
+            total, deck, verse_col,
+            deck_name=os.path.splitext(selected_file)[0],
         )
+        render_anki_export(study)
         if st.button("처음으로 돌아가기", type="primary", use_container_width=True):
-            st.session_state.setup_done = False
-            for key in list(st.session_state.keys()):
-                if key != "font_size":
-                    del st.session_state[key]
+            end_study()
             st.rerun()
         return
 
     # --- Find next card ---
-    order = st.session_state.order
-    idx = st.session_state.current_idx
+    order = study.order
+    idx = study.current_idx
 
-    while idx < len(order) and order[idx] in st.session_state.completed:
+    while idx < len(order) and order[idx] in study.completed:
         idx += 1
-    st.session_state.current_idx = idx
+    study.current_idx = idx
 
     if idx >= len(order):
-        remaining_skipped = st.session_state.skipped - st.session_state.completed
+        remaining_skipped = study.skipped - study.completed
         if remaining_skipped:
             st.info(f"건너뛴 구절: {len(remaining_skipped)}개")
             skip_col1, skip_col2 = st.columns(2)
             with skip_col1:
                 if st.button("건너뛴 구절 다시 학습", use_container_width=True):
-                    skipped_list = list(remaining_skipped)
-                    if st.session_state.shuffle:
-                        random.shuffle(skipped_list)
-                    st.session_state.order = skipped_list
-                    st.session_state.current_idx = 0
-                    st.session_state.skipped = set()
+                    study.retry_skipped()
                     st.session_state.show_verse = False
                     st.session_state.dictation_submitted = False
                     st.rerun()
             with skip_col2:
                 if st.button("그냥 완료하기", type="primary", use_container_width=True):
-                    st.session_state.all_done = True
+                    study.all_done = True
                     st.rerun()
         else:
-            st.session_state.all_done = True
+            study.all_done = True
             st.rerun()
         return
 
-    row = df.iloc[order[idx]]
+    row = deck.row(order[idx])
     location = row["location"]
-    verse_text = row[verse_col]
+    clear_card_widgets(order[idx])
 
     # --- Card display ---
     st.markdown("---")
-    st.markdown(f'<div class="verse-location">📍 {location}</div>', unsafe_allow_html=True)
+    if app_mode == "테스트" and len(verse_cols) > 1:
+        labels = [label for label, col in BIBLE_VERSIONS.items() if col in verse_cols]
+        score_label = st.radio("채점 기준 버전", labels, horizontal=True, key="score_version")
+        st.session_state.verse_col = verse_col = BIBLE_VERSIONS[score_label]
+    st.session_state.card_versions = {label: row[col] for label, col in BIBLE_VERSIONS.items()
+                                      if col in verse_cols}
+    verse_text = row[verse_col]
+    if mode != "장절 맞히기":
+        st.markdown(f'<div class="verse-location">📍 {location}</div>', unsafe_allow_html=True)
+    if study.history.redo:
+        if st.button("↪️ 다시 앞으로", use_container_width=True):
+            go_forward()
+            st.rerun()
 
     if app_mode == "학습":
         render_learning_mode(verse_text, order, idx)
+    elif app_mode == "듣기":
+        render_listening_mode(verse_text, order, idx)
     elif mode == "암송":
         render_recitation_mode(verse_text, order, idx)
+    elif mode == "장절 맞히기":
+        quiz = get_reference_quiz(os.path.join(DATA_DIR, selected_file), verse_col)
+        render_reference_quiz(verse_text, order, idx, quiz)
     else:
         render_dictation_mode(verse_text, order, idx, location)
 
@@ -527,6 +974,7 @@ def render_learning_mode(verse_text: str, order: list, idx: int):
       hidden  - verse is hidden, user recalls (optional typing)
       result  - typing comparison shown
     """
+    study = current_study()
     if "learn_phase" not in st.session_state:
         st.session_state.learn_phase = "reading"
 
@@ -534,12 +982,9 @@ def render_learning_mode(verse_text: str, order: list, idx: int):
 
     if phase == "reading":
         # --- Phase 1: verse visible ---
-        st.markdown(
-            f'<div class="verse-text">{verse_text}</div>',
-            unsafe_allow_html=True,
-        )
+        render_verse(verse_text)
 
-        has_history = len(st.session_state.history) > 0
+        has_history = len(study.history) > 0
         if has_history:
             col_prev, col1, col2, col3 = st.columns(4)
         else:
@@ -554,11 +999,7 @@ def render_learning_mode(verse_text: str, order: list, idx: int):
 
         with col1:
             if st.button("⏭️ 건너뛰기", use_container_width=True):
-                st.session_state.history.append(order[idx])
-                st.session_state.skipped.add(order[idx])
-                st.session_state.current_idx += 1
-                st.session_state.learn_phase = "reading"
-                st.session_state.hint_word = None
+                skip_card(order[idx])
                 st.rerun()
 
         with col2:
@@ -569,13 +1010,7 @@ def render_learning_mode(verse_text: str, order: list, idx: int):
 
         with col3:
             if st.button("✅ 학습완료", use_container_width=True):
-                st.session_state.history.append(order[idx])
-                st.session_state.completed.add(order[idx])
-                st.session_state.skipped.discard(order[idx])
-                st.session_state.mode_results[order[idx]] = {"completed": True}
-                st.session_state.current_idx += 1
-                st.session_state.learn_phase = "reading"
-                st.session_state.hint_word = None
+                complete_card(order[idx], {"completed": True})
                 st.rerun()
 
     elif phase == "hidden":
@@ -594,8 +1029,7 @@ def render_learning_mode(verse_text: str, order: list, idx: int):
         hint_col, show_col = st.columns([1, 2])
         with hint_col:
             if st.button("💡 랜덤 힌트", use_container_width=True):
-                words = [w for w in verse_text.split() if w]
-                st.session_state.hint_word = random.choice(words) if words else ""
+                st.session_state.hint_word = hint_word(order[idx])
                 st.rerun()
         with show_col:
             if st.button("👀 구절 확인", type="primary", use_container_width=True):
@@ -618,48 +1052,23 @@ def render_learning_mode(verse_text: str, order: list, idx: int):
         col1, col2 = st.columns(2)
         with col1:
             if st.button("✍️ 확인하기", use_container_width=True):
+                record_word_errors(order[idx], verse_text, user_input)
                 st.session_state.dictation_input = user_input
                 st.session_state.learn_phase = "result"
                 st.session_state.hint_word = None
                 st.rerun()
         with col2:
             if st.button("✅ 학습완료", use_container_width=True, key="learn_done_hidden"):
-                st.session_state.history.append(order[idx])
-                st.session_state.completed.add(order[idx])
-                st.session_state.skipped.discard(order[idx])
-                st.session_state.mode_results[order[idx]] = {"completed": True}
-                st.session_state.current_idx += 1
-                st.session_state.learn_phase = "reading"
-                st.session_state.hint_word = None
+                complete_card(order[idx], {"completed": True})
                 st.rerun()
 
     elif phase == "result":
         # --- Phase 3: typing comparison ---
         user_input = st.session_state.dictation_input
-        result = compute_word_match(user_input, verse_text)
-
-        score = result["score"]
-        score_class = "score-good" if score >= 80 else "score-ok" if score >= 50 else "score-bad"
-
-        st.markdown(
-            f'<div class="{score_class} score-display">{score}%</div>',
-            unsafe_allow_html=True,
-        )
-        st.markdown(
-            f"**{result['matched_words']}** / {result['total_words']} 단어 일치",
-        )
-
-        comparison_html = render_word_comparison(result)
-        st.markdown(
-            f'<div class="dictation-result">{comparison_html}</div>',
-            unsafe_allow_html=True,
-        )
+        render_match_score(compute_word_match(user_input, verse_text))
 
         st.markdown("**정답:**")
-        st.markdown(
-            f'<div class="verse-text">{verse_text}</div>',
-            unsafe_allow_html=True,
-        )
+        render_verse(verse_text)
 
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -674,26 +1083,74 @@ def render_learning_mode(verse_text: str, order: list, idx: int):
                 st.rerun()
         with col3:
             if st.button("✅ 학습완료", type="primary", use_container_width=True, key="learn_done_result"):
-                st.session_state.history.append(order[idx])
-                st.session_state.completed.add(order[idx])
-                st.session_state.skipped.discard(order[idx])
-                st.session_state.mode_results[order[idx]] = {"completed": True}
-                st.session_state.current_idx += 1
-                st.session_state.learn_phase = "reading"
-                st.session_state.dictation_input = ""
-                st.session_state.hint_word = None
+                complete_card(order[idx], {"completed": True})
                 st.rerun()
 
 
-def render_recitation_mode(verse_text: str, order: list, idx: int):
-    """Render the recitation (암송) mode card."""
-    font_size = get_font_size()
+def render_listening_mode(verse_text: str, order: list, idx: int):
+    """Render the listening (듣기) mode card.
 
-    if st.session_state.show_verse:
+    The verse is read aloud from the on-disk TTS cache; only the first
+    request for a (text, voice, rate) synthesizes it, as a background job
+    the page polls for.
+    """
+    study = current_study()
+    rate_label = st.radio("읽기 속도", list(TTS_RATES), index=1, horizontal=True, key="tts_rate")
+    voice, rate = TTS_VOICES[st.session_state.verse_col], TTS_RATES[rate_label]
+    audio_path = tts_cache_path(verse_text, voice, rate)
+    try:
+        if not os.path.exists(audio_path):
+            audio_path = run_in_background(synthesize_file, verse_text, voice, rate,
+                                           message="🔊 음성을 준비하는 중...", cancellable=True)
+    except JobQueueFull:
+        st.warning("지금은 음성을 기다리는 요청이 많습니다. 잠시 후 다시 시도해 주세요.")
+    except CancelledError:
+        if st.button("🔊 음성 다시 준비하기", key="tts_retry"):
+            st.session_state.cancelled_jobs.discard(job_id(synthesize_file, verse_text, voice, rate))
+            st.rerun()
+    except Exception as exc:
+        st.error(f"음성을 만들지 못했습니다: {exc}")
+    else:
+        if audio_path is not None:
+            st.audio(audio_path, format="audio/wav", autoplay=True)
+
+    if st.toggle("📖 구절 보기", value=True, key="listen_show_text"):
+        render_verse(verse_text)
+    else:
         st.markdown(
-            f'<div class="verse-text">{verse_text}</div>',
-            unsafe_allow_html=True
+            '<div class="verse-hidden">🎧 들으면서 따라 말해 보세요</div>',
+            unsafe_allow_html=True,
         )
+
+    has_history = len(study.history) > 0
+    if has_history:
+        col_prev, col1, col2 = st.columns(3)
+    else:
+        col_prev = None
+        col1, col2 = st.columns(2)
+
+    if has_history:
+        with col_prev:
+            if st.button("⬅️ 이전", use_container_width=True):
+                go_previous()
+                st.rerun()
+
+    with col1:
+        if st.button("⏭️ 건너뛰기", use_container_width=True):
+            skip_card(order[idx])
+            st.rerun()
+
+    with col2:
+        if st.button("✅ 듣기완료", type="primary", use_container_width=True):
+            complete_card(order[idx], {"completed": True})
+            st.rerun()
+
+
+def render_recitation_mode(verse_text: str, order: list, idx: int):
+    """Render the recitation (암송) mode card."""
+    study = current_study()
+    if st.session_state.show_verse:
+        render_verse(verse_text)
     else:
         if st.session_state.hint_word is not None:
             st.markdown(
@@ -708,17 +1165,18 @@ def render_recitation_mode(verse_text: str, order: list, idx: int):
         hint_col, show_col = st.columns([1, 2])
         with hint_col:
             if st.button("💡 랜덤 힌트", use_container_width=True):
-                words = [w for w in verse_text.split() if w]
-                st.session_state.hint_word = random.choice(words) if words else ""
+                st.session_state.hint_word = hint_word(order[idx])
                 st.rerun()
         with show_col:
             if st.button("구절 확인", type="primary", use_container_width=True):
                 st.session_state.show_verse = True
                 st.session_state.hint_word = None
                 st.rerun()
+        render_recitation_recorder(order[idx])
 
     if st.session_state.show_verse:
-        has_history = len(st.session_state.history) > 0
+        render_recitation_transcript(verse_text, order[idx])
+        has_history = len(study.history) > 0
         if has_history:
             col_prev, col1, col2, col3 = st.columns(4)
         else:
@@ -733,11 +1191,7 @@ def render_recitation_mode(verse_text: str, order: list, idx: int):
 
         with col1:
             if st.button("⏭️ 건너뛰기", use_container_width=True):
-                st.session_state.history.append(order[idx])
-                st.session_state.skipped.add(order[idx])
-                st.session_state.current_idx += 1
-                st.session_state.show_verse = False
-                st.session_state.hint_word = None
+                skip_card(order[idx])
                 st.rerun()
 
         with col2:
@@ -748,25 +1202,139 @@ def render_recitation_mode(verse_text: str, order: list, idx: int):
 
         with col3:
             if st.button("✅ 암기완료", use_container_width=True):
-                st.session_state.history.append(order[idx])
-                st.session_state.completed.add(order[idx])
-                st.session_state.skipped.discard(order[idx])
-                st.session_state.mode_results[order[idx]] = {"completed": True}
-                st.session_state.current_idx += 1
-                st.session_state.show_verse = False
-                st.session_state.hint_word = None
+                complete_card(order[idx], {"completed": True})
                 st.rerun()
     else:
-        if len(st.session_state.history) > 0:
+        if len(study.history) > 0:
             if st.button("⬅️ 이전", use_container_width=True):
                 go_previous()
                 st.rerun()
 
 
+@st.cache_resource
+def get_transcriber() -> Transcriber | None:
+    """Start the speech-to-text pool and warm the model up once per process."""
+    if not stt_available():
+        return None
+    transcriber = Transcriber()
+    transcriber.warm_up()
+    return transcriber
+
+
+def render_recitation_recorder(card: int):
+    """녹음한 암송을 로컬 음성 인식 큐에 넣고, 끝나면 구절과 채점 결과를 표시"""
+    transcriber = get_transcriber()
+    if transcriber is None:
+        return
+    audio = st.audio_input("🎙️ 소리 내어 암송하고 녹음하면 자동으로 채점됩니다", key=f"recite_audio_{card}")
+    if audio is None:
+        return
+
+    job = st.session_state.get("recite_job")
+    if job is None or job["card"] != card or job["file_id"] != audio.file_id:
+        language = STT_LANGUAGES.get(st.session_state.verse_col, "ko")
+        try:
+            future = transcriber.submit(audio.getvalue(), language)
+        except TranscriberBusy:
+            st.warning("지금은 채점을 기다리는 녹음이 많습니다. 잠시 후 다시 녹음해 주세요.")
+            return
+        job = st.session_state.recite_job = {"card": card, "file_id": audio.file_id,
+                                             "future": future, "shown": False}
+    if not job["shown"]:
+        render_recitation_job_status()
+
+
+@st.fragment(run_every=TRANSCRIBE_POLL_SECONDS)
+def render_recitation_job_status():
+    """받아쓰기가 끝날 때까지 이 조각만 다시 실행하며 기다림"""
+    job = st.session_state.get("recite_job")
+    if job is None or job["future"].done():
+        st.session_state.show_verse = True
+        st.session_state.hint_word = None
+        st.rerun(scope="app")
+    st.caption("🎧 녹음을 받아쓰는 중입니다...")
+
+
+def render_recitation_transcript(verse_text: str, card: int):
+    """이 카드의 녹음 채점 결과 (있을 때만)"""
+    job = st.session_state.get("recite_job")
+    if job is None or job["card"] != card or not job["future"].done():
+        return
+    job["shown"] = True
+    try:
+        transcript = job["future"].result()
+    except Exception as exc:
+        st.error(f"음성 인식에 실패했습니다: {exc}")
+        return
+    st.markdown(f"**🎙️ 인식된 암송:** {transcript or '(인식된 말이 없습니다)'}")
+    render_match_score(compute_word_match(transcript, verse_text))
+
+
+@st.cache_resource(max_entries=16)
+def _get_reference_quiz(file_path: str, mtime: float, column: str) -> ReferenceQuiz:
+    """Build the look-alike neighbor table once per (deck, version); sessions share it.
+
+    A table precompiled for the current data is memory-mapped instead.
+    """
+    import numpy as np
+
+    from reference_quiz import ReferenceQuiz
+
+    deck = load_csv(file_path, (column,))
+    path = artifact_file(*quiz_table_path(os.path.basename(file_path), column))
+    if path is not None:
+        return ReferenceQuiz(deck.column("location"), neighbors=np.load(path, mmap_mode="r"))
+    return ReferenceQuiz(deck.column("location"), deck.column(column))
+
+
+def get_reference_quiz(file_path: str, column: str) -> ReferenceQuiz:
+    return _get_reference_quiz(file_path, os.path.getmtime(file_path), column)
+
+
+def render_reference_quiz(verse_text: str, order: list, idx: int, quiz: ReferenceQuiz):
+    """Render the 장절 맞히기 card: the verse is shown, the reference is chosen."""
+    study = current_study()
+    card = order[idx]
+    render_verse(verse_text)
+    choice = st.session_state.get("quiz_choice")
+
+    if choice is None:
+        st.markdown("**어느 말씀일까요?**")
+        for option in quiz.options(card, study.seed):
+            if st.button(quiz.locations[option], key=f"quiz_option_{option}", use_container_width=True):
+                st.session_state.quiz_choice = option
+                st.rerun()
+
+        has_history = len(study.history) > 0
+        if has_history:
+            col_prev, col_skip = st.columns(2)
+            with col_prev:
+                if st.button("⬅️ 이전", use_container_width=True):
+                    go_previous()
+                    st.rerun()
+        else:
+            col_skip = st.container()
+        with col_skip:
+            if st.button("⏭️ 건너뛰기", use_container_width=True):
+                skip_card(card)
+                st.rerun()
+        return
+
+    correct = quiz.locations[choice] == quiz.locations[card]
+    if correct:
+        st.success(f"✅ 정답입니다! {quiz.locations[card]}")
+    else:
+        st.error(f"❌ {quiz.locations[choice]} — 정답은 **{quiz.locations[card]}** 입니다")
+
+    # No second try: the answer is on screen, so the first pick is the score.
+    if st.button("➡️ 다음", type="primary", use_container_width=True):
+        complete_card(card, {"score": 100 if correct else 0, "matched": int(correct), "total": 1})
+        st.rerun()
+
+
 def render_dictation_mode(verse_text: str, order: list, idx: int, location: str):
     """Render the dictation (받아쓰기) mode card."""
-    font_size = get_font_size()
-
+    study = current_study()
     if st.session_state.get("hint_word") is not None:
         st.markdown(
             f'<div class="hint-display">💡 {st.session_state.hint_word}</div>',
@@ -789,11 +1357,10 @@ def render_dictation_mode(verse_text: str, order: list, idx: int, location: str)
         )
 
         if st.button("💡 랜덤 힌트", use_container_width=True):
-            words = [w for w in verse_text.split() if w]
-            st.session_state.hint_word = random.choice(words) if words else ""
+            st.session_state.hint_word = hint_word(order[idx])
             st.rerun()
 
-        has_history = len(st.session_state.history) > 0
+        has_history = len(study.history) > 0
         if has_history:
             bcol1, bcol2, bcol3 = st.columns(3)
         else:
@@ -810,15 +1377,12 @@ def render_dictation_mode(verse_text: str, order: list, idx: int, location: str)
 
         with skip_col:
             if st.button("⏭️ 건너뛰기", use_container_width=True):
-                st.session_state.history.append(order[idx])
-                st.session_state.skipped.add(order[idx])
-                st.session_state.current_idx += 1
-                st.session_state.dictation_submitted = False
-                st.session_state.hint_word = None
+                skip_card(order[idx])
                 st.rerun()
 
         with submit_col:
             if st.button("제출", type="primary", use_container_width=True):
+                record_word_errors(order[idx], verse_text, user_input)
                 st.session_state.dictation_input = user_input
                 st.session_state.dictation_submitted = True
                 st.session_state.hint_word = None
@@ -827,31 +1391,12 @@ def render_dictation_mode(verse_text: str, order: list, idx: int, location: str)
     else:
         user_input = st.session_state.dictation_input
         result = compute_word_match(user_input, verse_text)
-
-        score = result["score"]
-        score_class = "score-good" if score >= 80 else "score-ok" if score >= 50 else "score-bad"
-
-        st.markdown(
-            f'<div class="{score_class} score-display">{score}%</div>',
-            unsafe_allow_html=True
-        )
-        st.markdown(
-            f"**{result['matched_words']}** / {result['total_words']} 단어 일치",
-        )
-
-        comparison_html = render_word_comparison(result)
-        st.markdown(
-            f'<div class="dictation-result">{comparison_html}</div>',
-            unsafe_allow_html=True
-        )
+        render_match_score(result)
 
         st.markdown("**정답:**")
-        st.markdown(
-            f'<div class="verse-text">{verse_text}</div>',
-            unsafe_allow_html=True
-        )
+        render_verse(verse_text)
 
-        has_history = len(st.session_state.history) > 0
+        has_history = len(study.history) > 0
         if has_history:
             col_prev, col1, col2 = st.columns(3)
         else:
@@ -871,149 +1416,84 @@ def render_dictation_mode(verse_text: str, order: list, idx: int, location: str)
 
         with col2:
             if st.button("➡️ 다음", type="primary", use_container_width=True):
-                st.session_state.history.append(order[idx])
-                st.session_state.completed.add(order[idx])
-                st.session_state.skipped.discard(order[idx])
-                st.session_state.mode_results[order[idx]] = {
+                complete_card(order[idx], {
                     "score": result["score"],
                     "matched": result["matched_words"],
                     "total": result["total_words"],
-                }
-                st.session_state.current_idx += 1
-                st.session_state.dictation_submitted = False
-                st.session_state.dictation_input = ""
+                })
                 st.rerun()
 
 
-def go_previous():
-    """Go back to the previous card."""
-    if not st.session_state.history:
+_FRESH_VIEW = ("reading", False, False, "", "")
+
+
+def card_view(card: int) -> tuple | None:
+    """What the learner sees on ``card`` now, kept with a move so undo can show it again.
+
+    None for an untouched card, so plain read-and-advance moves store nothing.
+    """
+    typed = st.session_state.get(f"dictation_{card}") or st.session_state.get(f"learn_typing_{card}") or ""
+    view = (st.session_state.get("learn_phase", "reading"), st.session_state.get("show_verse", False),
+            st.session_state.get("dictation_submitted", False), st.session_state.get("dictation_input", ""),
+            typed)
+    return None if view == _FRESH_VIEW else (card, *view)
+
+
+def restore_card_view(view: tuple | None):
+    """Put the per-card UI flags and typed text back as ``card_view`` saw them."""
+    init_session_state()
+    if view is None:
         return
+    card, phase, show_verse, submitted, dictation_input, typed = view
+    st.session_state.learn_phase = phase
+    st.session_state.show_verse = show_verse
+    st.session_state.dictation_submitted = submitted
+    st.session_state.dictation_input = dictation_input
+    if typed:
+        prefix = "learn_typing" if current_study().app_mode == "학습" else "dictation"
+        st.session_state[f"{prefix}_{card}"] = typed
 
-    prev_card = st.session_state.history.pop()
-    st.session_state.completed.discard(prev_card)
-    st.session_state.skipped.discard(prev_card)
-    if prev_card in st.session_state.mode_results:
-        del st.session_state.mode_results[prev_card]
 
-    order = st.session_state.order
-    try:
-        prev_pos = order.index(prev_card)
-        st.session_state.current_idx = prev_pos
-    except ValueError:
-        st.session_state.order.insert(st.session_state.current_idx, prev_card)
-        st.session_state.current_idx = st.session_state.current_idx
+def skip_card(card: int):
+    current_study().skip(card, card_view(card))
+    init_session_state()
 
-    st.session_state.show_verse = False
-    st.session_state.dictation_submitted = False
-    st.session_state.dictation_input = ""
-    st.session_state.hint_word = None
-    st.session_state.learn_phase = "reading"
+
+def complete_card(card: int, result: dict):
+    current_study().complete(card, result, card_view(card))
+    init_session_state()
+
+
+def go_previous():
+    """Undo the last move and show that card as the learner left it."""
+    study = current_study()
+    current = study.order[study.current_idx] if study.current_idx < len(study.order) else None
+    restore_card_view(study.undo(None if current is None else card_view(current)))
+
+
+def go_forward():
+    """Redo the move taken back by "이전", restoring the card it led to."""
+    restore_card_view(current_study().redo())
 
 
 # ============================================================
 # Theme 2: 단어 순서 외우기
 # ============================================================
 
-# 성경 각 권별 이모지
-BIBLE_BOOK_EMOJIS = {
-    # 구약 39권
-    "창세기": "🌍", "출애굽기": "🔥", "레위기": "🐑", "민수기": "🏕️",
-    "신명기": "📜", "여호수아": "⚔️", "사사기": "🛡️", "룻기": "🌾",
-    "사무엘상": "👑", "사무엘하": "🏰", "열왕기상": "🏛️", "열왕기하": "💥",
-    "역대상": "📋", "역대하": "🏗️", "에스라": "🔨", "느헤미야": "🧱",
-    "에스더": "👸", "욥기": "😰", "시편": "🎵", "잠언": "💎",
-    "전도서": "🌬️", "아가": "💕", "이사야": "🕊️", "예레미야": "😢",
-    "예레미야애가": "💔", "에스겔": "👁️", "다니엘": "🦁", "호세아": "💍",
-    "요엘": "🦗", "아모스": "📢", "오바댜": "⛰️", "요나": "🐋",
-    "미가": "⭐", "나훔": "🌊", "하박국": "❓", "스바냐": "⚡",
-    "학개": "⛏️", "스가랴": "🐴", "말라기": "✉️",
-    # 신약 27권
-    "마태복음": "📖", "마가복음": "🏃", "누가복음": "🩺", "요한복음": "🕯️",
-    "사도행전": "🗺️", "로마서": "⚖️", "고린도전서": "💌", "고린도후서": "💪",
-    "갈라디아서": "⛓️", "에베소서": "🏠", "빌립보서": "😊", "골로새서": "🌟",
-    "데살로니가전서": "☁️", "데살로니가후서": "⏳", "디모데전서": "🧑‍🏫", "디모데후서": "🏅",
-    "디도서": "🏝️", "빌레몬서": "🤝", "히브리서": "🙏", "야고보서": "🔧",
-    "베드로전서": "🪨", "베드로후서": "⚠️", "요한1서": "❤️", "요한2서": "🚶",
-    "요한3서": "🤗", "유다서": "🗡️", "요한계시록": "📯",
-}
 
-# 성경 각 권별 내용 기반 힌트 (대표적인 내용 요약)
-BIBLE_BOOK_HINTS = {
-    # 구약 39권
-    "창세기": "천지창조와 아브라함·이삭·야곱의 이야기",
-    "출애굽기": "모세가 이스라엘 백성을 이집트에서 이끌어 냄",
-    "레위기": "제사 제도와 정결 율법의 규례",
-    "민수기": "광야 40년의 여정과 인구조사",
-    "신명기": "가나안 입성 전 모세의 마지막 설교",
-    "여호수아": "가나안 땅 정복과 12지파에게 분배",
-    "사사기": "기드온·삼손 등 사사들의 시대",
-    "룻기": "모압 여인의 시어머니를 향한 충성",
-    "사무엘상": "사울왕 즉위와 목동 다윗의 등장",
-    "사무엘하": "다윗 왕의 통치와 시련",
-    "열왕기상": "솔로몬의 성전 건축과 왕국 분열",
-    "열왕기하": "엘리야·엘리사 이후 남북 왕국의 멸망",
-    "역대상": "다윗의 족보와 통치 기록",
-    "역대하": "솔로몬의 성전 건축부터 유다 왕들의 역사",
-    "에스라": "바벨론 포로 귀환과 성전 재건",
-    "느헤미야": "예루살렘 성벽 재건의 이야기",
-    "에스더": "유대 민족을 구한 페르시아의 왕비",
-    "욥기": "의로운 자가 겪는 고난과 인내의 이야기",
-    "시편": "다윗 등의 찬양과 기도의 시 모음",
-    "잠언": "솔로몬의 지혜로운 교훈 모음",
-    "전도서": "헛되고 헛되도다, 인생의 의미를 묻다",
-    "아가": "신랑과 신부의 아름다운 사랑 노래",
-    "이사야": "메시아 예언과 이스라엘을 향한 위로",
-    "예레미야": "눈물의 선지자가 전하는 심판 경고",
-    "예레미야애가": "예루살렘 멸망을 슬퍼하는 애가",
-    "에스겔": "마른 뼈가 살아나는 환상과 새 성전",
-    "다니엘": "사자굴의 믿음과 종말의 환상",
-    "호세아": "불신실한 아내를 향한 변치 않는 사랑",
-    "요엘": "메뚜기 재앙과 성령 부어주심의 약속",
-    "아모스": "목자 출신이 외치는 공의와 정의",
-    "오바댜": "에돔에 대한 심판 선포",
-    "요나": "큰 물고기 뱃속과 니느웨의 회개",
-    "미가": "베들레헴에서 오실 통치자 예언",
-    "나훔": "앗수르 수도 니느웨의 멸망 예언",
-    "하박국": "의인은 믿음으로 살리라",
-    "스바냐": "여호와의 크고 두려운 심판의 날",
-    "학개": "귀환 후 성전 재건을 촉구하다",
-    "스가랴": "여덟 가지 환상과 메시아 예언",
-    "말라기": "구약의 마지막, 엘리야의 오심 예언",
-    # 신약 27권
-    "마태복음": "유대인을 위해 기록된 왕이신 예수",
-    "마가복음": "행동하시는 종 예수의 간결한 복음",
-    "누가복음": "의사 누가가 기록한 인자이신 예수",
-    "요한복음": "세상의 빛, 하나님의 아들 예수",
-    "사도행전": "성령 강림과 초대교회 복음 전파",
-    "로마서": "이신칭의, 믿음으로 의롭게 됨",
-    "고린도전서": "교회 문제 해결과 사랑의 장(13장)",
-    "고린도후서": "약함 속의 강함, 사도 바울의 권위",
-    "갈라디아서": "율법에서 자유, 오직 믿음으로",
-    "에베소서": "그리스도 안에서 하나 된 교회",
-    "빌립보서": "어떤 상황에서도 기뻐하라",
-    "골로새서": "만물 위에 으뜸이 되시는 그리스도",
-    "데살로니가전서": "예수님 재림의 소망",
-    "데살로니가후서": "재림 전에 나타날 징조들",
-    "디모데전서": "젊은 목회자 디모데에게 주는 교훈",
-    "디모데후서": "선한 싸움을 싸우라, 바울의 유언",
-    "디도서": "그레데 섬 교회 조직과 교훈",
-    "빌레몬서": "도망 노예 오네시모를 위한 사랑의 편지",
-    "히브리서": "예수는 영원한 대제사장",
-    "야고보서": "행함이 없는 믿음은 죽은 것",
-    "베드로전서": "고난 중에도 소망을 품으라",
-    "베드로후서": "거짓 교사를 경계하라",
-    "요한1서": "하나님은 사랑이시라",
-    "요한2서": "진리 안에서 행하라",
-    "요한3서": "선을 행하는 자는 하나님께 속한 자",
-    "유다서": "믿음의 도를 위하여 힘써 싸우라",
-    "요한계시록": "종말의 환상과 새 하늘 새 땅",
-}
+def _book_table(name: str):
+    """공유 저장소가 있으면 매핑된 테이블을, 없으면 bible_books 모듈을 처음 사용할 때 로드"""
+    store = get_shared_store()
+    table = store.table(name) if store is not None else None
+    if table is None:
+        from bible_books import BOOK_TABLES
+        table = BOOK_TABLES[name]
+    return table
 
 
 def get_book_emoji(word: str) -> str:
     """성경 권명에 해당하는 이모지를 반환"""
-    return BIBLE_BOOK_EMOJIS.get(word, "")
+    return _book_table("book_emojis").get(word, "")
 
 
 def get_chosung(text: str) -> str:
@@ -1029,9 +1509,9 @@ def get_chosung(text: str) -> str:
 
 def get_hint_text(word: str, level: int) -> str:
     """힌트 텍스트 생성 (level 1: 성경 내용 힌트, level 2: 내용 + 초성 + 글자 수)"""
-    content_hint = BIBLE_BOOK_HINTS.get(word, "")
+    content_hint = _book_table("book_hints").get(word, "")
     ch = get_chosung(word)
-    emoji = BIBLE_BOOK_EMOJIS.get(word, "💡")
+    emoji = _book_table("book_emojis").get(word, "💡")
     if level == 1:
         if content_hint:
             return f"{emoji} 힌트: {content_hint}"
@@ -1052,90 +1532,226 @@ def get_ordering_files() -> list[tuple[str, str]]:
     return results
 
 
+@st.cache_resource(max_entries=64)
+def _load_ordering_words(file_path: str, mtime: float) -> tuple[str, ...]:
+    return load_ordering_words(file_path)
+
+
 def load_ordering_csv(file_path: str) -> list[str]:
     """순서 외우기용 CSV 로드. order 컬럼 기준 정렬 후 name_ko 리스트 반환"""
-    df = pd.read_csv(file_path)
-    df = df.sort_values("order").reset_index(drop=True)
-    return df["name_ko"].tolist()
+    store = get_shared_store()
+    if store is not None and store.is_current(file_path):
+        words = store.ordering_words(os.path.basename(file_path))
+        if words is not None:
+            return words.tolist()
+    return list(_load_ordering_words(file_path, os.path.getmtime(file_path)))
 
 
 def load_ordering_csv_from_upload(uploaded_file) -> list[str]:
     """업로드된 CSV에서 단어 목록 로드 (utf-8, cp949 대응)"""
-    import io
-    raw = uploaded_file.read()
+    text = decode_csv_bytes(uploaded_file.read())
     try:
-        text = raw.decode("utf-8")
-    except UnicodeDecodeError:
-        text = raw.decode("cp949")
-    df = pd.read_csv(io.StringIO(text))
-    required = {"order", "name_ko", "name_en"}
-    if not required.issubset(set(df.columns)):
+        # ordering_words raises ValueError for a non-integer order value too.
+        return list(ordering_words(read_csv_columns(text, ORDERING_REQUIRED_COLUMNS)))
+    except ValueError:
         return None
-    df = df.sort_values("order").reset_index(drop=True)
-    return df["name_ko"].tolist()
 
 
 def reset_ordering_state():
     """테마 2 session_state 초기화"""
+    sub = st.session_state.get("ord_room_sub")
+    if sub is not None:
+        get_room_registry().bus.unsubscribe(sub)
     keys = [k for k in st.session_state.keys() if k.startswith("ord_")]
     for k in keys:
         del st.session_state[k]
 
 
-def render_bgm_player(is_playing: bool):
-    """Web Audio API 기반 BGM 재생/정지"""
-    if is_playing:
-        components.html("""
-        <div id="bgm-container"></div>
-        <script>
-        (function() {
-            if (window._bgmPlaying) return;
-            window._bgmPlaying = true;
-
-            const ctx = new (window.AudioContext || window.webkitAudioContext)();
-
-            const melody = [
-                [261.63, 0.4], [329.63, 0.4], [392.00, 0.4], [523.25, 0.6],
-                [392.00, 0.4], [329.63, 0.4], [261.63, 0.6],
-                [293.66, 0.4], [349.23, 0.4], [440.00, 0.4], [523.25, 0.6],
-                [440.00, 0.4], [349.23, 0.4], [293.66, 0.6],
-            ];
-            let noteIndex = 0;
-
-            function playNote() {
-                if (!window._bgmPlaying) return;
-
-                const [freq, dur] = melody[noteIndex % melody.length];
-                const osc = ctx.createOscillator();
-                const gain = ctx.createGain();
-
-                osc.type = 'sine';
-                osc.frequency.value = freq;
-
-                gain.gain.setValueAtTime(0, ctx.currentTime);
-                gain.gain.linearRampToValueAtTime(0.12, ctx.currentTime + 0.05);
-                gain.gain.exponentialRampToValueAtTime(0.01, ctx.currentTime + dur);
-
-                osc.connect(gain);
-                gain.connect(ctx.destination);
-
-                osc.start(ctx.currentTime);
-                osc.stop(ctx.currentTime + dur);
-
-                noteIndex++;
-                setTimeout(playNote, dur * 1000);
-            }
-
-            playNote();
-        })();
-        </script>
-        """, height=0)
+def start_ordering_round(game: OrderingGame):
+    """새 라운드 시작. 게임 상태는 엔진 객체 하나에 있으므로 키 몇 개만 초기화"""
+    st.session_state.ord_game = game
+    st.session_state.ord_last_feedback = None
+    st.session_state.ord_typing_key = 0
+    st.session_state.ord_celebrated = False
+    st.session_state.ord_rank = None
+
+
+@st.cache_resource
+def get_leaderboard() -> Leaderboard:
+    return Leaderboard()
+
+
+@st.cache_data(ttl=LEADERBOARD_TTL)
+def leaderboard_view(dataset: str, mode: str, k: int = 10) -> tuple[list[dict], int]:
+    """짧은 TTL 캐시를 거쳐 상위 k개 기록과 전체 기록 수를 반환"""
+    board = get_leaderboard()
+    return board.top(dataset, mode, k), board.size(dataset, mode)
+
+
+def format_elapsed(elapsed: float) -> str:
+    return f"{int(elapsed // 60)}분 {int(elapsed % 60)}초"
+
+
+def render_leaderboard(dataset: str, mode: str):
+    """데이터셋/모드별 리더보드 표 표시"""
+    rows, size = leaderboard_view(dataset, mode)
+    if not rows:
+        st.caption("아직 기록이 없습니다. 첫 번째 기록의 주인공이 되어 보세요!")
+        return
+    lines = ["| 순위 | 이름 | 틀린 횟수 | 소요 시간 |", "|---:|---|---:|---:|"]
+    for row in rows:
+        medal = {1: "🥇", 2: "🥈", 3: "🥉"}.get(row["rank"], str(row["rank"]))
+        lines.append(f"| {medal} | {row['name']} | {row['wrong_count']}회 | {format_elapsed(row['elapsed'])} |")
+    st.markdown("\n".join(lines))
+    st.caption(f"전체 {size}개 기록 · {LEADERBOARD_TTL}초마다 갱신")
+
+
+def render_client_store(font_controls: bool = False):
+    """Sync browser-side preferences and progress with localStorage.
+
+    Rendered once per run. The first run of a session asks the browser for
+    what it stored (``client_prefs``/``client_progress``); later runs only
+    push changed prefs and the current progress snapshot, which does not
+    trigger a rerun. With ``font_controls`` it also shows A-/A+ buttons that
+    set the ``--banki-font-size`` CSS variable directly.
+    """
+    global _client_store_component
+    if _client_store_component is None:
+        import streamlit.components.v1 as components
+
+        _client_store_component = components.declare_component("banki_client_store", path=CLIENT_STORE_DIR)
+
+    load = "client_prefs" not in st.session_state
+    study = current_study()
+    if study is not None:
+        progress = {"s": study.token, "file": study.file_name, "done": len(study.completed)}
+    elif st.session_state.pop("client_progress_clear", False):
+        progress = False
     else:
-        components.html("""
-        <script>
-        window._bgmPlaying = false;
-        </script>
-        """, height=0)
+        progress = None
+    value = _client_store_component(
+        prefs=None if load else st.session_state.client_prefs, progress=progress, load=load,
+        font_controls=font_controls, default_font=DEFAULT_FONT_SIZE, min_font=MIN_FONT_SIZE,
+        max_font=MAX_FONT_SIZE, font_step=FONT_STEP, key="client_store", default=None,
+    )
+    if load and value is not None:
+        st.session_state.client_prefs = value.get("prefs") or {}
+        st.session_state.client_progress = value.get("progress")
+
+
+def client_pref(name: str, default=None):
+    return st.session_state.get("client_prefs", {}).get(name, default)
+
+
+def set_client_prefs(**prefs):
+    st.session_state.setdefault("client_prefs", {}).update(prefs)
+
+
+BGM_MELODY = (
+    (261.63, 0.4), (329.63, 0.4), (392.00, 0.4), (523.25, 0.6),
+    (392.00, 0.4), (329.63, 0.4), (261.63, 0.6),
+    (293.66, 0.4), (349.23, 0.4), (440.00, 0.4), (523.25, 0.6),
+    (440.00, 0.4), (349.23, 0.4), (293.66, 0.6),
+)
+BGM_SAMPLE_RATE = 22050
+
+_BGM_PLAYER_JS = """
+<script>
+(function() {
+    // 부모 창에 하나만 두는 플레이어: AudioContext와 미리 렌더링한 AudioBuffer를 재사용
+    const host = window.parent;
+    const command = %(command)s;
+    let bgm = host.__bankiBgm;
+    if (!bgm) {
+        if (command !== 'play') return;
+        bgm = host.__bankiBgm = {ctx: null, buffer: null, source: null, pending: null};
+    }
+
+    function renderBuffer() {
+        const melody = %(melody)s;
+        const rate = %(rate)d;
+        const length = Math.ceil(melody.reduce((sum, note) => sum + note[1], 0) * rate);
+        const offline = new OfflineAudioContext(1, length, rate);
+        let t = 0;
+        for (const [freq, dur] of melody) {
+            const osc = offline.createOscillator();
+            const gain = offline.createGain();
+            osc.type = 'sine';
+            osc.frequency.value = freq;
+            gain.gain.setValueAtTime(0, t);
+            gain.gain.linearRampToValueAtTime(0.12, t + 0.05);
+            gain.gain.exponentialRampToValueAtTime(0.001, t + dur);
+            osc.connect(gain);
+            gain.connect(offline.destination);
+            osc.start(t);
+            osc.stop(t + dur);
+            t += dur;
+        }
+        return offline.startRendering();
+    }
+
+    function play() {
+        if (bgm.source) return;
+        if (!bgm.ctx) {
+            bgm.ctx = new (host.AudioContext || host.webkitAudioContext)();
+            // 자동 재생 정책으로 멈춰 있으면 첫 클릭에서 재개
+            host.document.addEventListener('pointerdown', () => {
+                if (bgm.source && bgm.ctx.state === 'suspended') bgm.ctx.resume();
+            });
+        }
+        bgm.pending = bgm.pending || (bgm.buffer ? Promise.resolve(bgm.buffer) : renderBuffer());
+        bgm.pending.then((buffer) => {
+            bgm.buffer = buffer;
+            bgm.pending = null;
+            if (bgm.source || bgm.wanted !== 'play') return;
+            const source = bgm.ctx.createBufferSource();
+            source.buffer = buffer;
+            source.loop = true;
+            source.connect(bgm.ctx.destination);
+            source.start();
+            bgm.source = source;
+            bgm.ctx.resume();
+        });
+    }
+
+    function stop() {
+        if (bgm.source) {
+            bgm.source.stop();
+            bgm.source.disconnect();
+            bgm.source = null;
+        }
+        if (bgm.ctx) bgm.ctx.suspend();
+    }
+
+    bgm.wanted = command;
+    command === 'play' ? play() : stop();
+})();
+</script>
+"""
+
+
+def render_bgm_player(is_playing: bool):
+    """BGM 재생/정지 명령 전달.
+
+    오디오는 부모 창에 한 번만 만든 AudioContext가 미리 렌더링한 AudioBuffer를
+    반복 재생한다. iframe 내용은 재생 여부에만 의존하므로 rerun마다 다시
+    마운트되지 않는다.
+    """
+    import streamlit.components.v1 as components
+
+    components.html(_BGM_PLAYER_JS % {
+        "command": json.dumps("play" if is_playing else "stop"),
+        "melody": json.dumps(BGM_MELODY),
+        "rate": BGM_SAMPLE_RATE,
+    }, height=0)
+
+
+def sync_bgm_player():
+    """게임 중이고 BGM이 켜져 있을 때만 재생; 한 번 켠 뒤에는 다른 화면에서 정지 명령 전달"""
+    playing = bool(st.session_state.get("ord_game_started") and st.session_state.get("ord_bgm_on"))
+    if playing or st.session_state.get("bgm_mounted"):
+        st.session_state.bgm_mounted = True
+        render_bgm_player(playing)
 
 
 def render_theme_selection():
@@ -1186,12 +1802,28 @@ def render_theme_selection():
             st.session_state.selected_theme = "ordering"
             st.rerun()
 
+    # 이 브라우저에 남은 학습 기록이 있으면 설정 없이 바로 이어서
+    progress = st.session_state.get("client_progress")
+    if progress and get_study_store().get(progress.get("s")) is not None:
+        st.markdown("")
+        label = f"▶️ 이어서 학습하기 — {os.path.splitext(progress['file'])[0]} ({progress['done']}구절 완료)"
+        if st.button(label, use_container_width=True):
+            st.query_params["s"] = progress["s"]
+            st.session_state.selected_theme = "verse"
+            st.rerun()
+
 
 def render_ordering_setup():
     """단어 순서 외우기 설정 화면"""
     st.markdown("### 🔢 단어 순서 외우기")
     st.markdown("---")
 
+    play_style = st.radio("플레이 방식", ["🙋 혼자 하기", "📡 방 만들기", "🚪 방 참가하기"],
+                          horizontal=True, label_visibility="collapsed")
+    if play_style == "🚪 방 참가하기":
+        render_room_join()
+        return
+
     user_name = st.text_input("닉네임 (선택사항)", placeholder="닉네임을 입력하세요", key="ord_name_input")
 
     st.markdown("**데이터 선택**")
@@ -1222,7 +1854,7 @@ def render_ordering_setup():
         if uploaded:
             result = load_ordering_csv_from_upload(uploaded)
             if result is None:
-                st.error("CSV에 order, name_ko, name_en 컬럼이 필요합니다.")
+                st.error("CSV에 order(숫자), name_ko, name_en 컬럼이 필요합니다.")
             else:
                 word_list = result
                 dataset_name = uploaded.name
@@ -1232,35 +1864,35 @@ def render_ordering_setup():
                                    "✍️ 받아쓰기 - 순서대로 직접 입력"],
                          label_visibility="collapsed")
 
+    if dataset_name:
+        with st.expander("🏆 리더보드"):
+            render_leaderboard(dataset_name, "클릭 배열" if "클릭" in game_mode else "받아쓰기")
+
     max_wrong = st.number_input("허용 오답 수", min_value=1, max_value=10, value=3)
 
-    bgm_on = st.toggle("🎵 배경음악", value=False)
+    bgm_on = st.toggle("🎵 배경음악", value=bool(client_pref("bgm", False)))
 
     col1, col2 = st.columns(2)
     with col1:
-        if st.button("🎮 게임 시작", type="primary", use_container_width=True):
+        hosting = play_style == "📡 방 만들기"
+        if st.button("📡 방 만들기" if hosting else "🎮 게임 시작", type="primary", use_container_width=True):
             if word_list is None or len(word_list) == 0:
                 st.error("데이터를 선택해주세요.")
+            elif hosting:
+                mode = "클릭 배열" if "클릭" in game_mode else "받아쓰기"
+                room = get_room_registry().create(user_name.strip() or "호스트", word_list,
+                                                  dataset_name, mode, max_wrong)
+                st.session_state.ord_room_code = room.code
+                st.session_state.ord_room_role = "host"
+                st.rerun()
             else:
                 st.session_state.ord_game_started = True
                 st.session_state.ord_username = user_name.strip()
                 st.session_state.ord_mode = "클릭 배열" if "클릭" in game_mode else "받아쓰기"
-                st.session_state.ord_max_wrong = max_wrong
-                st.session_state.ord_wrong_count = 0
-                st.session_state.ord_current_index = 0
-                st.session_state.ord_correct_answers = []
-                st.session_state.ord_word_list = word_list
-                shuffled = list(range(len(word_list)))
-                random.shuffle(shuffled)
-                st.session_state.ord_shuffled_indices = shuffled
-                st.session_state.ord_start_time = time.time()
-                st.session_state.ord_game_over = False
-                st.session_state.ord_game_clear = False
                 st.session_state.ord_bgm_on = bgm_on
-                st.session_state.ord_show_hint = False
+                set_client_prefs(bgm=bgm_on)
                 st.session_state.ord_dataset_name = dataset_name
-                st.session_state.ord_last_feedback = None
-                st.session_state.ord_typing_key = 0
+                start_ordering_round(OrderingGame(word_list, max_wrong))
                 st.rerun()
     with col2:
         if st.button("🏠 돌아가기", use_container_width=True):
@@ -1268,19 +1900,174 @@ def render_ordering_setup():
             st.rerun()
 
 
+# ------------------------------------------------------------
+# 방 모드: 호스트가 같은 시드로 라운드를 시작하고 진행 상황을 실시간 공유
+# ------------------------------------------------------------
+
+@st.cache_resource
+def get_room_registry() -> RoomRegistry:
+    return RoomRegistry()
+
+
+def _current_room() -> Room | None:
+    code = st.session_state.get("ord_room_code")
+    return get_room_registry().get(code) if code else None
+
+
+def _room_subscription(room: Room):
+    """세션별 구독 (bounded queue) 을 한 번 만들고 재사용"""
+    sub = st.session_state.get("ord_room_sub")
+    if sub is None or sub.closed or sub.topic != room.topic:
+        sub = room.subscribe()
+        st.session_state.ord_room_sub = sub
+        st.session_state.ord_room_version = room.version
+    return sub
+
+
+def start_room_round(room: Room):
+    """방의 현재 라운드 (공유 시드) 로 게임 시작"""
+    st.session_state.ord_game_started = True
+    st.session_state.ord_mode = room.mode
+    st.session_state.ord_dataset_name = room.dataset_name
+    st.session_state.ord_room_round = room.round
+    st.session_state.ord_room_reported = None
+    start_ordering_round(OrderingGame(room.words, room.max_wrong, seed=room.seed,
+                                      started_at=room.started_at))
+
+
+def report_room_progress(game: OrderingGame):
+    """참가자의 진행 상황이 바뀌었을 때만 방에 알림"""
+    if st.session_state.get("ord_room_role") != "player":
+        return
+    room = _current_room()
+    if room is None:
+        return
+    state = "clear" if game.is_clear else "over" if game.is_over else "playing"
+    snapshot = (st.session_state.ord_room_round, game.current, game.wrong_count, state)
+    if st.session_state.get("ord_room_reported") != snapshot:
+        st.session_state.ord_room_reported = snapshot
+        room.report(st.session_state.ord_username, game.current, game.wrong_count, state, game.elapsed())
+
+
+@functools.lru_cache(maxsize=64)
+def _scoreboard_markdown(room: Room, version: int, limit: int | None) -> tuple[str, str]:
+    """점수판 제목과 표. 방의 버전마다 한 번만 만들어 모든 세션이 공유"""
+    _, board = room.snapshot()
+    total = len(room.words)
+    state_icons = {"clear": "🏁", "playing": "🏃", "over": "💀", "waiting": "⏳"}
+    lines = ["| # | 이름 | 진행 | 틀린 횟수 |", "|---:|---|---|---:|"]
+    for i, player in enumerate(board[:limit] if limit else board):
+        lines.append(f"| {i + 1} | {state_icons[player['state']]} {player['name']} | "
+                     f"{player['current']} / {total} | {player['wrong_count']} |")
+    return f"**📡 방 {room.code} · 참가자 {len(board)}명**", "\n".join(lines) if board else ""
+
+
+@st.fragment(run_every=ROOM_REFRESH_SECONDS)
+def render_room_scoreboard(limit: int | None = None):
+    """실시간 점수판. 구독 큐에 새 이벤트가 있을 때만 새 버전의 점수판을 가져옴"""
+    room = _current_room()
+    if room is None:
+        st.caption("방이 닫혔습니다.")
+        return
+    # Streamlit cannot wake a session from the server, so this still ticks
+    # every second. A tick without events only resends the shared table (no
+    # lock, no sort). After events, sorting and formatting happen once per
+    # room version for all sessions (see benchmarks/bench_rooms.py).
+    sub = _room_subscription(room)
+    if sub.drain() or sub.dropped:
+        sub.dropped = 0
+        st.session_state.ord_room_version = room.version
+
+    # 참가자: 호스트가 새 라운드를 시작하면 전체 화면을 다시 그림
+    if (st.session_state.get("ord_room_role") == "player"
+            and not st.session_state.get("ord_game_started", False)
+            and room.round > st.session_state.get("ord_room_round", 0)):
+        st.rerun(scope="app")
+
+    title, table = _scoreboard_markdown(room, st.session_state.ord_room_version, limit)
+    st.markdown(title)
+    if table:
+        st.markdown(table)
+
+
+def render_room_join():
+    """방 코드로 참가"""
+    code = st.text_input("방 코드", max_chars=4, placeholder="4자리 코드")
+    user_name = st.text_input("닉네임", placeholder="닉네임을 입력하세요", key="ord_room_name_input")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🚪 참가하기", type="primary", use_container_width=True):
+            room = get_room_registry().get(code)
+            if room is None:
+                st.error("해당 코드의 방이 없습니다.")
+            elif not user_name.strip():
+                st.error("닉네임을 입력해주세요.")
+            else:
+                try:
+                    room.join(user_name.strip())
+                except NicknameTaken:
+                    st.error("이 방에서 이미 쓰는 닉네임입니다. 다른 닉네임을 입력해주세요.")
+                else:
+                    st.session_state.ord_room_code = room.code
+                    st.session_state.ord_room_role = "player"
+                    st.session_state.ord_room_round = room.round
+                    st.session_state.ord_username = user_name.strip()
+                    st.rerun()
+    with col2:
+        if st.button("🏠 돌아가기", use_container_width=True, key="room_join_back"):
+            st.session_state.selected_theme = None
+            st.rerun()
+
+
+def render_room_lobby():
+    """방 대기실 (호스트: 라운드 시작 / 참가자: 시작 대기)"""
+    room = _current_room()
+    if room is None:
+        st.warning("방이 닫혔습니다.")
+        if st.button("🏠 처음으로", use_container_width=True, key="room_closed_home"):
+            reset_ordering_state()
+            st.rerun()
+        return
+
+    is_host = st.session_state.ord_room_role == "host"
+    if not is_host and room.round > st.session_state.get("ord_room_round", 0):
+        start_room_round(room)
+        st.rerun()
+
+    st.markdown(f"### 📡 방 코드: `{room.code}`")
+    st.caption(f"📊 {room.dataset_name} | {room.mode} | 허용 오답 {room.max_wrong}회")
+
+    if is_host:
+        if st.button("🎬 라운드 시작" if room.round == 0 else "🎬 새 라운드 시작",
+                     type="primary", use_container_width=True):
+            room.start_round()
+            st.rerun()
+    else:
+        st.info("⏳ 호스트가 라운드를 시작하기를 기다리는 중입니다...")
+
+    render_room_scoreboard()
+
+    if st.button("🚪 나가기" if not is_host else "🔒 방 닫기", use_container_width=True, key="room_leave"):
+        if is_host:
+            get_room_registry().close(room.code)
+        reset_ordering_state()
+        st.rerun()
+
+
 def render_ordering_game():
     """게임 메인 분기"""
-    if st.session_state.get("ord_game_clear", False):
+    game = st.session_state.ord_game
+    if st.session_state.get("ord_room_code"):
+        report_room_progress(game)
+        with st.sidebar:
+            render_room_scoreboard(limit=10)
+    if game.is_clear:
         render_ordering_certificate()
         return
-    if st.session_state.get("ord_game_over", False):
+    if game.is_over:
         render_ordering_game_over()
         return
 
-    # BGM
-    if st.session_state.get("ord_bgm_on", False):
-        render_bgm_player(True)
-
     if st.session_state.ord_mode == "클릭 배열":
         render_click_mode()
     else:
@@ -1289,12 +2076,12 @@ def render_ordering_game():
 
 def _render_ordering_header():
     """게임 공통 헤더 (제목, 하트, 진행률, BGM 토글, 처음으로)"""
-    word_list = st.session_state.ord_word_list
-    total = len(word_list)
-    current = st.session_state.ord_current_index
-    max_wrong = st.session_state.ord_max_wrong
-    wrong_count = st.session_state.ord_wrong_count
-    remaining = max_wrong - wrong_count
+    game = st.session_state.ord_game
+    total = game.total
+    current = game.current
+    max_wrong = game.max_wrong
+    wrong_count = game.wrong_count
+    remaining = game.remaining_lives
     dataset_name = st.session_state.ord_dataset_name
     mode_label = "🖱️ 클릭 배열" if st.session_state.ord_mode == "클릭 배열" else "✍️ 받아쓰기"
 
@@ -1306,8 +2093,7 @@ def _render_ordering_header():
         bgm_val = st.toggle("🎵 BGM", value=st.session_state.get("ord_bgm_on", False), key="bgm_toggle_game")
         if bgm_val != st.session_state.get("ord_bgm_on", False):
             st.session_state.ord_bgm_on = bgm_val
-            if not bgm_val:
-                render_bgm_player(False)
+            set_client_prefs(bgm=bgm_val)
             st.rerun()
         if st.button("🏠 처음으로", use_container_width=True, key="home_btn"):
             reset_ordering_state()
@@ -1318,23 +2104,39 @@ def _render_ordering_header():
     hearts = "❤️" * remaining + "🖤" * wrong_count
     st.markdown(f'<div style="font-size:24px; text-align:center;">{hearts} (남은 기회: {remaining}/{max_wrong})</div>', unsafe_allow_html=True)
 
-    # Progress
+    # Progress + live clock
     st.progress(current / total if total else 0)
-    st.caption(f"진행률: {current} / {total}")
+    pcol1, pcol2 = st.columns([3, 1])
+    with pcol1:
+        st.caption(f"진행률: {current} / {total}")
+    with pcol2:
+        render_ordering_clock(game.elapsed())
 
 
-def render_click_mode():
-    """클릭 배열 모드"""
-    _render_ordering_header()
+def render_ordering_clock(elapsed: float):
+    """경과 시간 표시. 시계는 브라우저에서 매초 갱신되므로 서버 rerun이 없음"""
+    import streamlit.components.v1 as components
 
-    word_list = st.session_state.ord_word_list
-    total = len(word_list)
-    current = st.session_state.ord_current_index
-    max_wrong = st.session_state.ord_max_wrong
-    wrong_count = st.session_state.ord_wrong_count
-    remaining = max_wrong - wrong_count
+    components.html(f"""
+    <div id="clock" style="font: 14px sans-serif; color: #64748b; text-align: right;"></div>
+    <script>
+    (function() {{
+        const base = {elapsed:.3f};
+        const t0 = performance.now();
+        const el = document.getElementById('clock');
+        function tick() {{
+            const s = Math.floor(base + (performance.now() - t0) / 1000);
+            el.textContent = '⏱️ ' + Math.floor(s / 60) + '분 ' + String(s % 60).padStart(2, '0') + '초';
+        }}
+        tick();
+        setInterval(tick, 1000);
+    }})();
+    </script>
+    """, height=24)
 
-    # Feedback from last action
+
+def _render_ordering_feedback():
+    """직전 동작의 결과 메시지를 한 번 표시"""
     feedback = st.session_state.get("ord_last_feedback")
     if feedback:
         if feedback["type"] == "success":
@@ -1343,16 +2145,37 @@ def render_click_mode():
             st.error(feedback["msg"])
         st.session_state.ord_last_feedback = None
 
+
+def _render_answer_chain(title: str):
+    """지금까지 맞춘 단어 배열 표시"""
+    correct_answers = st.session_state.ord_game.correct_answers
+    if correct_answers:
+        chain = " → ".join([f"{i+1}.{get_book_emoji(w)} {w}" for i, w in enumerate(correct_answers)])
+        st.markdown(f"""<div style="font-size:16px; line-height:2; padding:15px; background:#f0fdf4;
+            border-radius:12px; border-left:4px solid #22c55e; margin:10px 0;">
+            ✅ {title}:<br>{chain}</div>""", unsafe_allow_html=True)
+
+
+def render_click_mode():
+    """클릭 배열 모드"""
+    _render_ordering_header()
+
+    game = st.session_state.ord_game
+    word_list = game.words
+    current = game.current
+
+    # Feedback from last action
+    _render_ordering_feedback()
+
     # Auto-hint when remaining == 1
-    if remaining == 1 and current < total:
+    if game.auto_hint:
         hint_text = get_hint_text(word_list[current], 2)
         st.warning(hint_text)
 
     st.markdown("---")
 
     # Button grid - show remaining words in shuffled order
-    chosen_set = set(range(current))  # indices already answered
-    remaining_indices = [i for i in st.session_state.ord_shuffled_indices if i not in chosen_set]
+    remaining_indices = game.remaining_indices()
 
     cols_per_row = 4
     rows = [remaining_indices[i:i+cols_per_row] for i in range(0, len(remaining_indices), cols_per_row)]
@@ -1365,37 +2188,24 @@ def render_click_mode():
                 emoji = get_book_emoji(word)
                 btn_label = f"{emoji} {word}" if emoji else word
                 # Highlight when auto-hint and this is the correct answer
-                btn_type = "primary" if (remaining == 1 and word_idx == current) else "secondary"
+                btn_type = "primary" if (game.auto_hint and word_idx == current) else "secondary"
                 if st.button(btn_label, key=f"word_btn_{word_idx}_{current}", use_container_width=True, type=btn_type):
-                    if word_idx == current:
-                        st.session_state.ord_correct_answers.append(word)
-                        st.session_state.ord_current_index += 1
-                        st.session_state.ord_show_hint = False
-                        if st.session_state.ord_current_index >= total:
-                            st.session_state.ord_game_clear = True
+                    if game.choose(word_idx):
                         st.session_state.ord_last_feedback = {"type": "success", "msg": f"✅ 정답! {current+1}.{get_book_emoji(word)} {word}"}
-                        st.rerun()
                     else:
-                        st.session_state.ord_wrong_count += 1
-                        if st.session_state.ord_wrong_count >= max_wrong:
-                            st.session_state.ord_game_over = True
                         st.session_state.ord_last_feedback = {"type": "error", "msg": f"❌ 틀렸습니다! '{get_book_emoji(word)} {word}'는 {current+1}번이 아닙니다"}
-                        st.rerun()
+                    st.rerun()
 
     # Answer chain
     st.markdown("---")
-    if st.session_state.ord_correct_answers:
-        chain = " → ".join([f"{i+1}.{get_book_emoji(w)} {w}" for i, w in enumerate(st.session_state.ord_correct_answers)])
-        st.markdown(f"""<div style="font-size:16px; line-height:2; padding:15px; background:#f0fdf4;
-            border-radius:12px; border-left:4px solid #22c55e; margin:10px 0;">
-            ✅ 정답 배열:<br>{chain}</div>""", unsafe_allow_html=True)
+    _render_answer_chain("정답 배열")
 
     # Hint button
-    if current < total:
+    if not game.is_clear:
         if st.button("💡 힌트 보기", use_container_width=True):
-            st.session_state.ord_show_hint = True
+            game.request_hint()
             st.rerun()
-        if st.session_state.get("ord_show_hint", False):
+        if game.show_hint:
             st.info(get_hint_text(word_list[current], 1))
 
 
@@ -1403,36 +2213,23 @@ def render_typing_mode():
     """받아쓰기 모드"""
     _render_ordering_header()
 
-    word_list = st.session_state.ord_word_list
-    total = len(word_list)
-    current = st.session_state.ord_current_index
-    max_wrong = st.session_state.ord_max_wrong
-    wrong_count = st.session_state.ord_wrong_count
-    remaining = max_wrong - wrong_count
+    game = st.session_state.ord_game
+    word_list = game.words
+    current = game.current
 
     # Feedback
-    feedback = st.session_state.get("ord_last_feedback")
-    if feedback:
-        if feedback["type"] == "success":
-            st.success(feedback["msg"])
-        else:
-            st.error(feedback["msg"])
-        st.session_state.ord_last_feedback = None
+    _render_ordering_feedback()
 
     # Auto-hint
-    if remaining == 1 and current < total:
+    if game.auto_hint:
         st.warning(get_hint_text(word_list[current], 2))
 
     st.markdown("---")
 
     # Show correct answers so far
-    if st.session_state.ord_correct_answers:
-        chain = " → ".join([f"{i+1}.{get_book_emoji(w)} {w}" for i, w in enumerate(st.session_state.ord_correct_answers)])
-        st.markdown(f"""<div style="font-size:16px; line-height:2; padding:15px; background:#f0fdf4;
-            border-radius:12px; border-left:4px solid #22c55e; margin:10px 0;">
-            ✅ 지금까지 맞춘 단어:<br>{chain}</div>""", unsafe_allow_html=True)
+    _render_answer_chain("지금까지 맞춘 단어")
 
-    if current < total:
+    if not game.is_clear:
         st.markdown(f"**📝 {current+1}번째 단어를 입력하세요:**")
         typing_key = st.session_state.get("ord_typing_key", 0)
         user_input = st.text_input("단어 입력", key=f"ord_typing_{typing_key}", label_visibility="collapsed",
@@ -1440,40 +2237,44 @@ def render_typing_mode():
 
         col1, col2 = st.columns([2, 1])
         with col1:
-            if st.button("확인", type="primary", use_container_width=True) or False:
+            if st.button("확인", type="primary", use_container_width=True):
                 answer = word_list[current]
-                if user_input.strip() == answer:
-                    st.session_state.ord_correct_answers.append(answer)
-                    st.session_state.ord_current_index += 1
-                    st.session_state.ord_show_hint = False
-                    st.session_state.ord_typing_key = typing_key + 1
-                    if st.session_state.ord_current_index >= total:
-                        st.session_state.ord_game_clear = True
-                    st.session_state.ord_last_feedback = {"type": "success", "msg": f"✅ 정답! {current+1}.{get_book_emoji(answer)} {answer}"}
-                    st.rerun()
-                elif user_input.strip():
-                    st.session_state.ord_wrong_count += 1
+                result = game.submit(user_input)
+                if result is not None:
                     st.session_state.ord_typing_key = typing_key + 1
-                    if st.session_state.ord_wrong_count >= max_wrong:
-                        st.session_state.ord_game_over = True
-                    st.session_state.ord_last_feedback = {"type": "error", "msg": "❌ 틀렸습니다!"}
+                    if result:
+                        st.session_state.ord_last_feedback = {"type": "success", "msg": f"✅ 정답! {current+1}.{get_book_emoji(answer)} {answer}"}
+                    else:
+                        st.session_state.ord_last_feedback = {"type": "error", "msg": "❌ 틀렸습니다!"}
                     st.rerun()
         with col2:
             if st.button("💡 힌트 보기", use_container_width=True, key="hint_typing"):
-                st.session_state.ord_show_hint = True
+                game.request_hint()
                 st.rerun()
 
-        if st.session_state.get("ord_show_hint", False):
+        if game.show_hint:
             st.info(get_hint_text(word_list[current], 1))
 
 
+def render_retry_button(game: OrderingGame, key: str):
+    """다시 도전 (방 모드에서는 대기실로 돌아가 호스트의 다음 라운드를 기다림)"""
+    if st.session_state.get("ord_room_code"):
+        if st.button("📡 대기실로", type="primary", use_container_width=True, key=key):
+            st.session_state.ord_game_started = False
+            st.rerun()
+    elif st.button("🔄 다시 도전하기", type="primary", use_container_width=True, key=key):
+        start_ordering_round(game.restart())
+        st.rerun()
+
+
 def render_ordering_game_over():
     """게임 오버 화면"""
     st.markdown("<h2 style='text-align:center;'>😢 게임 오버</h2>", unsafe_allow_html=True)
 
-    word_list = st.session_state.ord_word_list
-    total = len(word_list)
-    matched = len(st.session_state.ord_correct_answers)
+    game = st.session_state.ord_game
+    word_list = game.words
+    total = game.total
+    matched = game.current
 
     st.markdown(f"<p style='text-align:center; font-size:20px;'>{matched} / {total} 단어까지 맞췄습니다</p>", unsafe_allow_html=True)
 
@@ -1486,35 +2287,7 @@ def render_ordering_game_over():
 
     col1, col2 = st.columns(2)
     with col1:
-        if st.button("🔄 다시 도전하기", type="primary", use_container_width=True):
-            word_list_saved = st.session_state.ord_word_list
-            mode = st.session_state.ord_mode
-            max_wrong = st.session_state.ord_max_wrong
-            username = st.session_state.ord_username
-            bgm = st.session_state.ord_bgm_on
-            dataset = st.session_state.ord_dataset_name
-            reset_ordering_state()
-            st.session_state.selected_theme = "ordering"
-            st.session_state.ord_game_started = True
-            st.session_state.ord_username = username
-            st.session_state.ord_mode = mode
-            st.session_state.ord_max_wrong = max_wrong
-            st.session_state.ord_wrong_count = 0
-            st.session_state.ord_current_index = 0
-            st.session_state.ord_correct_answers = []
-            st.session_state.ord_word_list = word_list_saved
-            shuffled = list(range(len(word_list_saved)))
-            random.shuffle(shuffled)
-            st.session_state.ord_shuffled_indices = shuffled
-            st.session_state.ord_start_time = time.time()
-            st.session_state.ord_game_over = False
-            st.session_state.ord_game_clear = False
-            st.session_state.ord_bgm_on = bgm
-            st.session_state.ord_show_hint = False
-            st.session_state.ord_dataset_name = dataset
-            st.session_state.ord_last_feedback = None
-            st.session_state.ord_typing_key = 0
-            st.rerun()
+        render_retry_button(game, "retry_gameover")
     with col2:
         if st.button("🏠 처음으로", use_container_width=True, key="home_gameover"):
             reset_ordering_state()
@@ -1524,14 +2297,15 @@ def render_ordering_game_over():
 
 def render_ordering_certificate():
     """게임 클리어 인증서 화면"""
-    st.balloons()
+    game = st.session_state.ord_game
+    if not st.session_state.get("ord_celebrated", False):
+        st.session_state.ord_celebrated = True
+        st.balloons()
 
-    elapsed = time.time() - st.session_state.ord_start_time
-    minutes = int(elapsed // 60)
-    seconds = int(elapsed % 60)
-    time_str = f"{minutes}분 {seconds}초"
+    elapsed = game.elapsed()
+    time_str = format_elapsed(elapsed)
 
-    wrong_count = st.session_state.ord_wrong_count
+    wrong_count = game.wrong_count
     name = st.session_state.ord_username if st.session_state.ord_username else "익명의 도전자"
     dataset = st.session_state.ord_dataset_name
     mode = st.session_state.ord_mode
@@ -1569,37 +2343,20 @@ def render_ordering_certificate():
     )
     st.markdown(html, unsafe_allow_html=True)
 
+    render_certificate_downloads(
+        name, dataset, f"틀린 횟수 {wrong_count}회",
+        (f"모드: {mode}", f"소요 시간: {time_str}", time.strftime("%Y-%m-%d")),
+        title="단어 순서 암기 인증서", key="ord_cert",
+    )
+
+    if st.session_state.get("ord_rank") is None:
+        st.session_state.ord_rank = get_leaderboard().record(dataset, mode, name, wrong_count, elapsed)
+    st.markdown(f"### 🏅 {dataset} · {mode} 순위: {st.session_state.ord_rank}위")
+    render_leaderboard(dataset, mode)
+
     col1, col2 = st.columns(2)
     with col1:
-        if st.button("🔄 다시 도전하기", type="primary", use_container_width=True, key="retry_clear"):
-            word_list_saved = st.session_state.ord_word_list
-            mode = st.session_state.ord_mode
-            max_wrong = st.session_state.ord_max_wrong
-            username = st.session_state.ord_username
-            bgm = st.session_state.ord_bgm_on
-            dataset = st.session_state.ord_dataset_name
-            reset_ordering_state()
-            st.session_state.selected_theme = "ordering"
-            st.session_state.ord_game_started = True
-            st.session_state.ord_username = username
-            st.session_state.ord_mode = mode
-            st.session_state.ord_max_wrong = max_wrong
-            st.session_state.ord_wrong_count = 0
-            st.session_state.ord_current_index = 0
-            st.session_state.ord_correct_answers = []
-            st.session_state.ord_word_list = word_list_saved
-            shuffled = list(range(len(word_list_saved)))
-            random.shuffle(shuffled)
-            st.session_state.ord_shuffled_indices = shuffled
-            st.session_state.ord_start_time = time.time()
-            st.session_state.ord_game_over = False
-            st.session_state.ord_game_clear = False
-            st.session_state.ord_bgm_on = bgm
-            st.session_state.ord_show_hint = False
-            st.session_state.ord_dataset_name = dataset
-            st.session_state.ord_last_feedback = None
-            st.session_state.ord_typing_key = 0
-            st.rerun()
+        render_retry_button(game, "retry_clear")
     with col2:
         if st.button("🏠 처음으로", use_container_width=True, key="home_clear"):
             reset_ordering_state()
@@ -0,0 +1,76 @@
+"""Load latency and retained memory: stdlib CSV loader vs pandas.
+
+    python benchmarks/bench_loader.py --repeat 200
+
+For every deck and ordering dataset in ``data/`` this reports the median time
+to load it and the bytes still allocated while the result is held (what a
+session kept per rerun before decks were cached). The pandas column is
+skipped when pandas is not installed.
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loaders import load_ordering_words, load_verse_deck  # noqa: E402
+from storage import DATA_DIR  # noqa: E402
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+def pandas_verse(file_path):
+    return pd.read_csv(file_path)
+
+
+def pandas_ordering(file_path):
+    return pd.read_csv(file_path).sort_values("order").reset_index(drop=True)["name_ko"].tolist()
+
+
+def measure(loader, file_path: str, repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        loader(file_path)
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = loader(file_path)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del held
+    return statistics.median(timings), retained
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(f"{'file':<28}  {'csv ms':>7}  {'csv KB':>7}  {'pandas ms':>9}  {'pandas KB':>9}")
+    for file_name in sorted(os.listdir(DATA_DIR)):
+        if not file_name.endswith(".csv"):
+            continue
+        file_path = os.path.join(DATA_DIR, file_name)
+        is_ordering = file_name.startswith("bible_books_")
+        ours = measure(load_ordering_words if is_ordering else load_verse_deck, file_path, args.repeat)
+        line = f"{file_name[:28]:<28}  {ours[0] * 1000:>7.3f}  {ours[1] / 1024:>7.1f}"
+        if pd is not None:
+            theirs = measure(pandas_ordering if is_ordering else pandas_verse, file_path, args.repeat)
+            line += f"  {theirs[0] * 1000:>9.3f}  {theirs[1] / 1024:>9.1f}"
+        else:
+            line += f"  {'-':>9}  {'-':>9}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Ordering engine micro-benchmarks (no Streamlit needed).
+
+    python benchmarks/bench_ordering_engine.py --rounds 20000
+
+Measures a full perfect round on the 66-book dataset (one O(1) transition per
+word), a typed round, restarting a round, and replaying a move log.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loaders import load_ordering_words  # noqa: E402
+from ordering_engine import OrderingGame  # noqa: E402
+from storage import DATA_DIR  # noqa: E402
+
+
+def bench(label: str, fn, rounds: int, moves_per_round: int = 0):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    elapsed = time.perf_counter() - started
+    line = f"{label:<16} {rounds / elapsed:>12.0f} rounds/s"
+    if moves_per_round:
+        line += f"  {rounds * moves_per_round / elapsed:>12.0f} moves/s"
+    print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    words = (load_ordering_words(os.path.join(DATA_DIR, "bible_books_ot.csv"))
+             + load_ordering_words(os.path.join(DATA_DIR, "bible_books_nt.csv")))
+    total = len(words)
+
+    def click_round():
+        game = OrderingGame(words, 3, seed=1)
+        for i in range(total):
+            game.choose(i)
+
+    def typed_round():
+        game = OrderingGame(words, 3, seed=1)
+        for word in words:
+            game.submit(word)
+
+    played = OrderingGame(words, 3, seed=7)
+    played.choose(total - 1)
+    played.request_hint()
+    for i in range(total):
+        played.choose(i)
+
+    bench("click round", click_round, args.rounds // 10, total)
+    bench("typed round", typed_round, args.rounds // 10, total)
+    bench("restart", played.restart, args.rounds)
+    bench("replay", lambda: OrderingGame.replay(words, 3, played.seed, played.log),
+          args.rounds // 10, len(played.log))
+    print(f"move log: {len(played.log)} moves, {played.log.itemsize * len(played.log)} bytes")
+
+
+if __name__ == "__main__":
+    main()
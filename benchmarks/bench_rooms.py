@@ -0,0 +1,100 @@
+"""Per-tick cost of live room scoreboards at event size.
+
+    python benchmarks/bench_rooms.py --players 300 --ticks 20
+
+Every player session runs the scoreboard fragment once per
+``ROOM_REFRESH_SECONDS`` tick. The benchmark times the Python work of one
+tick across all sessions (the bus, the room and the table, not Streamlit's
+own rerun and websocket overhead) in three cases:
+
+* ``idle`` - nobody moved since the last tick
+* ``busy, per session`` - every player moved once; each session re-sorts
+  the room and formats its own table (the previous scoreboard)
+* ``busy, shared`` - every player moved once; ``Room.snapshot`` sorts once
+  per version and all sessions share one formatted table
+"""
+import argparse
+import functools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rooms import RoomRegistry  # noqa: E402
+
+STATE_ICONS = {"clear": "🏁", "playing": "🏃", "over": "💀", "waiting": "⏳"}
+
+
+def format_table(room, board) -> str:
+    total = len(room.words)
+    lines = ["| # | 이름 | 진행 | 틀린 횟수 |", "|---:|---|---|---:|"]
+    for i, player in enumerate(board):
+        lines.append(f"| {i + 1} | {STATE_ICONS[player['state']]} {player['name']} | "
+                     f"{player['current']} / {total} | {player['wrong_count']} |")
+    return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=64)
+def shared_table(room, version: int) -> str:
+    return format_table(room, room.snapshot()[1])
+
+
+def per_session_tick(room, sessions):
+    for sub, state in sessions:
+        if sub.drain():
+            state["table"] = format_table(room, room.scoreboard())
+
+
+def shared_tick(room, sessions):
+    for sub, state in sessions:
+        if sub.drain():
+            state["version"] = room.version
+        state["table"] = shared_table(room, state["version"])
+
+
+def move_everyone(room, names, rng):
+    for name in names:
+        room.report(name, rng.randrange(len(room.words)), rng.randrange(3), "playing", rng.random() * 60)
+
+
+def timed(ticks: int, before, tick) -> float:
+    total = 0.0
+    for _ in range(ticks):
+        before()
+        started = time.perf_counter()
+        tick()
+        total += time.perf_counter() - started
+    return total / ticks * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=300)
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    room = RoomRegistry().create("host", [f"w{i}" for i in range(66)], "bench", "click", 3)
+    names = [f"player{i}" for i in range(args.players)]
+    for name in names:
+        room.join(name)
+    room.start_round()
+    sessions = [(room.subscribe(), {"version": room.version}) for _ in names]
+
+    def busy():
+        move_everyone(room, names, rng)
+
+    shared_tick(room, sessions)  # drain the join/start events
+    idle = timed(args.ticks, lambda: None, lambda: shared_tick(room, sessions))
+    per_session = timed(args.ticks, busy, lambda: per_session_tick(room, sessions))
+    shared = timed(args.ticks, busy, lambda: shared_tick(room, sessions))
+    print(f"{args.players} players, {len(room.words)} words, ms per tick (all sessions)")
+    print(f"  idle                {idle:8.2f}")
+    print(f"  busy, per session   {per_session:8.2f}")
+    print(f"  busy, shared        {shared:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Per-session memory of verse study state and the cost of idle spilling.
+
+    python benchmarks/bench_session_memory.py --sessions 500 --cards 1000
+
+Plays every session halfway through a deck (a quarter of the cards scored
+in dictation, some skipped), then compares the deep size of the old
+``st.session_state`` layout (lists and sets of ints) with ``StudySession``.
+It also times spilling all sessions to disk and resuming them.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from study_session import StudySessionStore, deep_sizeof  # noqa: E402
+
+
+def play(rng: random.Random, cards: int):
+    """Yield (card, action) for half a deck; action is skip/done/score."""
+    for card in rng.sample(range(cards), cards // 2):
+        roll = rng.random()
+        yield card, "skip" if roll < 0.1 else "score" if roll < 0.35 else "done"
+
+
+def legacy_state(rng: random.Random, cards: int) -> dict:
+    order = list(range(cards))
+    rng.shuffle(order)
+    state = {"order": order, "current_idx": 0, "completed": set(), "skipped": set(),
+             "history": [], "mode_results": {}}
+    for card, action in play(rng, cards):
+        state["history"].append(card)
+        if action == "skip":
+            state["skipped"].add(card)
+        else:
+            state["completed"].add(card)
+            state["mode_results"][card] = ({"score": 87, "matched": 13, "total": 15}
+                                           if action == "score" else {"completed": True})
+        state["current_idx"] += 1
+    return state
+
+
+def compact_state(store: StudySessionStore, rng: random.Random, cards: int):
+    study = store.create("deck.csv", ("verse_krv",), "테스트", "받아쓰기", "", True, cards)
+    for card, action in play(rng, cards):
+        if action == "skip":
+            study.skip(card)
+        elif action == "score":
+            study.complete(card, {"score": 87, "matched": 13, "total": 15},
+                           (card, "reading", False, True, "typed answer", "typed answer"))
+        else:
+            study.complete(card, {"completed": True})
+    return study
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--cards", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    legacy = sum(deep_sizeof(legacy_state(random.Random(i), args.cards)) for i in range(args.sessions))
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = StudySessionStore(directory, idle_seconds=0)
+        tokens = [compact_state(store, random.Random(i), args.cards).token for i in range(args.sessions)]
+        compact = store.stats()["bytes"]
+
+        started = time.perf_counter()
+        spilled = store.evict_idle(now=time.time() + 1)
+        spill_time = time.perf_counter() - started
+        disk = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+        started = time.perf_counter()
+        for token in tokens:
+            store.get(token)
+        resume_time = time.perf_counter() - started
+
+    n = args.sessions
+    print(f"{n} sessions x {args.cards} cards (half played)")
+    print(f"  lists/sets state   {legacy / n / 1024:>8.1f} KiB/session  {legacy / 2 ** 20:>7.1f} MiB total")
+    print(f"  StudySession       {compact / n / 1024:>8.1f} KiB/session  {compact / 2 ** 20:>7.1f} MiB total")
+    print(f"  spilled to disk    {disk / n / 1024:>8.1f} KiB/session  "
+          f"({spilled} in {spill_time * 1000:.0f}ms, resumed in {resume_time * 1000:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Cold-start time and baseline RSS of a fresh app process.
+
+    python benchmarks/bench_startup.py --runs 5 --importtime
+
+Each scenario runs in a new interpreter so nothing is warm:
+
+* ``import app`` - module import only (what every worker pays at boot)
+* ``theme page`` - first script run of the theme selection page via
+  ``streamlit.testing``, i.e. what the first visitor of a worker waits for
+
+For each scenario the median wall time, peak RSS and whether pandas ended up
+imported are reported. ``--importtime`` also lists the slowest imports.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+PROBE = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "pandas": "pandas" in sys.modules,
+}}))
+"""
+
+SCENARIOS = {
+    "import app": "import app",
+    "theme page": (
+        "from streamlit.testing.v1 import AppTest\n"
+        "AppTest.from_file({app!r}).run(timeout=60)"
+    ),
+}
+
+
+def run_probe(body: str, importtime: bool = False) -> tuple[dict, str]:
+    code = PROBE.format(root=ROOT, body=body.format(app=APP_PATH))
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    proc = subprocess.run(cmd + ["-c", code], capture_output=True, text=True, cwd=ROOT, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def slowest_imports(stderr: str, top: int) -> list[tuple[int, str]]:
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true")
+    args = parser.parse_args(argv)
+
+    print(f"{'scenario':<12}  {'median s':>8}  {'RSS MB':>7}  pandas")
+    for name, body in SCENARIOS.items():
+        results = [run_probe(body)[0] for _ in range(args.runs)]
+        seconds = statistics.median(r["seconds"] for r in results)
+        rss_mb = statistics.median(r["rss_kb"] for r in results) / 1024
+        pandas_loaded = "yes" if any(r["pandas"] for r in results) else "no"
+        print(f"{name:<12}  {seconds:>8.3f}  {rss_mb:>7.1f}  {pandas_loaded}")
+
+    if args.importtime:
+        _, stderr = run_probe(SCENARIOS["theme page"], importtime=True)
+        print("\nslowest imports (cumulative us):")
+        for cumulative, module in slowest_imports(stderr, 15):
+            print(f"{cumulative:>10}  {module}")
+
+
+if __name__ == "__main__":
+    main()
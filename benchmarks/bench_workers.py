@@ -0,0 +1,68 @@
+"""Throughput scaling of the app's Python workload with worker count.
+
+    python benchmarks/bench_workers.py --workers 1 2 4 8 --seconds 3
+
+Each worker process maps the shared store (built first if missing) and
+scores dictation attempts against the verses of every deck, the same Python
+work a submit rerun does. Reports total ops/s, scaling against one worker
+and the peak RSS of each worker.
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring import compute_word_match  # noqa: E402
+from shared_store import STORE_PATH, build_shared_store, open_shared_store  # noqa: E402
+
+
+def _worker(args: tuple) -> tuple[int, float, int]:
+    store_path, seconds, seed = args
+    store = open_shared_store(store_path)
+    verses = []
+    for file_name in store.header["decks"]:
+        columns = store.deck_columns(file_name)
+        for col in ("verse_krv", "verse_niv"):
+            if col in columns:
+                verses.append(columns[col])
+
+    rng = random.Random(seed)
+    ops = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        column = verses[rng.randrange(len(verses))]
+        answer = column[rng.randrange(len(column))]
+        attempt = " ".join(w for i, w in enumerate(answer.split()) if i % 5 != 4)
+        compute_word_match(attempt, answer)
+        ops += 1
+    elapsed = time.perf_counter() - started
+    return ops, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args(argv)
+
+    store_path = STORE_PATH if os.path.exists(STORE_PATH) else build_shared_store(STORE_PATH)
+    ctx = get_context("spawn")
+    baseline = None
+    print(f"{'workers':>7}  {'ops/s':>10}  {'scaling':>7}  {'max RSS/worker':>14}")
+    for n in sorted(set(args.workers)):
+        with ctx.Pool(n) as pool:
+            results = pool.map(_worker, [(store_path, args.seconds, i) for i in range(n)])
+        throughput = sum(ops / elapsed for ops, elapsed, _ in results)
+        baseline = baseline or throughput
+        max_rss_mb = max(rss for _, _, rss in results) / 1024
+        print(f"{n:>7}  {throughput:>10.0f}  {throughput / baseline:>6.2f}x  {max_rss_mb:>11.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
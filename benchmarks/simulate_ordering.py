@@ -0,0 +1,174 @@
+"""Headless ordering-game simulator for tuning and regression benchmarking.
+
+    python benchmarks/simulate_ordering.py --games 2000 --max-wrong 1 3 5 --hint-lives 1 2
+
+Synthetic players play the OT/NT/66-book datasets through ``OrderingGame``
+in a process pool. For every (dataset, player, max_wrong, hint lives) cell it
+reports the completion rate, mean progress, wrong answers, hint usage and
+the engine throughput. Results are deterministic for a given ``--seed``, so
+``--json`` output can be diffed between commits to catch rule changes.
+
+Players:
+
+* ``random`` - picks uniformly among the unplaced words
+* ``partial`` - knows each word with ``--knowledge`` probability, asks for
+  the content hint when unsure, and usually follows the highlighted answer
+  of the strong hint; otherwise guesses
+* ``adversarial`` - always picks a wrong word while one is left
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loaders import load_ordering_words  # noqa: E402
+from ordering_engine import OrderingGame  # noqa: E402
+from storage import DATA_DIR, content_hash  # noqa: E402
+
+DATASETS = {
+    "ot": ("bible_books_ot.csv",),
+    "nt": ("bible_books_nt.csv",),
+    "all": ("bible_books_ot.csv", "bible_books_nt.csv"),
+}
+PLAYERS = ("random", "partial", "adversarial")
+
+# Probability that the partial player recalls a word after each hint level.
+CONTENT_HINT_RECALL = 0.5
+STRONG_HINT_FOLLOW = 0.9
+
+
+def _guess(game: OrderingGame, rng: random.Random) -> int:
+    remaining = game.remaining_indices()
+    return remaining[rng.randrange(len(remaining))]
+
+
+def play_random(game: OrderingGame, rng: random.Random, knowledge: float) -> int:
+    while not game.finished:
+        game.choose(_guess(game, rng))
+    return 0
+
+
+def play_partial(game: OrderingGame, rng: random.Random, knowledge: float) -> int:
+    known = [rng.random() < knowledge for _ in range(game.total)]
+    strong_hints = 0
+    while not game.finished:
+        current = game.current
+        if game.auto_hint:
+            strong_hints += 1
+            if rng.random() < STRONG_HINT_FOLLOW:
+                game.choose(current)
+                continue
+        if known[current]:
+            game.choose(current)
+            continue
+        if not game.show_hint:
+            game.request_hint()
+            if rng.random() < CONTENT_HINT_RECALL:
+                game.choose(current)
+                continue
+        game.choose(_guess(game, rng))
+    return strong_hints
+
+
+def play_adversarial(game: OrderingGame, rng: random.Random, knowledge: float) -> int:
+    while not game.finished:
+        remaining = game.remaining_indices()
+        wrong = [i for i in remaining if i != game.current]
+        game.choose(wrong[rng.randrange(len(wrong))] if wrong else game.current)
+    return 0
+
+
+PLAYER_FUNCS = {"random": play_random, "partial": play_partial, "adversarial": play_adversarial}
+
+
+def simulate_cell(task: tuple) -> dict:
+    """Play ``games`` rounds for one configuration and aggregate the results."""
+    dataset, words, player, max_wrong, hint_lives, games, knowledge, seed = task
+    rng = random.Random(seed)
+    play = PLAYER_FUNCS[player]
+    cleared = progress = wrong = hints = strong_hints = moves = 0
+
+    started = time.perf_counter()
+    for _ in range(games):
+        game = OrderingGame(words, max_wrong, seed=rng.randrange(2 ** 32), started_at=0.0,
+                            auto_hint_lives=hint_lives)
+        strong_hints += play(game, rng, knowledge)
+        cleared += game.is_clear
+        progress += game.current
+        wrong += game.wrong_count
+        hints += game.hints_used
+        moves += len(game.log)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "dataset": dataset,
+        "player": player,
+        "max_wrong": max_wrong,
+        "hint_lives": hint_lives,
+        "games": games,
+        "completion_rate": cleared / games,
+        "mean_progress": progress / (games * len(words)),
+        "mean_wrong": wrong / games,
+        "hints_per_game": hints / games,
+        "strong_hints_per_game": strong_hints / games,
+        "games_per_sec": games / elapsed,
+        "moves_per_sec": moves / elapsed,
+    }
+
+
+def build_tasks(args) -> list[tuple]:
+    tasks = []
+    for dataset in args.datasets:
+        words = ()
+        for file_name in DATASETS[dataset]:
+            words += load_ordering_words(os.path.join(DATA_DIR, file_name))
+        for player in args.players:
+            for max_wrong in args.max_wrong:
+                for hint_lives in args.hint_lives:
+                    seed = int(content_hash(args.seed, dataset, player, max_wrong, hint_lives)[:8], 16)
+                    tasks.append((dataset, words, player, max_wrong, hint_lives,
+                                  args.games, args.knowledge, seed))
+    return tasks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=2000, help="games per configuration")
+    parser.add_argument("--datasets", nargs="+", choices=DATASETS, default=list(DATASETS))
+    parser.add_argument("--players", nargs="+", choices=PLAYERS, default=list(PLAYERS))
+    parser.add_argument("--max-wrong", type=int, nargs="+", default=[3])
+    parser.add_argument("--hint-lives", type=int, nargs="+", default=[1])
+    parser.add_argument("--knowledge", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print one JSON object per cell")
+    args = parser.parse_args(argv)
+
+    tasks = build_tasks(args)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(simulate_cell, tasks))
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        for result in results:
+            print(json.dumps({k: v for k, v in result.items() if not k.endswith("_per_sec")}))
+    else:
+        print(f"{'dataset':<7} {'player':<11} {'lives':>5} {'hint@':>5} {'clear':>6} {'progress':>8} "
+              f"{'wrong':>5} {'hints':>5} {'strong':>6} {'games/s':>8}")
+        for r in results:
+            print(f"{r['dataset']:<7} {r['player']:<11} {r['max_wrong']:>5} {r['hint_lives']:>5} "
+                  f"{r['completion_rate']:>6.1%} {r['mean_progress']:>8.1%} {r['mean_wrong']:>5.2f} "
+                  f"{r['hints_per_game']:>5.2f} {r['strong_hints_per_game']:>6.2f} {r['games_per_sec']:>8.0f}")
+    total_games = sum(r["games"] for r in results)
+    print(f"\n{total_games} games in {elapsed:.2f}s ({total_games / elapsed:.0f} games/s overall)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
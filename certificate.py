@@ -0,0 +1,209 @@
+"""Certificate rendering to PNG/PDF files.
+
+Certificates are drawn locally with Pillow (no network access) and cached on
+disk by a hash of their content, so reruns of the completion screen reuse the
+file instead of drawing it again.
+
+Batch mode renders certificates for a whole group from a results CSV or
+from the ordering-game leaderboard::
+
+    python certificate.py results.csv --format pdf --workers 4
+    python certificate.py --leaderboard "신약 27권" --mode "클릭 배열" --top 50
+"""
+import argparse
+import csv
+import functools
+import importlib.util
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from storage import atomic_write, cache_path, content_hash
+
+CERT_FORMATS = ("png", "pdf")
+CERT_MIME_TYPES = {"png": "image/png", "pdf": "application/pdf"}
+CERT_SIZE = (1200, 850)
+DEFAULT_TITLE = "수 료 증"
+FONT_CANDIDATES = [
+    os.environ.get("BANKI_CERT_FONT", ""),
+    "/usr/share/fonts/truetype/nanum/NanumMyeongjo.ttf",
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSerifCJK-Regular.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+    "C:/Windows/Fonts/malgun.ttf",
+]
+
+
+def certificates_available() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+@functools.lru_cache(maxsize=None)
+def _load_font(size: int):
+    """Return the first available Korean-capable font at ``size``."""
+    from PIL import ImageFont
+
+    for font_path in FONT_CANDIDATES:
+        if font_path and os.path.exists(font_path):
+            return ImageFont.truetype(font_path, size)
+    return ImageFont.load_default(size)
+
+
+def _draw_centered(draw, text: str, font, y: int, fill: str) -> int:
+    """Draw ``text`` horizontally centered at ``y`` and return the next y."""
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    x = (CERT_SIZE[0] - (right - left)) // 2
+    draw.text((x, y), text, font=font, fill=fill)
+    return y + (bottom - top)
+
+
+def _draw_certificate(title: str, name: str, deck: str, score: str, details: tuple):
+    from PIL import Image, ImageDraw
+
+    width, height = CERT_SIZE
+    image = Image.new("RGB", CERT_SIZE, "#fffbeb")
+    draw = ImageDraw.Draw(image)
+    draw.rounded_rectangle((24, 24, width - 24, height - 24), radius=30, outline="#d4af37", width=6)
+    draw.rounded_rectangle((42, 42, width - 42, height - 42), radius=22, outline="#d4af37", width=2)
+
+    y = _draw_centered(draw, title, _load_font(64), 110, "#92400e") + 40
+    draw.line((220, y, width - 220, y), fill="#d4af37", width=2)
+    y = _draw_centered(draw, name, _load_font(72), y + 50, "#1e3a5f") + 50
+
+    body_font = _load_font(32)
+    for line in (deck, score, *details):
+        if line:
+            y = _draw_centered(draw, line, body_font, y, "#555555") + 18
+
+    y = max(y + 20, height - 190)
+    draw.line((220, y, width - 220, y), fill="#d4af37", width=2)
+    _draw_centered(draw, "하나님의 말씀을 마음에 새기는 귀한 시간이었습니다.", _load_font(30), y + 40, "#92400e")
+    return image
+
+
+def certificate_cache_path(name: str, deck: str, score: str, details: tuple = (),
+                           fmt: str = "png", title: str = DEFAULT_TITLE) -> str:
+    """Where ``render_certificate_file`` caches this certificate (it may not exist yet)."""
+    key = content_hash("certificate", title, name, deck, score, *tuple(details))
+    return cache_path("certificates", key, fmt)
+
+
+def render_certificate_file(name: str, deck: str, score: str, details: tuple = (),
+                            fmt: str = "png", title: str = DEFAULT_TITLE) -> str:
+    """Render a certificate to ``fmt`` and return the cached file path."""
+    if fmt not in CERT_FORMATS:
+        raise ValueError(f"Unsupported certificate format: {fmt}")
+    details = tuple(details)
+    path = certificate_cache_path(name, deck, score, details, fmt, title)
+    if os.path.exists(path):
+        return path
+
+    _save_certificate(_draw_certificate(title, name, deck, score, details), fmt, path)
+    return path
+
+
+def _save_certificate(image, fmt: str, path: str):
+    buf = io.BytesIO()
+    if fmt == "png":
+        image.save(buf, "PNG", optimize=True)
+    else:
+        image.save(buf, "PDF", resolution=150)
+    atomic_write(path, buf.getvalue())
+
+
+def render_certificate_files(name: str, deck: str, score: str, details: tuple = (),
+                             title: str = DEFAULT_TITLE) -> dict[str, str]:
+    """Every format in ``CERT_FORMATS`` as ``{fmt: path}``, drawing the image at most once."""
+    details = tuple(details)
+    paths = {fmt: certificate_cache_path(name, deck, score, details, fmt, title) for fmt in CERT_FORMATS}
+    missing = [fmt for fmt, path in paths.items() if not os.path.exists(path)]
+    if missing:
+        image = _draw_certificate(title, name, deck, score, details)
+        for fmt in missing:
+            _save_certificate(image, fmt, paths[fmt])
+    return paths
+
+
+def _render_entry(entry: dict, fmt: str) -> str:
+    return render_certificate_file(
+        entry["name"], entry["deck"], entry["score"],
+        tuple(entry.get("details", ())), fmt, entry.get("title", DEFAULT_TITLE),
+    )
+
+
+def render_certificate_batch(entries, fmt: str = "png", max_workers: int | None = None) -> list[str]:
+    """Render certificates for many entries in a process pool.
+
+    Each entry is a dict with ``name``, ``deck``, ``score`` and optional
+    ``details``/``title``. Returns file paths in the order of ``entries``.
+    """
+    entries = list(entries)
+    if not entries:
+        return []
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(entries) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_entry, entries, [fmt] * len(entries), chunksize=chunksize))
+
+
+def read_results_csv(file_path: str) -> list[dict]:
+    """Read ``name,deck,score[,details]`` rows; details are split on ``|``."""
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        entries = []
+        for row in csv.DictReader(f):
+            details = row.get("details") or ""
+            entries.append({
+                "name": row["name"],
+                "deck": row["deck"],
+                "score": row["score"],
+                "details": tuple(d for d in details.split("|") if d),
+            })
+    return entries
+
+
+def read_leaderboard_entries(dataset: str, mode: str, k: int) -> list[dict]:
+    """Certificate entries for the top ``k`` results of a leaderboard."""
+    from leaderboard import Leaderboard
+
+    return [
+        {
+            "title": "단어 순서 암기 인증서",
+            "name": row["name"],
+            "deck": dataset,
+            "score": f"틀린 횟수 {row['wrong_count']}회",
+            "details": (
+                f"모드: {mode}",
+                f"소요 시간: {int(row['elapsed'] // 60)}분 {int(row['elapsed'] % 60)}초",
+                f"순위: {row['rank']}위",
+            ),
+        }
+        for row in Leaderboard().top(dataset, mode, k)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render certificates for a whole group.")
+    parser.add_argument("results", nargs="?", help="CSV with name,deck,score[,details] columns")
+    parser.add_argument("--leaderboard", metavar="DATASET", help="read entries from the leaderboard instead")
+    parser.add_argument("--mode", default="클릭 배열", help="leaderboard mode (클릭 배열/받아쓰기)")
+    parser.add_argument("--top", type=int, default=100, help="leaderboard entries to render")
+    parser.add_argument("--format", choices=CERT_FORMATS, default="png")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.leaderboard:
+        entries = read_leaderboard_entries(args.leaderboard, args.mode, args.top)
+    elif args.results:
+        entries = read_results_csv(args.results)
+    else:
+        parser.error("give a results CSV or --leaderboard DATASET")
+    paths = render_certificate_batch(entries, args.format, args.workers)
+    for path in paths:
+        print(path)
+    print(f"{len(paths)} certificates rendered", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Thread-safe in-process publish/subscribe with bounded subscriber queues.
+
+Every Streamlit session runs in its own script thread of the same process,
+so a live scoreboard can fan out updates through plain Python objects. Each
+subscriber owns a bounded ``deque``: a slow or abandoned subscriber only
+drops its own oldest events (counted in ``dropped``) and never blocks the
+publisher or other subscribers. Subscriber lists are copy-on-write tuples,
+so ``publish`` never takes the bus lock.
+"""
+import threading
+from collections import deque
+
+DEFAULT_QUEUE_SIZE = 256
+
+
+class Subscription:
+    """One subscriber's bounded event queue."""
+
+    __slots__ = ("topic", "dropped", "closed", "_queue", "_cond")
+
+    def __init__(self, topic: str, maxlen: int):
+        self.topic = topic
+        self.dropped = 0
+        self.closed = False
+        self._queue = deque(maxlen=maxlen)
+        self._cond = threading.Condition(threading.Lock())
+
+    def put(self, event):
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(event)
+            self._cond.notify()
+
+    def drain(self) -> list:
+        """Return and remove every queued event without blocking."""
+        with self._cond:
+            events = list(self._queue)
+            self._queue.clear()
+        return events
+
+    def get(self, timeout: float | None = None):
+        """Block up to ``timeout`` seconds for the next event (None on timeout)."""
+        with self._cond:
+            if not self._queue and not self._cond.wait_for(lambda: self._queue or self.closed, timeout):
+                return None
+            return self._queue.popleft() if self._queue else None
+
+
+class EventBus:
+    """Topic-based fan-out to bounded subscriber queues."""
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._topics: dict[str, tuple[Subscription, ...]] = {}
+
+    def subscribe(self, topic: str, maxlen: int | None = None) -> Subscription:
+        sub = Subscription(topic, maxlen or self.queue_size)
+        with self._lock:
+            self._topics[topic] = self._topics.get(topic, ()) + (sub,)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            remaining = tuple(s for s in self._topics.get(sub.topic, ()) if s is not sub)
+            if remaining:
+                self._topics[sub.topic] = remaining
+            else:
+                self._topics.pop(sub.topic, None)
+        with sub._cond:
+            sub.closed = True
+            sub._cond.notify_all()
+
+    def publish(self, topic: str, event) -> int:
+        """Deliver ``event`` to every subscriber of ``topic``; returns the count."""
+        subscribers = self._topics.get(topic, ())
+        for sub in subscribers:
+            sub.put(event)
+        return len(subscribers)
+
+    def close_topic(self, topic: str):
+        """Drop every subscriber of ``topic`` (e.g. when a room closes)."""
+        for sub in self._topics.get(topic, ()):
+            self.unsubscribe(sub)
+
+    def subscriber_count(self, topic: str) -> int:
+        return len(self._topics.get(topic, ()))
@@ -0,0 +1,156 @@
+"""Shared background executor for heavy per-user work.
+
+Certificate rendering and TTS synthesis used to run inline in the
+Streamlit script thread, so the user's rerun waited for Pillow or the
+speech engine. Pages now ``submit`` the work and poll ``status`` from a
+fragment, and every rerun does only cheap work.
+
+``JobExecutor`` (one per process) has
+
+* a thread pool for work that waits on I/O or a per-process lock (pyttsx3)
+* a process pool (spawned on first use) for CPU-bound work such as Pillow
+  rendering. Functions must be picklable module-level functions.
+* one bounded admission queue over both: when ``BANKI_JOB_QUEUE`` jobs are
+  queued or running, ``submit`` raises ``JobQueueFull`` at once instead of
+  letting work pile up
+
+A job's ID is a hash of the function and its arguments, so submitting the
+same work again while it is queued or running (or finished less than
+``BANKI_JOB_KEEP_SECONDS`` ago) returns the existing job instead of
+starting another. ``cancel`` stops a job that has not started yet. A
+running job is left to finish, since threads cannot be interrupted.
+
+Configuration (environment): ``BANKI_JOB_THREADS`` (default 4),
+``BANKI_JOB_PROCESSES`` (default 2), ``BANKI_JOB_QUEUE`` (default 32),
+``BANKI_JOB_KEEP_SECONDS`` (default 600).
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from storage import content_hash
+
+JOB_THREADS = int(os.environ.get("BANKI_JOB_THREADS", "4"))
+JOB_PROCESSES = int(os.environ.get("BANKI_JOB_PROCESSES", "2"))
+JOB_QUEUE = int(os.environ.get("BANKI_JOB_QUEUE", "32"))
+JOB_KEEP_SECONDS = float(os.environ.get("BANKI_JOB_KEEP_SECONDS", "600"))
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = "pending", "running", "done", "failed", "cancelled"
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the executor already has its maximum of queued and running jobs."""
+
+
+class Job:
+    """One submitted call and its future."""
+
+    __slots__ = ("id", "future", "submitted_at", "finished_at")
+
+    def __init__(self, job_id: str, future: Future):
+        self.id = job_id
+        self.future = future
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    @property
+    def state(self) -> str:
+        future = self.future
+        if future.cancelled():
+            return CANCELLED
+        if future.done():
+            return FAILED if future.exception() is not None else DONE
+        return RUNNING if future.running() else PENDING
+
+
+def job_id(fn, *args) -> str:
+    """Deduplication key of ``fn(*args)``."""
+    return content_hash("job", fn.__module__, fn.__qualname__, *args)[:20]
+
+
+class JobExecutor:
+    """Process-wide bounded thread and process pools with job IDs."""
+
+    def __init__(self, threads: int = JOB_THREADS, processes: int = JOB_PROCESSES,
+                 queue_size: int = JOB_QUEUE, keep_seconds: float = JOB_KEEP_SECONDS):
+        self.processes = processes
+        self.keep_seconds = keep_seconds
+        self._threads = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="banki-job")
+        self._process_pool = None
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, process: bool):
+        if not process:
+            return self._threads
+        if self._process_pool is None:
+            # Spawn, not fork: the app process has live threads (Streamlit, pools).
+            self._process_pool = ProcessPoolExecutor(max_workers=self.processes,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+        return self._process_pool
+
+    def _prune(self, now: float):
+        expired = [key for key, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.keep_seconds]
+        for key in expired:
+            del self._jobs[key]
+
+    def _finished(self, job: Job):
+        job.finished_at = time.time()
+        self._slots.release()
+
+    def submit(self, fn, *args, process: bool = False) -> str:
+        """Queue ``fn(*args)`` (in the process pool if ``process``) and return its job ID.
+
+        Identical work already queued, running or recently finished is not
+        submitted again; its ID is returned.
+        """
+        key = job_id(fn, *args)
+        with self._lock:
+            self._prune(time.time())
+            existing = self._jobs.get(key)
+            if existing is not None and existing.state not in (FAILED, CANCELLED):
+                return key
+            if not self._slots.acquire(blocking=False):
+                raise JobQueueFull("background job queue is full")
+            try:
+                future = self._pool(process).submit(fn, *args)
+            except BaseException:
+                self._slots.release()
+                raise
+            job = self._jobs[key] = Job(key, future)
+        future.add_done_callback(lambda _: self._finished(job))
+        return key
+
+    def status(self, key: str) -> str | None:
+        """``pending``/``running``/``done``/``failed``/``cancelled``, or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(key)
+        return None if job is None else job.state
+
+    def done(self, key: str) -> bool:
+        return self.status(key) in (DONE, FAILED, CANCELLED, None)
+
+    def result(self, key: str):
+        """Result of a finished job.
+
+        Re-raises the job's exception (``CancelledError`` if it was
+        cancelled); KeyError if the ID is unknown.
+        """
+        with self._lock:
+            job = self._jobs[key]
+        return job.future.result(timeout=0)
+
+    def cancel(self, key: str) -> bool:
+        """Cancel a job that has not started; True if it was cancelled."""
+        with self._lock:
+            job = self._jobs.get(key)
+        return job is not None and job.future.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            states = [job.state for job in self._jobs.values()]
+        return {state: states.count(state) for state in (PENDING, RUNNING, DONE, FAILED, CANCELLED)}
@@ -0,0 +1,164 @@
+"""Persistent ordering-game leaderboard per (dataset, mode).
+
+Results live in SQLite with an index on ``(dataset, mode, wrong_count,
+elapsed)``, so top-K is an index range scan of K rows. For "your rank" each
+board also keeps its score keys in memory (``SortedKeys``), loaded in index
+order on first use. Later calls top it up with the rows other workers
+inserted since, found by a rowid range (``id > last seen``), not by
+scanning the board's index range. Insert and rank are O(log n + LOAD).
+"""
+import bisect
+import os
+import sqlite3
+import threading
+import time
+
+from storage import STATE_DIR
+
+LEADERBOARD_PATH = os.path.join(STATE_DIR, "leaderboard.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    dataset TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    name TEXT NOT NULL,
+    wrong_count INTEGER NOT NULL,
+    elapsed REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_rank ON results (dataset, mode, wrong_count, elapsed);
+"""
+
+
+class SortedKeys:
+    """Sorted score keys in buckets of about ``LOAD``, with a Fenwick tree of bucket sizes.
+
+    One flat sorted list makes every insert an O(n) shift. Here an insert
+    shifts one bucket and updates O(log buckets) tree nodes, and a rank is
+    a prefix sum plus one ``bisect`` inside a bucket. A bucket that grows to
+    ``2 * LOAD`` is split, and the tree is rebuilt (once per LOAD inserts).
+    """
+
+    LOAD = 512
+    __slots__ = ("_buckets", "_maxes", "_tree", "_len")
+
+    def __init__(self, keys=()):
+        """``keys`` must already be sorted."""
+        keys = list(keys)
+        self._buckets = [keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(keys)
+        self._build()
+
+    def _build(self):
+        tree = [0] * (len(self._buckets) + 1)
+        for i, bucket in enumerate(self._buckets, 1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key):
+        self._len += 1
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._build()
+            return
+        i = min(bisect.bisect_left(self._maxes, key), len(self._buckets) - 1)
+        bucket = self._buckets[i]
+        bisect.insort(bucket, key)
+        self._maxes[i] = bucket[-1]
+        if len(bucket) >= 2 * self.LOAD:
+            self._buckets[i:i + 1] = [bucket[:self.LOAD], bucket[self.LOAD:]]
+            self._maxes[i:i + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+            self._build()
+            return
+        node = i + 1
+        while node < len(self._tree):
+            self._tree[node] += 1
+            node += node & -node
+
+    def rank(self, key) -> int:
+        """Number of keys smaller than ``key``."""
+        i = bisect.bisect_left(self._maxes, key)
+        if i == len(self._buckets):
+            return self._len
+        count, node = 0, i
+        while node > 0:
+            count += self._tree[node]
+            node -= node & -node
+        return count + bisect.bisect_left(self._buckets[i], key)
+
+
+class Leaderboard:
+    """Thread-safe leaderboard store; one instance per process is enough."""
+
+    def __init__(self, path: str = LEADERBOARD_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        # (dataset, mode) -> [SortedKeys of (wrong_count, elapsed), last row id seen]
+        self._boards = {}
+
+    def _board(self, dataset: str, mode: str) -> SortedKeys:
+        board = self._boards.get((dataset, mode))
+        if board is None:
+            rows = self._conn.execute(
+                "SELECT wrong_count, elapsed, id FROM results WHERE dataset = ? AND mode = ? "
+                "ORDER BY wrong_count, elapsed",
+                (dataset, mode),
+            ).fetchall()
+            keys = SortedKeys((wrong, elapsed) for wrong, elapsed, _ in rows)
+            board = self._boards[(dataset, mode)] = [keys, max((row_id for *_, row_id in rows), default=0)]
+            return keys
+
+        # "+" keeps SQLite off idx_results_rank: the rows newer than the last
+        # one seen are a rowid range, whatever the size of the board.
+        new_rows = self._conn.execute(
+            "SELECT wrong_count, elapsed, id FROM results WHERE id > ? AND +dataset = ? AND +mode = ?",
+            (board[1], dataset, mode),
+        ).fetchall()
+        for wrong, elapsed, row_id in new_rows:
+            board[0].add((wrong, elapsed))
+            board[1] = max(board[1], row_id)
+        return board[0]
+
+    def record(self, dataset: str, mode: str, name: str, wrong_count: int, elapsed: float) -> int:
+        """Store a cleared round and return its 1-based rank."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO results (dataset, mode, name, wrong_count, elapsed, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (dataset, mode, name, wrong_count, elapsed, time.time()),
+                )
+            return self._board(dataset, mode).rank((wrong_count, elapsed)) + 1
+
+    def rank(self, dataset: str, mode: str, wrong_count: int, elapsed: float) -> int:
+        """1-based rank a result with this score has (ties share the best rank)."""
+        with self._lock:
+            return self._board(dataset, mode).rank((wrong_count, elapsed)) + 1
+
+    def size(self, dataset: str, mode: str) -> int:
+        with self._lock:
+            return len(self._board(dataset, mode))
+
+    def top(self, dataset: str, mode: str, k: int = 10) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, wrong_count, elapsed, created_at FROM results "
+                "WHERE dataset = ? AND mode = ? ORDER BY wrong_count, elapsed LIMIT ?",
+                (dataset, mode, k),
+            ).fetchall()
+        return [
+            {"rank": i + 1, "name": name, "wrong_count": wrong, "elapsed": elapsed, "created_at": created}
+            for i, (name, wrong, elapsed, created) in enumerate(rows)
+        ]
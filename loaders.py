@@ -0,0 +1,104 @@
+"""Pandas-free CSV loading for verse decks and ordering datasets.
+
+Decks are small and string-heavy, so they are read with the stdlib ``csv``
+module into one tuple per column instead of a DataFrame.
+"""
+import csv
+import io
+
+VERSE_REQUIRED_COLUMNS = ("location",)
+ORDERING_REQUIRED_COLUMNS = ("order", "name_ko", "name_en")
+
+
+class VerseRow:
+    """One card of a deck; ``row[column]`` reads straight from the column."""
+
+    __slots__ = ("_deck", "_index")
+
+    def __init__(self, deck: "VerseDeck", index: int):
+        self._deck = deck
+        self._index = index
+
+    def __getitem__(self, column: str) -> str:
+        return self._deck.column(column)[self._index]
+
+
+class VerseDeck:
+    """Column-oriented deck: one sequence of strings per CSV column."""
+
+    __slots__ = ("columns", "_data", "_len")
+
+    def __init__(self, data: dict):
+        self.columns = tuple(data)
+        self._data = data
+        self._len = len(next(iter(data.values()))) if data else 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def column(self, name: str):
+        return self._data[name]
+
+    def row(self, index: int) -> VerseRow:
+        return VerseRow(self, index)
+
+    def project(self, columns) -> "VerseDeck":
+        """A deck sharing only ``columns`` of this one (no copies)."""
+        return VerseDeck({name: self._data[name] for name in columns})
+
+
+def decode_csv_bytes(raw: bytes) -> str:
+    """Decode CSV bytes as UTF-8 (with or without BOM), falling back to cp949."""
+    try:
+        return raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return raw.decode("cp949")
+
+
+def _check_header(header: list[str], required) -> None:
+    missing = [name for name in required if name not in header]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+
+
+def read_csv_columns(text: str, required=(), usecols=None) -> dict[str, tuple[str, ...]]:
+    """Parse CSV text into ``{column: tuple_of_values}``.
+
+    Only ``usecols`` are kept when given. Raises ValueError when any of
+    ``required`` or ``usecols`` is missing.
+    """
+    reader = csv.reader(io.StringIO(text))
+    header = [name.strip() for name in next(reader, [])]
+    _check_header(header, (*required, *(usecols or ())))
+    width = len(header)
+    rows = [row + [""] * (width - len(row)) for row in reader if row]
+    return {name: tuple(row[i] for row in rows) for i, name in enumerate(header)
+            if usecols is None or name in usecols}
+
+
+def read_csv_file(file_path: str, required=(), usecols=None) -> dict[str, tuple[str, ...]]:
+    with open(file_path, "rb") as f:
+        return read_csv_columns(decode_csv_bytes(f.read()), required, usecols)
+
+
+def read_csv_header(file_path: str, required=()) -> tuple[str, ...]:
+    """Column names of a CSV file without parsing its rows."""
+    with open(file_path, "rb") as f:
+        first_line = f.readline()
+    header = [name.strip() for name in next(csv.reader([decode_csv_bytes(first_line)]), [])]
+    _check_header(header, required)
+    return tuple(header)
+
+
+def load_verse_deck(file_path: str) -> VerseDeck:
+    return VerseDeck(read_csv_file(file_path, VERSE_REQUIRED_COLUMNS))
+
+
+def ordering_words(columns: dict[str, tuple[str, ...]]) -> tuple[str, ...]:
+    """Return ``name_ko`` sorted by the numeric ``order`` column."""
+    order = [int(value) for value in columns["order"]]
+    return tuple(name for _, name in sorted(zip(order, columns["name_ko"]), key=lambda pair: pair[0]))
+
+
+def load_ordering_words(file_path: str) -> tuple[str, ...]:
+    return ordering_words(read_csv_file(file_path, ORDERING_REQUIRED_COLUMNS))
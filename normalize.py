@@ -0,0 +1,55 @@
+"""IME-tolerant answer normalization shared by typing mode and dictation.
+
+Mobile Korean keyboards send decomposed (NFD) syllables, full-width spaces,
+zero-width characters and stray jamo left over from an unfinished syllable.
+Deck spellings also differ (``요한1서`` in ``bible_books_nt.csv`` vs
+``요한일서`` in the 제자양육 verse set). ``answer_key`` folds all of these to
+one key, and ``AnswerIndex`` maps keys to canonical answers with a dict.
+"""
+import functools
+import re
+import unicodedata
+
+# Whitespace, zero-width characters and jamo that did not compose into a syllable.
+_IGNORED = re.compile(
+    "[\\s\u200b-\u200d\u2060\ufeff"
+    "\u1100-\u11ff\u3130-\u318f\ua960-\ua97f\ud7b0-\ud7ff]"
+)
+# 요한1서/요한일서 style numbered epistles; the key uses the Korean numeral.
+_NUMBERED_BOOK = re.compile("요한([123])서")
+_NUMERALS = {"1": "일", "2": "이", "3": "삼"}
+
+
+def normalize_text(text: str) -> str:
+    """NFKC-normalize (composes NFD syllables, maps full-width forms)."""
+    return unicodedata.normalize("NFKC", text)
+
+
+def answer_key(text: str) -> str:
+    """Fold ``text`` to the key used to compare an answer with user input."""
+    key = _IGNORED.sub("", normalize_text(text)).casefold()
+    return _NUMBERED_BOOK.sub(lambda m: f"요한{_NUMERALS[m.group(1)]}서", key)
+
+
+class AnswerIndex:
+    """Maps every accepted spelling of a dataset's answers to the canonical one."""
+
+    __slots__ = ("_lookup",)
+
+    def __init__(self, answers):
+        self._lookup = {}
+        for answer in answers:
+            self._lookup.setdefault(answer_key(answer), answer)
+
+    def canonical(self, text: str) -> str | None:
+        """Return the canonical answer ``text`` spells, or None."""
+        return self._lookup.get(answer_key(text))
+
+    def matches(self, text: str, answer: str) -> bool:
+        return self.canonical(text) == answer
+
+
+@functools.lru_cache(maxsize=32)
+def build_answer_index(answers: tuple[str, ...]) -> AnswerIndex:
+    """Build (once per dataset) the answer index for ``answers``."""
+    return AnswerIndex(answers)
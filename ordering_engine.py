@@ -0,0 +1,170 @@
+"""Ordering-game rules without Streamlit.
+
+``OrderingGame`` keeps the whole state of one round in ``__slots__``. Each
+move (click, typed answer, hint) is an O(1) transition and is appended to a
+compact ``array`` log, so a finished or interrupted round can be rebuilt
+exactly with ``OrderingGame.replay``. A game stores only its shuffle seed;
+the button order is a seeded ``Permutation`` evaluated once per (size,
+seed) and shared by every game of that seed (e.g. all players of a room).
+"""
+import functools
+import random
+import time
+from array import array
+
+from normalize import build_answer_index
+from permutation import Permutation
+
+# Log codes. Non-negative entries are the word index the player chose.
+MOVE_WRONG_TYPED = -1
+MOVE_HINT = -2
+
+# The strong (level 2) hint appears once this many lives are left.
+AUTO_HINT_LIVES = 1
+
+
+@functools.lru_cache(maxsize=1024)
+def shuffled_order(size: int, seed: int) -> tuple[int, ...]:
+    """Word indices in the shuffled button order for ``seed``."""
+    return tuple(Permutation(size, seed))
+
+
+class OrderingGame:
+    """One round of putting ``words`` back into order."""
+
+    __slots__ = (
+        "words", "max_wrong", "auto_hint_lives", "seed", "current", "wrong_count",
+        "hints_used", "show_hint", "started_at", "ended_at", "log", "_answer_index",
+    )
+
+    def __init__(self, words, max_wrong: int = 3, seed: int | None = None,
+                 started_at: float | None = None, auto_hint_lives: int = AUTO_HINT_LIVES):
+        self.words = tuple(words)
+        self.max_wrong = max_wrong
+        self.auto_hint_lives = auto_hint_lives
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.current = 0
+        self.wrong_count = 0
+        self.hints_used = 0
+        self.show_hint = False
+        self.started_at = time.time() if started_at is None else started_at
+        self.ended_at = None
+        self.log = array("h")
+        self._answer_index = None
+
+    # --- State -------------------------------------------------------
+
+    @property
+    def total(self) -> int:
+        return len(self.words)
+
+    @property
+    def order(self) -> tuple[int, ...]:
+        return shuffled_order(len(self.words), self.seed)
+
+    @property
+    def remaining_lives(self) -> int:
+        return self.max_wrong - self.wrong_count
+
+    @property
+    def is_over(self) -> bool:
+        return self.wrong_count >= self.max_wrong
+
+    @property
+    def is_clear(self) -> bool:
+        return self.current >= len(self.words)
+
+    @property
+    def finished(self) -> bool:
+        return self.is_over or self.is_clear
+
+    @property
+    def answer(self) -> str | None:
+        """The word expected next, or None once every word is placed."""
+        return None if self.is_clear else self.words[self.current]
+
+    @property
+    def correct_answers(self) -> tuple[str, ...]:
+        return self.words[:self.current]
+
+    @property
+    def auto_hint(self) -> bool:
+        """True when few enough lives are left that the strong hint is shown."""
+        return self.remaining_lives <= self.auto_hint_lives and not self.finished
+
+    def elapsed(self, now: float | None = None) -> float:
+        end = self.ended_at if self.ended_at is not None else (time.time() if now is None else now)
+        return end - self.started_at
+
+    def remaining_indices(self) -> list[int]:
+        """Unplaced word indices in shuffled order (placed ones are ``< current``)."""
+        current = self.current
+        return [i for i in self.order if i >= current]
+
+    # --- Transitions -------------------------------------------------
+
+    def _finish_if_done(self):
+        if self.ended_at is None and self.finished:
+            self.ended_at = time.time()
+
+    def choose(self, word_idx: int) -> bool:
+        """Place word ``word_idx`` next; returns whether it was correct."""
+        if self.finished:
+            return False
+        self.log.append(word_idx)
+        if word_idx == self.current:
+            self.current += 1
+            self.show_hint = False
+            self._finish_if_done()
+            return True
+        self.wrong_count += 1
+        self._finish_if_done()
+        return False
+
+    def submit(self, text: str) -> bool | None:
+        """Check a typed answer; returns None for blank input (no move)."""
+        if self.finished or not text.strip():
+            return None
+        if self._answer_index is None:
+            self._answer_index = build_answer_index(self.words)
+        if self._answer_index.matches(text, self.words[self.current]):
+            return self.choose(self.current)
+        self._wrong_typed()
+        return False
+
+    def _wrong_typed(self):
+        if self.finished:
+            return
+        self.log.append(MOVE_WRONG_TYPED)
+        self.wrong_count += 1
+        self._finish_if_done()
+
+    def request_hint(self):
+        if self.finished or self.show_hint:
+            return
+        self.log.append(MOVE_HINT)
+        self.show_hint = True
+        self.hints_used += 1
+
+    def restart(self, seed: int | None = None) -> "OrderingGame":
+        """A fresh round over the same words and settings."""
+        return OrderingGame(self.words, self.max_wrong, seed, auto_hint_lives=self.auto_hint_lives)
+
+    # --- Replay ------------------------------------------------------
+
+    def apply(self, move: int):
+        if move == MOVE_HINT:
+            self.request_hint()
+        elif move == MOVE_WRONG_TYPED:
+            self._wrong_typed()
+        else:
+            self.choose(move)
+
+    @classmethod
+    def replay(cls, words, max_wrong: int, seed: int, log,
+               auto_hint_lives: int = AUTO_HINT_LIVES) -> "OrderingGame":
+        """Rebuild a round from its settings and move log."""
+        game = cls(words, max_wrong, seed, auto_hint_lives=auto_hint_lives)
+        for move in log:
+            game.apply(move)
+        return game
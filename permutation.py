@@ -0,0 +1,72 @@
+"""Lazily evaluated seeded permutations of ``range(size)``.
+
+A ``Permutation`` never materializes the shuffled list: ``perm[i]`` runs a
+four-round Feistel network over the smallest even-bit power-of-two domain
+covering ``size`` and cycle-walks until the result falls inside the range.
+The domain is under ``4 * size``, so that takes fewer than four
+evaluations on average. Feistel networks are invertible, so
+``perm.index(value)`` is just as cheap. A permutation is fully determined
+by its seed and context, so it pickles to a few dozen bytes and everyone
+using the same seed gets the same order.
+"""
+import hashlib
+import struct
+
+ROUNDS = 4
+
+
+class Permutation:
+    """Bijection on ``range(size)`` keyed by ``(seed, *context)``."""
+
+    __slots__ = ("size", "_half_bits", "_mask", "_keys")
+
+    def __init__(self, size: int, seed: int, *context):
+        self.size = size
+        bits = max(1, (size - 1).bit_length())
+        self._half_bits = (bits + 1) // 2
+        self._mask = (1 << self._half_bits) - 1
+        digest = hashlib.sha256(repr((seed, size, *context)).encode("utf-8")).digest()
+        self._keys = struct.unpack(f"<{ROUNDS}I", digest[:4 * ROUNDS])
+
+    def _encrypt(self, x: int) -> int:
+        half, mask = self._half_bits, self._mask
+        left, right = x >> half, x & mask
+        for key in self._keys:
+            f = (right * 0x9E3779B1 + key) & 0xFFFFFFFF
+            f ^= f >> 15
+            f = (f * 0x85EBCA6B) & 0xFFFFFFFF
+            left, right = right, left ^ (f ^ f >> 13) & mask
+        return left << half | right
+
+    def _decrypt(self, x: int) -> int:
+        half, mask = self._half_bits, self._mask
+        left, right = x >> half, x & mask
+        for key in reversed(self._keys):
+            f = (left * 0x9E3779B1 + key) & 0xFFFFFFFF
+            f ^= f >> 15
+            f = (f * 0x85EBCA6B) & 0xFFFFFFFF
+            left, right = right ^ (f ^ f >> 13) & mask, left
+        return left << half | right
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+    def index(self, value: int) -> int:
+        """Position of ``value`` in the permutation (the inverse mapping)."""
+        if not 0 <= value < self.size:
+            raise ValueError(value)
+        position = self._decrypt(value)
+        while position >= self.size:
+            position = self._decrypt(position)
+        return position
+
+    def __iter__(self):
+        return (self[i] for i in range(self.size))
@@ -0,0 +1,229 @@
+"""Build every derived artifact ahead of a deploy, so no visitor waits for it.
+
+    python precompile.py            # validate data/, build, report timings
+    python precompile.py --tts      # also synthesize every verse (needs pyttsx3)
+    python precompile.py --check    # validate only
+
+Artifacts go to ``CACHE_DIR/artifacts/<version>/``. The version is a hash
+of ``ARTIFACT_FORMAT`` and the name, size and mtime of every deck, ordering
+dataset and local Bible file, so changing any input (or the format) builds
+a new directory and never overwrites one a running worker has mapped. A
+directory holds:
+
+* ``store.bin`` - the shared string store (``shared_store.py``)
+* ``verse_index.pickle`` - the deck builder's search index
+* ``quiz/<deck>/<version>.npy`` - 장절 맞히기 neighbor tables
+* ``manifest.json`` - what was built and how long each step took
+
+The app computes the same version at startup and maps whatever the
+matching directory has (``np.load(mmap_mode="r")`` for the tables);
+anything missing is still built lazily as before. ``serve.py`` runs the
+build before starting workers. Old versions beyond ``--keep`` are removed.
+"""
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+
+from loaders import (ORDERING_REQUIRED_COLUMNS, VERSE_REQUIRED_COLUMNS, ordering_words, read_csv_file)
+from storage import CACHE_DIR, DATA_DIR, atomic_write, content_hash
+
+ARTIFACT_FORMAT = 1
+ARTIFACTS_DIR = os.path.join(CACHE_DIR, "artifacts")
+VERSE_COLUMNS = ("verse_krv", "verse_niv")
+
+
+def _input_files() -> list[str]:
+    from verse_search import corpus_files
+
+    ordering = [os.path.join(DATA_DIR, f) for f in sorted(os.listdir(DATA_DIR))
+                if f.startswith("bible_books_") and f.endswith(".csv")] if os.path.isdir(DATA_DIR) else []
+    return corpus_files() + ordering
+
+
+def artifact_version(files=None) -> str:
+    """Hash of the artifact format and the name/size/mtime of every input file."""
+    files = _input_files() if files is None else files
+    stats = [(os.path.basename(f), os.path.getsize(f), os.path.getmtime(f)) for f in files]
+    return content_hash("artifacts", ARTIFACT_FORMAT, *stats)[:16]
+
+
+def artifact_dir() -> str | None:
+    """The built artifact directory matching the current data, if any."""
+    directory = os.path.join(ARTIFACTS_DIR, artifact_version())
+    return directory if os.path.exists(os.path.join(directory, "manifest.json")) else None
+
+
+def artifact_file(*parts) -> str | None:
+    """Path of one artifact of the current version, or None when it was not built."""
+    directory = artifact_dir()
+    if directory is None:
+        return None
+    path = os.path.join(directory, *parts)
+    return path if os.path.exists(path) else None
+
+
+def quiz_table_path(file_name: str, column: str) -> tuple[str, ...]:
+    return ("quiz", file_name, f"{column}.npy")
+
+
+def validate_decks(data_dir: str = DATA_DIR) -> tuple[list[str], list[str]]:
+    """Check every CSV in ``data_dir``; returns (errors, warnings)."""
+    errors, warnings = [], []
+    if not os.path.isdir(data_dir):
+        return [f"{data_dir}: 폴더가 없습니다"], warnings
+    for file_name in sorted(os.listdir(data_dir)):
+        if not file_name.endswith(".csv"):
+            continue
+        file_path = os.path.join(data_dir, file_name)
+        try:
+            if file_name.startswith("bible_books_"):
+                ordering_words(read_csv_file(file_path, ORDERING_REQUIRED_COLUMNS))
+                continue
+            columns = read_csv_file(file_path, VERSE_REQUIRED_COLUMNS)
+        except (OSError, ValueError, UnicodeDecodeError) as exc:
+            errors.append(f"{file_name}: {exc}")
+            continue
+        if not any(col in columns for col in VERSE_COLUMNS):
+            errors.append(f"{file_name}: no verse column ({', '.join(VERSE_COLUMNS)})")
+        if not columns["location"]:
+            warnings.append(f"{file_name}: no verses")
+        empty = sum(1 for location in columns["location"] if not location.strip())
+        if empty:
+            errors.append(f"{file_name}: {empty} rows without a location")
+        duplicates = len(columns["location"]) - len(set(columns["location"]))
+        if duplicates:
+            warnings.append(f"{file_name}: {duplicates} duplicate locations")
+        for col in VERSE_COLUMNS:
+            blank = sum(1 for text in columns.get(col, ()) if not text.strip())
+            if blank:
+                warnings.append(f"{file_name}: {blank} empty {col} cells")
+    return errors, warnings
+
+
+class _Timings:
+    def __init__(self):
+        self.steps = []
+
+    def run(self, label: str, fn, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        self.steps.append((label, elapsed))
+        print(f"  {elapsed * 1000:>9.1f} ms  {label}")
+        return result
+
+
+def _write_pickle(path: str, obj):
+    atomic_write(path, pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+
+def _write_quiz_table(path: str, locations, texts):
+    import io
+
+    import numpy as np
+
+    from reference_quiz import neighbor_table
+
+    buf = io.BytesIO()
+    np.save(buf, neighbor_table(texts, locations))
+    atomic_write(path, buf.getvalue())
+
+
+def _synthesize_deck(file_path: str, column: str):
+    from tts import pregenerate_deck
+
+    return pregenerate_deck(file_path, column)
+
+
+def build_artifacts(tts: bool = False, force: bool = False) -> str:
+    """Build the artifacts of the current data; returns their directory."""
+    from shared_store import build_shared_store
+    from verse_search import build_verse_index
+
+    files = _input_files()
+    version = artifact_version(files)
+    directory = os.path.join(ARTIFACTS_DIR, version)
+    manifest_path = os.path.join(directory, "manifest.json")
+    if os.path.exists(manifest_path) and not force and not tts:
+        print(f"artifacts {version} already built: {directory}")
+        return directory
+
+    print(f"building artifacts {version} in {directory}")
+    timings = _Timings()
+    started = time.perf_counter()
+    timings.run("shared store", build_shared_store, os.path.join(directory, "store.bin"))
+    index = timings.run("verse index", build_verse_index)
+    timings.run("verse index (write)", _write_pickle, os.path.join(directory, "verse_index.pickle"), index)
+
+    decks = {}
+    for file_name in sorted(os.listdir(DATA_DIR)):
+        if not file_name.endswith(".csv") or file_name.startswith("bible_books_"):
+            continue
+        file_path = os.path.join(DATA_DIR, file_name)
+        columns = read_csv_file(file_path, VERSE_REQUIRED_COLUMNS)
+        decks[file_name] = {"verses": len(columns["location"]), "versions": []}
+        for column in VERSE_COLUMNS:
+            if column not in columns:
+                continue
+            decks[file_name]["versions"].append(column)
+            path = os.path.join(directory, *quiz_table_path(file_name, column))
+            timings.run(f"quiz table {file_name} [{column}]", _write_quiz_table,
+                        path, columns["location"], columns[column])
+            if tts:
+                from tts import tts_available
+
+                if tts_available():
+                    timings.run(f"tts {file_name} [{column}]", _synthesize_deck, file_path, column)
+
+    total = time.perf_counter() - started
+    manifest = {
+        "version": version, "format": ARTIFACT_FORMAT, "built_at": time.time(),
+        "inputs": [os.path.basename(f) for f in files], "decks": decks,
+        "verse_index": len(index), "seconds": {label: round(s, 4) for label, s in timings.steps},
+        "total_seconds": round(total, 4),
+    }
+    atomic_write(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+    print(f"  {total * 1000:>9.1f} ms  total")
+    return directory
+
+
+def prune_artifacts(keep: int, current: str):
+    """Remove all but the ``keep`` newest artifact versions (never ``current``)."""
+    if not os.path.isdir(ARTIFACTS_DIR):
+        return
+    versions = sorted((os.path.join(ARTIFACTS_DIR, name) for name in os.listdir(ARTIFACTS_DIR)),
+                      key=os.path.getmtime, reverse=True)
+    for path in versions[keep:]:
+        if os.path.abspath(path) != os.path.abspath(current):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate decks and precompile derived artifacts.")
+    parser.add_argument("--check", action="store_true", help="validate only, build nothing")
+    parser.add_argument("--tts", action="store_true", help="also synthesize verse audio")
+    parser.add_argument("--force", action="store_true", help="rebuild even if this version exists")
+    parser.add_argument("--keep", type=int, default=3, help="artifact versions to keep")
+    args = parser.parse_args(argv)
+
+    errors, warnings = validate_decks()
+    for message in warnings:
+        print(f"warning: {message}", file=sys.stderr)
+    for message in errors:
+        print(f"error: {message}", file=sys.stderr)
+    if errors:
+        sys.exit(1)
+    if args.check:
+        print("all decks valid")
+        return
+
+    directory = build_artifacts(tts=args.tts, force=args.force)
+    prune_artifacts(args.keep, directory)
+
+
+if __name__ == "__main__":
+    main()
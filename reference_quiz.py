@@ -0,0 +1,126 @@
+"""Look-alike distractors for the 장절 맞히기 (verse → reference) quiz.
+
+Each verse of a deck becomes a TF-IDF vector over the character 2- and
+3-grams of its ``search_key`` (spaces and punctuation dropped), built once
+per deck with NumPy as a sparse matrix. The cosine similarity of every
+verse to every other is accumulated through the n-gram postings one row at
+a time, and only the ``NEIGHBORS`` most similar verses with a different
+location are kept in an ``(n, NEIGHBORS)`` table. Picking a card's options
+is then a lookup into its row; nothing is compared while the quiz runs.
+"""
+import random
+
+import numpy as np
+
+from verse_search import search_key
+
+NGRAM_SIZES = (2, 3)
+NEIGHBORS = 8
+CHOICES = 4
+# n-grams in more than this share of verses (particles, "the") carry
+# almost no TF-IDF weight but would make every row touch every verse.
+MAX_DOC_FREQUENCY = 0.5
+
+
+def _ngrams(key: str):
+    for size in NGRAM_SIZES:
+        for i in range(len(key) - size + 1):
+            yield key[i:i + size]
+
+
+def tfidf_matrix(texts) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """L2-normalized TF-IDF rows as CSR arrays ``(indptr, indices, data, n_features)``."""
+    vocabulary: dict[str, int] = {}
+    indptr, indices, counts = [0], [], []
+    for text in texts:
+        row: dict[int, int] = {}
+        for gram in _ngrams(search_key(text)):
+            column = vocabulary.setdefault(gram, len(vocabulary))
+            row[column] = row.get(column, 0) + 1
+        indices += row
+        counts += row.values()
+        indptr.append(len(indices))
+    indptr = np.asarray(indptr, dtype=np.int64)
+    indices = np.asarray(indices, dtype=np.int32)
+    tf = np.asarray(counts, dtype=np.float32)
+
+    n = len(indptr) - 1
+    df = np.bincount(indices, minlength=len(vocabulary))
+    idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+    idf[df > max(1, MAX_DOC_FREQUENCY * n)] = 0
+    data = tf * idf[indices]
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    norms = np.sqrt(np.bincount(rows, data * data, minlength=n)).astype(np.float32)
+    data /= np.where(norms > 0, norms, 1)[rows]
+    return indptr, indices, data, len(vocabulary)
+
+
+def neighbor_table(texts, locations, k: int = NEIGHBORS) -> np.ndarray:
+    """For each verse, the ``k`` most similar verses with another location.
+
+    Rows are ordered most similar first and padded with -1 when the deck
+    has fewer than ``k`` other locations.
+    """
+    n = len(texts)
+    table = np.full((n, k), -1, dtype=np.int32)
+    if n < 2:
+        return table
+    indptr, indices, data, n_features = tfidf_matrix(texts)
+    _, location_ids = np.unique(np.asarray(locations, dtype=object).astype(str), return_inverse=True)
+
+    # Column-major copy of the matrix: the postings of every n-gram.
+    order = np.argsort(indices, kind="stable")
+    col_rows = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))[order]
+    col_data = data[order]
+    col_ptr = np.zeros(n_features + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=n_features), out=col_ptr[1:])
+
+    for i in range(n):
+        cols = indices[indptr[i]:indptr[i + 1]]
+        weights = data[indptr[i]:indptr[i + 1]]
+        keep = weights > 0
+        cols, weights = cols[keep], weights[keep]
+        scores = np.full(n, -1.0, dtype=np.float32)
+        if len(cols):
+            starts = col_ptr[cols]
+            lengths = col_ptr[cols + 1] - starts
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+            positions = offsets + np.arange(lengths.sum())
+            scores += np.bincount(col_rows[positions], col_data[positions] * np.repeat(weights, lengths),
+                                  minlength=n).astype(np.float32)
+        # Same location (the answer itself, or a duplicate row) is never a distractor.
+        scores[location_ids == location_ids[i]] = -np.inf
+        count = min(k, int(np.isfinite(scores).sum()))
+        if count == 0:
+            continue
+        top = np.argpartition(-scores, count - 1)[:count]
+        table[i, :count] = top[np.argsort(-scores[top], kind="stable")]
+    return table
+
+
+class ReferenceQuiz:
+    """Multiple-choice options for a deck, from a precomputed neighbor table."""
+
+    __slots__ = ("locations", "neighbors")
+
+    def __init__(self, locations, texts=(), k: int = NEIGHBORS, neighbors=None):
+        """Build the table from ``texts``, or use a precompiled ``neighbors`` array."""
+        self.locations = tuple(locations)
+        self.neighbors = neighbor_table(texts, self.locations, k) if neighbors is None else neighbors
+
+    def options(self, card: int, seed=None, choices: int = CHOICES) -> list[int]:
+        """``card`` plus ``choices - 1`` look-alike cards, in a shuffled order.
+
+        Distractors are drawn from the card's nearest neighbors, so the same
+        card does not always show the same decoys; ``seed`` makes the draw
+        repeatable (the study's order code).
+        """
+        rng = random.Random(f"{seed}:{card}")
+        pool, seen = [], {self.locations[card]}
+        for other in self.neighbors[card].tolist():
+            if other >= 0 and self.locations[other] not in seen:
+                seen.add(self.locations[other])
+                pool.append(other)
+        options = [card, *rng.sample(pool[:2 * (choices - 1)], min(choices - 1, len(pool)))]
+        rng.shuffle(options)
+        return options
@@ -0,0 +1,156 @@
+"""Live group rooms for the ordering game.
+
+A host opens a room and starts rounds. Every round has one shared shuffle
+seed, so all players see the same button order. Players report progress
+after each move. The room keeps the latest progress per player and
+publishes a small event on the shared ``EventBus``. Scoreboards drain their
+own bounded subscription instead of re-reading every player on a timer.
+Every change bumps ``version``, and ``snapshot`` sorts the room at most
+once per version, so a burst of moves costs one sort shared by all
+sessions rather than one sort per session.
+"""
+import random
+import threading
+import time
+
+from event_bus import EventBus, Subscription
+
+ROOM_CODE_DIGITS = 4
+ROOM_IDLE_SECONDS = 6 * 60 * 60
+STATE_ORDER = {"clear": 0, "playing": 1, "over": 2, "waiting": 3}
+
+
+class NicknameTaken(ValueError):
+    """Raised when a player joins with a nickname already in the room."""
+
+
+class PlayerProgress:
+    __slots__ = ("name", "current", "wrong_count", "state", "elapsed")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.current = 0
+        self.wrong_count = 0
+        self.state = "waiting"
+        self.elapsed = 0.0
+
+    def as_dict(self) -> dict:
+        return {"name": self.name, "current": self.current, "wrong_count": self.wrong_count,
+                "state": self.state, "elapsed": self.elapsed}
+
+
+class Room:
+    """One host's room; all methods are safe to call from any session thread."""
+
+    def __init__(self, code: str, host: str, words, dataset_name: str, mode: str,
+                 max_wrong: int, bus: EventBus):
+        self.code = code
+        self.host = host
+        self.words = tuple(words)
+        self.dataset_name = dataset_name
+        self.mode = mode
+        self.max_wrong = max_wrong
+        self.seed = None
+        self.round = 0
+        self.started_at = None
+        self.touched_at = time.time()
+        self._players: dict[str, PlayerProgress] = {}
+        self._lock = threading.Lock()
+        self.version = 0
+        self._snapshot = (-1, ())
+        self._bus = bus
+
+    @property
+    def topic(self) -> str:
+        return f"room/{self.code}"
+
+    def subscribe(self) -> Subscription:
+        return self._bus.subscribe(self.topic)
+
+    def unsubscribe(self, sub: Subscription):
+        self._bus.unsubscribe(sub)
+
+    def join(self, name: str):
+        """Add player ``name``; raises ``NicknameTaken`` if someone already uses it."""
+        with self._lock:
+            if name in self._players:
+                raise NicknameTaken(name)
+            self._players[name] = PlayerProgress(name)
+            self.touched_at = time.time()
+            self.version += 1
+        self._bus.publish(self.topic, {"type": "join", "name": name})
+
+    def start_round(self) -> int:
+        """Start a new round with a fresh shared seed; returns the round number."""
+        with self._lock:
+            self.seed = random.randrange(2 ** 32)
+            self.round += 1
+            self.started_at = time.time()
+            self.touched_at = self.started_at
+            for player in self._players.values():
+                player.current = player.wrong_count = 0
+                player.elapsed = 0.0
+                player.state = "playing"
+            self.version += 1
+            round_no = self.round
+        self._bus.publish(self.topic, {"type": "start", "round": round_no})
+        return round_no
+
+    def report(self, name: str, current: int, wrong_count: int, state: str, elapsed: float):
+        with self._lock:
+            player = self._players.setdefault(name, PlayerProgress(name))
+            player.current = current
+            player.wrong_count = wrong_count
+            player.state = state
+            player.elapsed = elapsed
+            self.touched_at = time.time()
+            self.version += 1
+        self._bus.publish(self.topic, {"type": "progress", "name": name, "current": current,
+                                       "wrong_count": wrong_count, "state": state})
+
+    def snapshot(self) -> tuple[int, tuple[dict, ...]]:
+        """``(version, sorted scoreboard)``; re-sorted only when the room changed."""
+        with self._lock:
+            if self._snapshot[0] != self.version:
+                players = [p.as_dict() for p in self._players.values()]
+                players.sort(key=lambda p: (STATE_ORDER[p["state"]], -p["current"], p["wrong_count"],
+                                            p["elapsed"]))
+                self._snapshot = (self.version, tuple(players))
+            return self._snapshot
+
+    def scoreboard(self) -> list[dict]:
+        return list(self.snapshot()[1])
+
+
+class RoomRegistry:
+    """Process-wide room directory sharing one event bus."""
+
+    def __init__(self, bus: EventBus | None = None):
+        self.bus = bus or EventBus()
+        self._rooms: dict[str, Room] = {}
+        self._lock = threading.Lock()
+
+    def create(self, host: str, words, dataset_name: str, mode: str, max_wrong: int) -> Room:
+        self.prune()
+        with self._lock:
+            while True:
+                code = f"{random.randrange(10 ** ROOM_CODE_DIGITS):0{ROOM_CODE_DIGITS}d}"
+                if code not in self._rooms:
+                    break
+            room = Room(code, host, words, dataset_name, mode, max_wrong, self.bus)
+            self._rooms[code] = room
+        return room
+
+    def get(self, code: str) -> Room | None:
+        return self._rooms.get(code.strip())
+
+    def close(self, code: str):
+        with self._lock:
+            room = self._rooms.pop(code, None)
+        if room is not None:
+            self.bus.close_topic(room.topic)
+
+    def prune(self, max_idle: float = ROOM_IDLE_SECONDS):
+        cutoff = time.time() - max_idle
+        for code in [c for c, r in list(self._rooms.items()) if r.touched_at < cutoff]:
+            self.close(code)
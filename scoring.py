@@ -0,0 +1,60 @@
+"""Dictation scoring shared by the app and the benchmarks."""
+from normalize import answer_key, normalize_text
+
+
+def split_words(text: str) -> list[str]:
+    """Words of ``text`` as dictation scores them (position ``i`` is word ``i``)."""
+    return [w for w in normalize_text(text).split() if w]
+
+
+def compute_word_match(user_text: str, answer_text: str) -> dict:
+    """Compare user input with answer text word by word.
+
+    Words are compared by ``answer_key``, so IME artifacts (NFD, full-width
+    forms, stray jamo) and alias spellings such as 요한1서/요한일서 match.
+    """
+    answer_words = split_words(answer_text)
+    user_words = split_words(user_text)
+
+    if not answer_words:
+        return {"score": 100, "total_words": 0, "matched_words": 0,
+                "answer_words": [], "user_words": [], "word_results": []}
+
+    matched = 0
+    word_results = []
+
+    for i, aw in enumerate(answer_words):
+        if i < len(user_words):
+            uw = user_words[i]
+            is_match = answer_key(aw) == answer_key(uw)
+            if is_match:
+                matched += 1
+            word_results.append({
+                "answer": aw,
+                "user": uw,
+                "match": is_match
+            })
+        else:
+            word_results.append({
+                "answer": aw,
+                "user": "",
+                "match": False
+            })
+
+    for i in range(len(answer_words), len(user_words)):
+        word_results.append({
+            "answer": "",
+            "user": user_words[i],
+            "match": False
+        })
+
+    score = round((matched / len(answer_words)) * 100) if answer_words else 0
+
+    return {
+        "score": score,
+        "total_words": len(answer_words),
+        "matched_words": matched,
+        "answer_words": answer_words,
+        "user_words": user_words,
+        "word_results": word_results,
+    }
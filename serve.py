@@ -0,0 +1,141 @@
+"""Run several app workers behind a local nginx reverse proxy.
+
+    python serve.py --workers 4 --port 8501
+
+A single Streamlit process runs Python on one core. This script validates
+the decks and builds the precompiled artifacts (see ``precompile.py``),
+including the shared read-only store (see ``shared_store.py``). It then
+starts ``streamlit run app.py`` on ports ``port+1 .. port+N`` with
+``BANKI_SHARED_STORE`` pointing at that store, and writes an nginx config
+that pins each browser to one worker with a cookie, so a session's
+websocket always reaches the process holding its state. nginx runs in the foreground when it is on ``PATH``; otherwise the
+config path is printed for an existing proxy to include.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from precompile import build_artifacts, prune_artifacts, validate_decks
+from storage import BASE_DIR, STATE_DIR
+
+NGINX_DIR = os.path.join(STATE_DIR, "nginx")
+
+NGINX_TEMPLATE = """\
+daemon off;
+worker_processes 1;
+pid {prefix}/nginx.pid;
+error_log {prefix}/error.log warn;
+
+events {{
+    worker_connections 4096;
+}}
+
+http {{
+    access_log off;
+    client_body_temp_path {prefix}/tmp;
+    proxy_temp_path {prefix}/tmp;
+    fastcgi_temp_path {prefix}/tmp;
+    uwsgi_temp_path {prefix}/tmp;
+    scgi_temp_path {prefix}/tmp;
+
+    # Sticky sessions: the first response sets banki_route and every later
+    # request (including the websocket upgrade) hashes on it.
+    map $cookie_banki_route $banki_route {{
+        ""      $request_id;
+        default $cookie_banki_route;
+    }}
+
+    map $http_upgrade $connection_upgrade {{
+        default upgrade;
+        ""      close;
+    }}
+
+    upstream banki_workers {{
+        hash $banki_route consistent;
+{servers}
+    }}
+
+    server {{
+        listen {host}:{port};
+
+        location / {{
+            proxy_pass http://banki_workers;
+            proxy_http_version 1.1;
+            proxy_set_header Host $host;
+            proxy_set_header Upgrade $http_upgrade;
+            proxy_set_header Connection $connection_upgrade;
+            proxy_read_timeout 86400;
+            add_header Set-Cookie "banki_route=$banki_route; Path=/; HttpOnly; SameSite=Lax";
+        }}
+    }}
+}}
+"""
+
+
+def write_nginx_config(host: str, port: int, worker_ports: list[int]) -> str:
+    os.makedirs(os.path.join(NGINX_DIR, "tmp"), exist_ok=True)
+    servers = "\n".join(f"        server 127.0.0.1:{p};" for p in worker_ports)
+    config_path = os.path.join(NGINX_DIR, "nginx.conf")
+    with open(config_path, "w", encoding="utf-8") as f:
+        f.write(NGINX_TEMPLATE.format(prefix=NGINX_DIR, host=host, port=port, servers=servers))
+    return config_path
+
+
+def start_worker(worker_port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", os.path.join(BASE_DIR, "app.py"),
+            "--server.headless", "true",
+            "--server.address", "127.0.0.1",
+            "--server.port", str(worker_port),
+        ],
+        env=env,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run B-Anki workers behind nginx.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8501)
+    args = parser.parse_args(argv)
+
+    errors, _ = validate_decks()
+    if errors:
+        sys.exit("\n".join(f"error: {message}" for message in errors))
+    artifacts = build_artifacts()
+    prune_artifacts(3, artifacts)
+    store_path = os.path.join(artifacts, "store.bin")
+
+    env = dict(os.environ, BANKI_SHARED_STORE=store_path)
+    worker_ports = [args.port + 1 + i for i in range(args.workers)]
+    workers = [start_worker(p, env) for p in worker_ports]
+    config_path = write_nginx_config(args.host, args.port, worker_ports)
+
+    proxy = None
+    nginx = shutil.which("nginx")
+    if nginx:
+        proxy = subprocess.Popen([nginx, "-p", NGINX_DIR, "-c", config_path])
+        print(f"{args.workers} workers behind http://{args.host}:{args.port}")
+    else:
+        print(f"nginx not found; {args.workers} workers on ports {worker_ports}, config at {config_path}")
+
+    try:
+        while all(w.poll() is None for w in workers):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in [proxy, *workers]:
+            if process is not None and process.poll() is None:
+                process.terminate()
+        for process in [proxy, *workers]:
+            if process is not None:
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Read-only data shared by app workers through one memory-mapped file.
+
+``serve.py`` builds the store once before starting the workers. Each worker
+maps it read-only, so the OS page cache keeps a single copy of the verse
+decks, ordering datasets and book tables however many workers run. Nothing
+writes to the file after it is built, so readers need no locks.
+
+File layout::
+
+    b"BANKISTO" | u32 header length | JSON header | sections...
+
+Each section is a string list: ``count + 1`` little-endian u32 offsets
+followed by the UTF-8 blob they index into.
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+
+from loaders import ORDERING_REQUIRED_COLUMNS, ordering_words, read_csv_file
+from storage import DATA_DIR, STATE_DIR, atomic_write
+
+MAGIC = b"BANKISTO"
+STORE_PATH = os.environ.get("BANKI_SHARED_STORE", os.path.join(STATE_DIR, "shared", "store.bin"))
+
+
+class SharedStrings:
+    """Read-only sequence of strings decoded on access from a mapped section."""
+
+    __slots__ = ("_buf", "_offsets", "_blob", "_count")
+
+    def __init__(self, buf, offset: int, count: int):
+        self._buf = buf
+        self._offsets = offset
+        self._blob = offset + 4 * (count + 1)
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        start, end = struct.unpack_from("<2I", self._buf, self._offsets + 4 * i)
+        return self._buf[self._blob + start:self._blob + end].decode("utf-8")
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def tolist(self) -> list[str]:
+        return list(self)
+
+
+class SharedTable:
+    """Read-only str -> str mapping over sorted key/value sections."""
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, keys: SharedStrings, values: SharedStrings):
+        self._keys = keys
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get(self, key: str, default=None):
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._values[i]
+        return default
+
+    def __getitem__(self, key: str) -> str:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+class SharedStore:
+    """A mapped store file; see the module docstring for the layout."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a B-Anki shared store")
+        (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        self.header = json.loads(self._mm[header_start:header_start + header_len].decode("utf-8"))
+        self._data_start = header_start + header_len
+        self.path = path
+
+    def strings(self, name: str) -> SharedStrings | None:
+        entry = self.header["sections"].get(name)
+        if entry is None:
+            return None
+        offset, count = entry
+        return SharedStrings(self._mm, self._data_start + offset, count)
+
+    def table(self, name: str) -> SharedTable | None:
+        keys = self.strings(f"table/{name}/keys")
+        if keys is None:
+            return None
+        return SharedTable(keys, self.strings(f"table/{name}/values"))
+
+    def is_current(self, file_path: str) -> bool:
+        """True when ``file_path`` is in the store and unchanged since the build."""
+        mtime = self.header["mtimes"].get(os.path.basename(file_path))
+        return mtime is not None and os.path.exists(file_path) and os.path.getmtime(file_path) == mtime
+
+    def deck_columns(self, file_name: str) -> dict[str, SharedStrings] | None:
+        columns = self.header["decks"].get(file_name)
+        if columns is None:
+            return None
+        return {col: self.strings(f"deck/{file_name}/{col}") for col in columns}
+
+    def ordering_words(self, file_name: str) -> SharedStrings | None:
+        return self.strings(f"ordering/{file_name}")
+
+
+def _pack_strings(strings) -> bytes:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(encoded)
+
+
+def build_shared_store(path: str = STORE_PATH, data_dir: str = DATA_DIR) -> str:
+    """Pack every CSV in ``data_dir`` plus the book tables into ``path``."""
+    from bible_books import BOOK_TABLES
+
+    header = {"decks": {}, "ordering": [], "tables": sorted(BOOK_TABLES), "mtimes": {}}
+    sections = []
+
+    for file_name in sorted(os.listdir(data_dir)):
+        if not file_name.endswith(".csv"):
+            continue
+        file_path = os.path.join(data_dir, file_name)
+        header["mtimes"][file_name] = os.path.getmtime(file_path)
+        if file_name.startswith("bible_books_"):
+            columns = read_csv_file(file_path, ORDERING_REQUIRED_COLUMNS)
+            header["ordering"].append(file_name)
+            sections.append((f"ordering/{file_name}", ordering_words(columns)))
+        else:
+            columns = read_csv_file(file_path)
+            header["decks"][file_name] = list(columns)
+            for col, values in columns.items():
+                sections.append((f"deck/{file_name}/{col}", values))
+
+    for name, table in BOOK_TABLES.items():
+        keys = sorted(table)
+        sections.append((f"table/{name}/keys", keys))
+        sections.append((f"table/{name}/values", [table[k] for k in keys]))
+
+    blobs = []
+    offset = 0
+    header["sections"] = {}
+    for name, strings in sections:
+        blob = _pack_strings(strings)
+        header["sections"][name] = [offset, len(strings)]
+        blobs.append(blob)
+        offset += len(blob)
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    atomic_write(path, MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes + b"".join(blobs))
+    return path
+
+
+def open_shared_store(path: str = STORE_PATH) -> SharedStore | None:
+    """Map the store at ``path``, or return None when it has not been built."""
+    if not os.path.exists(path):
+        return None
+    return SharedStore(path)
@@ -0,0 +1,108 @@
+"""Local speech-to-text for spoken recitation.
+
+Recordings are transcribed on the server's CPU with ``faster-whisper``
+(optional; ``pip install faster-whisper``), so no audio leaves the
+machine. One ``Transcriber`` per process owns the model and a small
+thread pool. Submissions go through a bounded queue: when every worker is
+busy and the queue is full, ``submit`` raises ``TranscriberBusy`` right
+away instead of letting script threads pile up behind the model.
+
+The model is only ever loaded from a local directory (never downloaded
+while the app runs). Fetch it once while setting up the server::
+
+    python speech.py download small
+
+Configuration (environment):
+
+* ``BANKI_STT_MODEL`` - directory of a CTranslate2 whisper model (default
+  ``STATE_DIR/models/faster-whisper-small``; recording is disabled while
+  it does not exist, and an empty value disables it outright)
+* ``BANKI_STT_WORKERS`` - concurrent transcriptions (default 2)
+* ``BANKI_STT_QUEUE`` - waiting recordings allowed beyond the workers
+  (default 8)
+"""
+import argparse
+import importlib.util
+import io
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from storage import STATE_DIR
+
+MODELS_DIR = os.path.join(STATE_DIR, "models")
+STT_MODEL = os.environ.get("BANKI_STT_MODEL", os.path.join(MODELS_DIR, "faster-whisper-small"))
+STT_WORKERS = int(os.environ.get("BANKI_STT_WORKERS", "2"))
+STT_QUEUE = int(os.environ.get("BANKI_STT_QUEUE", "8"))
+STT_LANGUAGES = {"verse_krv": "ko", "verse_niv": "en"}
+
+
+class TranscriberBusy(RuntimeError):
+    """Raised when the transcription queue is full."""
+
+
+def stt_available() -> bool:
+    """True when faster-whisper is installed and the configured model is on disk."""
+    return (bool(STT_MODEL) and os.path.isfile(os.path.join(STT_MODEL, "model.bin"))
+            and importlib.util.find_spec("faster_whisper") is not None)
+
+
+class Transcriber:
+    """Process-wide speech-to-text worker pool with a bounded request queue."""
+
+    def __init__(self, model: str = STT_MODEL, workers: int = STT_WORKERS, queue_size: int = STT_QUEUE):
+        self.model_name = model
+        self.workers = workers
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="banki-stt")
+
+    def _load_model(self):
+        with self._model_lock:
+            if self._model is None:
+                from faster_whisper import WhisperModel
+
+                self._model = WhisperModel(self.model_name, device="cpu", compute_type="int8",
+                                           num_workers=self.workers, local_files_only=True)
+        return self._model
+
+    def warm_up(self) -> Future:
+        """Load the model in the pool so the first recording does not wait for it."""
+        return self._pool.submit(self._load_model)
+
+    def _transcribe(self, audio: bytes, language: str) -> str:
+        try:
+            segments, _ = self._load_model().transcribe(
+                io.BytesIO(audio), language=language, beam_size=1, vad_filter=True,
+            )
+            return " ".join(segment.text.strip() for segment in segments).strip()
+        finally:
+            self._slots.release()
+
+    def submit(self, audio: bytes, language: str = "ko") -> Future:
+        """Queue a recording (any format PyAV decodes) and return a Future of the text."""
+        if not self._slots.acquire(blocking=False):
+            raise TranscriberBusy("transcription queue is full")
+        try:
+            return self._pool.submit(self._transcribe, audio, language)
+        except BaseException:
+            self._slots.release()
+            raise
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the local speech-to-text model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    download = sub.add_parser("download", help="fetch a whisper model into BANKI_STT_MODEL (needs network)")
+    download.add_argument("size", nargs="?", default="small", help="model size, e.g. base, small, medium")
+    download.add_argument("-o", "--output", default=STT_MODEL, help="model directory")
+    args = parser.parse_args(argv)
+
+    from faster_whisper import download_model
+
+    print(download_model(args.size, output_dir=args.output))
+
+
+if __name__ == "__main__":
+    main()
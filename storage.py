@@ -0,0 +1,33 @@
+"""Local on-disk locations for caches and persisted state."""
+import hashlib
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+STATE_DIR = os.environ.get("BANKI_STATE_DIR", os.path.join(BASE_DIR, ".banki"))
+CACHE_DIR = os.path.join(STATE_DIR, "cache")
+
+
+def content_hash(*parts) -> str:
+    """Stable hex digest over the string form of ``parts``."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def cache_path(namespace: str, key: str, ext: str) -> str:
+    """Return ``CACHE_DIR/namespace/key.ext``, creating the directory."""
+    directory = os.path.join(CACHE_DIR, namespace)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{key}.{ext}")
+
+
+def atomic_write(path: str, data: bytes):
+    """Write ``data`` to ``path`` so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,452 @@
+"""Compact verse-study progress, kept server-side and spilled when idle.
+
+A study session used to live in ``st.session_state`` as lists and sets of
+boxed ints, held until Streamlit dropped the tab. ``StudySession`` keeps
+the card order as a seeded lazy ``Permutation`` (a seed and a cursor),
+the undo/redo history in ``StudyHistory`` arrays, completed/skipped cards
+in ``CardSet`` bitsets and per-card results in ``CardResults`` arrays, so a
+1,000-card deck costs a few KB instead of a few hundred.
+
+``StudySessionStore`` holds the live sessions of the process by token. A
+daemon thread spills any session idle for ``SESSION_IDLE_SECONDS`` to
+``STATE_DIR/sessions/<token>.pickle`` and drops it from memory. The next
+``get`` loads it back, so a tab left open overnight (or reopened with the
+same ``?s=<token>`` URL) resumes where it stopped.
+"""
+import bisect
+import os
+import pickle
+import random
+import secrets
+import sys
+import threading
+import time
+from array import array
+
+from permutation import Permutation
+from storage import STATE_DIR, atomic_write
+
+SESSION_DIR = os.path.join(STATE_DIR, "sessions")
+SESSION_IDLE_SECONDS = float(os.environ.get("BANKI_SESSION_IDLE", "600"))
+SESSION_RETENTION_SECONDS = 14 * 24 * 60 * 60
+EVICT_INTERVAL_SECONDS = 60
+ORDER_CODE_DIGITS = 6
+
+
+def new_order_code() -> int:
+    """Random shuffle seed short enough for a host to read out to a group."""
+    return random.randrange(10 ** ORDER_CODE_DIGITS)
+
+
+class CardSet:
+    """Set of card indices stored as a bitset (one bit per card)."""
+
+    __slots__ = ("_bits", "_count")
+
+    def __init__(self, size: int, cards=()):
+        self._bits = bytearray((size + 7) // 8)
+        self._count = 0
+        for card in cards:
+            self.add(card)
+
+    def add(self, card: int):
+        byte, bit = divmod(card, 8)
+        if not self._bits[byte] >> bit & 1:
+            self._bits[byte] |= 1 << bit
+            self._count += 1
+
+    def discard(self, card: int):
+        byte, bit = divmod(card, 8)
+        if byte < len(self._bits) and self._bits[byte] >> bit & 1:
+            self._bits[byte] &= ~(1 << bit) & 0xFF
+            self._count -= 1
+
+    def clear(self):
+        self._bits = bytearray(len(self._bits))
+        self._count = 0
+
+    def __contains__(self, card: int) -> bool:
+        byte, bit = divmod(card, 8)
+        return byte < len(self._bits) and bool(self._bits[byte] >> bit & 1)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        for byte, value in enumerate(self._bits):
+            while value:
+                low = value & -value
+                yield byte * 8 + low.bit_length() - 1
+                value ^= low
+
+    def __sub__(self, other: "CardSet") -> "CardSet":
+        result = CardSet(0)
+        result._bits = bytearray(a & ~b & 0xFF for a, b in zip(self._bits, other._bits))
+        result._bits += self._bits[len(other._bits):]
+        result._count = sum(bin(value).count("1") for value in result._bits)
+        return result
+
+
+class CardOrder:
+    """Study order of a deck (or of a retry subset) without a stored list.
+
+    ``cards`` is None for the whole deck, or the sorted cards of a retry
+    pass; shuffled orders go through a ``Permutation`` keyed by the seed.
+    """
+
+    __slots__ = ("cards", "_perm", "_size")
+
+    def __init__(self, size: int, seed: int | None, *context, cards=None):
+        self.cards = cards
+        self._size = size if cards is None else len(cards)
+        self._perm = None if seed is None else Permutation(self._size, seed, *context)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        position = index if self._perm is None else self._perm[index]
+        return position if self.cards is None else self.cards[position]
+
+    def index(self, card: int) -> int:
+        position = card
+        if self.cards is not None:
+            position = bisect.bisect_left(self.cards, card)
+            if position == len(self.cards) or self.cards[position] != card:
+                raise ValueError(card)
+        elif not 0 <= card < self._size:
+            raise ValueError(card)
+        return position if self._perm is None else self._perm.index(position)
+
+
+class CardResults:
+    """``{card: result}`` mapping for a deck, stored in flat arrays.
+
+    A result is ``{"completed": True}`` or a dictation score
+    ``{"score", "matched", "total"}``; dicts are built only when read.
+    """
+
+    __slots__ = ("_kind", "_score", "_matched", "_total", "_count")
+
+    _DONE, _SCORED = 1, 2
+
+    def __init__(self, size: int):
+        self._kind = bytearray(size)
+        self._score = bytearray(size)
+        self._matched = array("H", bytes(2 * size))
+        self._total = array("H", bytes(2 * size))
+        self._count = 0
+
+    def __setitem__(self, card: int, result: dict):
+        if not self._kind[card]:
+            self._count += 1
+        if "score" in result:
+            self._kind[card] = self._SCORED
+            self._score[card] = result["score"]
+            self._matched[card] = result["matched"]
+            self._total[card] = result["total"]
+        else:
+            self._kind[card] = self._DONE
+
+    def __getitem__(self, card: int) -> dict:
+        kind = self._kind[card]
+        if kind == self._SCORED:
+            return {"score": self._score[card], "matched": self._matched[card], "total": self._total[card]}
+        if kind == self._DONE:
+            return {"completed": True}
+        raise KeyError(card)
+
+    def __delitem__(self, card: int):
+        if not self._kind[card]:
+            raise KeyError(card)
+        self._kind[card] = 0
+        self._count -= 1
+
+    def __contains__(self, card: int) -> bool:
+        return 0 <= card < len(self._kind) and bool(self._kind[card])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        return (card for card, kind in enumerate(self._kind) if kind)
+
+    def items(self):
+        return ((card, self[card]) for card in self)
+
+    def values(self):
+        return (self[card] for card in self)
+
+
+class StudyHistory:
+    """Undo and redo stacks of study moves (skip or complete a card).
+
+    A step is the card, the cursor before the move and the card's prior
+    completed/skipped flags, kept in flat arrays. The card's prior result
+    and the view to restore (an opaque tuple from the app: phase, typed
+    text) are stored by step index only when there is one. Undo moves the
+    top step onto ``redo``; a new move clears it.
+    """
+
+    __slots__ = ("cards", "positions", "flags", "extras", "redo")
+
+    def __init__(self):
+        self.cards = array("I")
+        self.positions = array("I")
+        self.flags = bytearray()
+        self.extras: dict[int, tuple] = {}
+        self.redo: list[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def push(self, card: int, position: int, flags: int, result: dict | None, view):
+        if result is not None or view is not None:
+            self.extras[len(self.cards)] = (result, view)
+        self.cards.append(card)
+        self.positions.append(position)
+        self.flags.append(flags)
+
+    def pop(self) -> tuple:
+        """Remove the top step; returns (card, position, flags, result, view)."""
+        result, view = self.extras.pop(len(self.cards) - 1, (None, None))
+        return self.cards.pop(), self.positions.pop(), self.flags.pop(), result, view
+
+
+class StudySession:
+    """One learner's progress through a deck."""
+
+    __slots__ = ("token", "file_name", "verse_cols", "app_mode", "mode", "user_name", "shuffle",
+                 "seed", "order", "current_idx", "completed", "skipped", "history", "mode_results",
+                 "all_done", "touched_at", "deck_version", "size")
+
+    def __init__(self, token: str, file_name: str, verse_cols: tuple, app_mode: str, mode: str,
+                 user_name: str, shuffle: bool, size: int, seed: int | None = None,
+                 deck_version: str | None = None):
+        self.token = token
+        self.file_name = file_name
+        self.verse_cols = tuple(verse_cols)
+        self.app_mode = app_mode
+        self.mode = mode
+        self.user_name = user_name
+        self.shuffle = shuffle
+        # Same seed + same deck = same order, so a group can share one code.
+        self.seed = (new_order_code() if seed is None else seed) if shuffle else None
+        self.order = CardOrder(size, self.seed, file_name)
+        self.current_idx = 0
+        self.completed = CardSet(size)
+        self.skipped = CardSet(size)
+        self.history = StudyHistory()
+        self.mode_results = CardResults(size)
+        self.all_done = False
+        self.touched_at = time.time()
+        # Card positions below are valid for this version of the deck (see verse_ids.py).
+        self.deck_version = deck_version
+        self.size = size
+
+    _COMPLETED, _SKIPPED = 1, 2
+
+    def skip(self, card: int, view=None):
+        """Skip ``card`` and move on; ``view`` is what undo should show again."""
+        self._move(card, None, view)
+
+    def complete(self, card: int, result: dict, view=None):
+        """Record ``result`` for ``card`` and move on."""
+        self._move(card, result, view)
+
+    def _move(self, card: int, result: dict | None, view):
+        self.history.push(card, self.current_idx, *self._state(card), view)
+        self.history.redo.clear()
+        self._apply(card, self.current_idx, result)
+
+    def _state(self, card: int) -> tuple[int, dict | None]:
+        flags = (self._COMPLETED if card in self.completed else 0) | (self._SKIPPED if card in self.skipped else 0)
+        return flags, self.mode_results[card] if card in self.mode_results else None
+
+    def _apply(self, card: int, position: int, result: dict | None):
+        if result is None:
+            self.skipped.add(card)
+        else:
+            self.completed.add(card)
+            self.skipped.discard(card)
+            self.mode_results[card] = result
+        self.current_idx = position + 1
+
+    def undo(self, view=None):
+        """Take back the last move; returns the view saved with it (or None).
+
+        ``view`` is what the learner sees now, restored by a later ``redo``.
+        """
+        if not self.history:
+            return None
+        card, position, flags, prior, saved_view = self.history.pop()
+        result = self.mode_results[card] if card in self.mode_results else None
+        redo_result = result if card in self.completed else None
+        self.history.redo.append((card, position, redo_result, saved_view, view))
+        for cards, flag in ((self.completed, self._COMPLETED), (self.skipped, self._SKIPPED)):
+            if flags & flag:
+                cards.add(card)
+            else:
+                cards.discard(card)
+        if prior is not None:
+            self.mode_results[card] = prior
+        elif card in self.mode_results:
+            del self.mode_results[card]
+        self.current_idx = position
+        return saved_view
+
+    def redo(self):
+        """Replay the last undone move; returns the view saved by ``undo`` (or None)."""
+        if not self.history.redo:
+            return None
+        card, position, result, saved_view, view = self.history.redo.pop()
+        self.history.push(card, position, *self._state(card), saved_view)
+        self._apply(card, position, result)
+        return view
+
+    def retry_skipped(self):
+        """Start a pass over the skipped, not yet completed cards."""
+        cards = array("I", self.skipped - self.completed)
+        self.order = CardOrder(len(cards), self.seed, self.file_name, "retry", cards=cards)
+        self.current_idx = 0
+        self.skipped.clear()
+        # Cards of the previous pass are not in the new order.
+        self.history = StudyHistory()
+
+    def remap(self, mapping, size: int, deck_version: str):
+        """Move progress onto a changed deck of ``size`` cards.
+
+        ``mapping[old_card]`` is the card's new position, or -1 when its verse
+        was removed or edited (its progress is dropped). The pass restarts
+        from the top of the new order; completed cards are skipped there.
+        """
+        def moved(cards):
+            return [mapping[card] for card in cards if card < len(mapping) and mapping[card] >= 0]
+
+        self.completed = CardSet(size, moved(self.completed))
+        self.skipped = CardSet(size, moved(self.skipped))
+        results = CardResults(size)
+        for card, result in self.mode_results.items():
+            if card < len(mapping) and mapping[card] >= 0:
+                results[mapping[card]] = result
+        self.mode_results = results
+        if self.order.cards is None:
+            self.order = CardOrder(size, self.seed, self.file_name)
+        else:
+            cards = array("I", sorted(moved(self.order.cards)))
+            self.order = CardOrder(len(cards), self.seed, self.file_name, "retry", cards=cards)
+        self.current_idx = 0
+        # Undo steps point at old positions.
+        self.history = StudyHistory()
+        self.deck_version = deck_version
+        self.size = size
+
+    def nbytes(self) -> int:
+        """Deep size of this session's state in bytes."""
+        return deep_sizeof(self)
+
+
+def deep_sizeof(obj, seen=None) -> int:
+    """``sys.getsizeof`` summed over containers, slots and their contents."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, name), seen)
+                    for name in obj.__slots__ if hasattr(obj, name))
+    return size
+
+
+class StudySessionStore:
+    """Process-wide live study sessions by token, with idle spilling to disk."""
+
+    def __init__(self, directory: str = SESSION_DIR, idle_seconds: float = SESSION_IDLE_SECONDS):
+        self.directory = directory
+        self.idle_seconds = idle_seconds
+        self._live: dict[str, StudySession] = {}
+        self._lock = threading.Lock()
+        self._evictor = None
+
+    def _path(self, token: str) -> str:
+        return os.path.join(self.directory, f"{token}.pickle")
+
+    def create(self, *args, **kwargs) -> StudySession:
+        session = StudySession(secrets.token_urlsafe(12), *args, **kwargs)
+        with self._lock:
+            self._live[session.token] = session
+        return session
+
+    def get(self, token: str | None) -> StudySession | None:
+        """Return the live session for ``token``, loading it back if it was spilled."""
+        if not token or not token.replace("-", "").replace("_", "").isalnum():
+            return None
+        with self._lock:
+            session = self._live.get(token)
+            if session is None:
+                try:
+                    with open(self._path(token), "rb") as f:
+                        session = pickle.load(f)
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    return None
+                self._live[token] = session
+            session.touched_at = time.time()
+        return session
+
+    def discard(self, token: str | None):
+        with self._lock:
+            self._live.pop(token, None)
+        if token:
+            try:
+                os.remove(self._path(token))
+            except OSError:
+                pass
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Spill sessions idle longer than ``idle_seconds``; returns how many."""
+        now = time.time() if now is None else now
+        with self._lock:
+            idle = [s for s in self._live.values() if now - s.touched_at > self.idle_seconds]
+            for session in idle:
+                atomic_write(self._path(session.token), pickle.dumps(session, pickle.HIGHEST_PROTOCOL))
+                del self._live[session.token]
+        return len(idle)
+
+    def prune_spilled(self, max_age: float = SESSION_RETENTION_SECONDS):
+        """Delete spilled sessions nobody resumed within ``max_age`` seconds."""
+        if not os.path.isdir(self.directory):
+            return
+        cutoff = time.time() - max_age
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def start_evictor(self, interval: float = EVICT_INTERVAL_SECONDS):
+        """Run ``evict_idle`` every ``interval`` seconds on a daemon thread."""
+        if self._evictor is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                self.evict_idle()
+                self.prune_spilled()
+
+        self._evictor = threading.Thread(target=run, name="banki-session-evictor", daemon=True)
+        self._evictor.start()
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions = list(self._live.values())
+        return {"live": len(sessions), "bytes": sum(s.nbytes() for s in sessions)}
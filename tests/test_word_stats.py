@@ -0,0 +1,42 @@
+"""Word-stat remaps across deck edits (run with ``python -m pytest``)."""
+import numpy as np
+
+from scoring import compute_word_match
+from verse_ids import verse_id
+from word_stats import ATTEMPTS, WordErrorStats
+
+JOHN = "하나님이 세상을 이처럼 사랑하사"
+JOHN_RESPACED = "하나님이세상을 이처럼 사랑하사"
+ROMANS = "모든 사람이 죄를 범하였으매"
+
+
+def test_spacing_edit_changes_verse_id():
+    assert verse_id("요 3:16", JOHN) != verse_id("요 3:16", JOHN_RESPACED)
+    assert verse_id("요 3:16", JOHN) == verse_id("요 3:16", f" {JOHN}  ")
+
+
+def test_spacing_edit_remaps_without_crashing(tmp_path):
+    texts = [JOHN, ROMANS]
+    stats = WordErrorStats("deck", texts, [verse_id("요 3:16", JOHN), verse_id("롬 3:23", ROMANS)], tmp_path)
+    stats.record(0, compute_word_match("하나님이", JOHN))
+    stats.record(1, compute_word_match("모든 사람이", ROMANS))
+    stats.flush()
+
+    # Respaced John 3:16, moved below Romans 3:23.
+    edited = [ROMANS, JOHN_RESPACED]
+    reloaded = WordErrorStats("deck", edited, [verse_id("롬 3:23", ROMANS), verse_id("요 3:16", JOHN_RESPACED)],
+                              tmp_path)
+    assert reloaded.counts(0)[ATTEMPTS].tolist() == [1, 1, 1, 1]
+    assert not reloaded.counts(1).any()
+
+
+def test_mismatched_word_count_under_same_id_starts_over(tmp_path):
+    # A file written under the older IDs, which ignored word spacing.
+    stats = WordErrorStats("deck", [JOHN, ROMANS], ["john", "romans"], tmp_path)
+    stats.record(0, compute_word_match(JOHN, JOHN))
+    stats.record(1, compute_word_match(ROMANS, ROMANS))
+    stats.flush()
+
+    reloaded = WordErrorStats("deck", [ROMANS, JOHN_RESPACED], ["romans", "john"], tmp_path)
+    assert np.array_equal(reloaded.counts(0)[ATTEMPTS], [1, 1, 1, 1])
+    assert not reloaded.counts(1).any()
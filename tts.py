@@ -0,0 +1,121 @@
+"""Offline text-to-speech for the 듣기 mode.
+
+Verses are synthesized locally with ``pyttsx3`` (optional;
+``pip install pyttsx3``, which drives espeak-ng on Linux and the system
+voices on Windows/macOS), so no text leaves the machine. Every file is
+cached under ``cache/tts/`` by a hash of (text, voice, rate). Repeat plays
+and other sessions on the same deck reuse the file, and Streamlit's media
+endpoint serves it with HTTP range support.
+
+A whole deck can be pre-generated ahead of a session::
+
+    python tts.py "data/kpccw 2026 성경암송.csv" --version verse_krv --workers 4
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from storage import cache_path, content_hash
+
+TTS_VOICES = {
+    "verse_krv": os.environ.get("BANKI_TTS_VOICE_KO", "ko"),
+    "verse_niv": os.environ.get("BANKI_TTS_VOICE_EN", "en"),
+}
+TTS_RATES = {"느리게": 120, "보통": 160, "빠르게": 200}
+DEFAULT_RATE = TTS_RATES["보통"]
+
+_engine = None
+_engine_lock = threading.Lock()
+_voice_ids: dict[str, str | None] = {}
+
+
+def tts_available() -> bool:
+    return importlib.util.find_spec("pyttsx3") is not None
+
+
+def _resolve_voice(engine, voice: str) -> str | None:
+    """Map a language code or voice name to an installed voice id."""
+    if voice not in _voice_ids:
+        wanted = voice.lower()
+        match = None
+        for v in engine.getProperty("voices"):
+            languages = [lang.decode(errors="ignore") if isinstance(lang, bytes) else str(lang)
+                         for lang in (v.languages or [])]
+            names = [v.id.lower(), (v.name or "").lower(), *(lang.lower() for lang in languages)]
+            if any(name == wanted or name.endswith("/" + wanted) or name.startswith(wanted + "_")
+                   or name.startswith(wanted + "-") for name in names):
+                match = v.id
+                break
+        _voice_ids[voice] = match
+    return _voice_ids[voice]
+
+
+def tts_cache_path(text: str, voice: str, rate: int = DEFAULT_RATE) -> str:
+    """Where ``synthesize_file`` caches this audio (it may not exist yet)."""
+    return cache_path("tts", content_hash("tts", text, voice, rate), "wav")
+
+
+def synthesize_file(text: str, voice: str, rate: int = DEFAULT_RATE) -> str:
+    """Return the cached WAV path for ``text``, synthesizing it on a miss."""
+    global _engine
+
+    path = tts_cache_path(text, voice, rate)
+    if os.path.exists(path):
+        return path
+
+    # pyttsx3 engines are not thread-safe; one synthesis at a time per process.
+    with _engine_lock:
+        if os.path.exists(path):
+            return path
+        if _engine is None:
+            import pyttsx3
+
+            _engine = pyttsx3.init()
+        voice_id = _resolve_voice(_engine, voice)
+        if voice_id:
+            _engine.setProperty("voice", voice_id)
+        _engine.setProperty("rate", rate)
+        tmp_path = f"{path}.{os.getpid()}.tmp.wav"
+        _engine.save_to_file(text, tmp_path)
+        _engine.runAndWait()
+        os.replace(tmp_path, path)
+    return path
+
+
+def _synthesize_entry(entry: tuple) -> str:
+    return synthesize_file(*entry)
+
+
+def pregenerate_deck(file_path: str, verse_col: str, rate: int = DEFAULT_RATE,
+                     max_workers: int | None = None) -> list[str]:
+    """Synthesize every verse of a deck in a process pool; returns the paths."""
+    from loaders import load_verse_deck
+
+    deck = load_verse_deck(file_path)
+    voice = TTS_VOICES[verse_col]
+    entries = [(text, voice, rate) for text in dict.fromkeys(deck.column(verse_col)) if text]
+    if not entries:
+        return []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_synthesize_entry, entries))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate verse audio for a deck.")
+    parser.add_argument("deck", help="verse CSV file")
+    parser.add_argument("--version", choices=TTS_VOICES, default="verse_krv")
+    parser.add_argument("--rate", type=int, default=DEFAULT_RATE, help="speaking rate (words per minute)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    paths = pregenerate_deck(args.deck, args.version, args.rate, args.workers)
+    for path in paths:
+        print(path)
+    print(f"{len(paths)} verses synthesized", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
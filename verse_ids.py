@@ -0,0 +1,108 @@
+"""Content-derived verse IDs, so progress survives edits to a deck.
+
+Study progress and per-word statistics index cards by row position. When a
+leader inserts, removes or reorders rows, positions shift. A verse ID is
+``answer_key(location)`` plus a short hash of the texts of the versions in
+use (a session's versions, or the one column a word count belongs to),
+taken word by word. It stays the same when the row moves and changes only
+when that verse's location, one of those texts or its word spacing does;
+fixing a typo in another language keeps it. A deck's ID list is hashed into a ``deck_version``, and every
+version seen is saved to ``STATE_DIR/deck_ids/<version>.json``. Holders of
+positional data (``StudySession``, ``WordErrorStats``) record the version
+they were built for. When a deck changes, ``remap_positions`` diffs the two
+ID lists and each holder moves its entries to the new positions. Entries
+of removed or edited verses are dropped; everything else is kept.
+"""
+import json
+import os
+import threading
+
+from normalize import answer_key
+from scoring import split_words
+from storage import STATE_DIR, atomic_write, content_hash
+
+DECK_IDS_DIR = os.path.join(STATE_DIR, "deck_ids")
+TEXT_COLUMNS = ("verse_krv", "verse_niv")
+
+
+def _word_layout(text: str) -> str:
+    # answer_key drops spaces, so hash the word split too: a spacing fix
+    # changes how many words (word-stat slots) the verse has.
+    return " ".join(answer_key(word) for word in split_words(text))
+
+
+def verse_id(location: str, *texts: str) -> str:
+    """``<normalized location>#<8 hex digits of the normalized words of the texts>``."""
+    return f"{answer_key(location)}#{content_hash(*(_word_layout(text) for text in texts))[:8]}"
+
+
+def deck_ids(columns) -> tuple[str, ...]:
+    """Verse IDs of a deck given as ``{column: values}`` (or a ``VerseDeck``).
+
+    Every text column present is hashed, so pass the deck projected to the
+    versions the IDs should depend on.
+    """
+    names = columns.columns if hasattr(columns, "columns") else tuple(columns)
+    get = columns.column if hasattr(columns, "column") else columns.__getitem__
+    texts = [get(name) for name in TEXT_COLUMNS if name in names]
+    return tuple(verse_id(location, *row_texts)
+                 for location, *row_texts in zip(get("location"), *texts))
+
+
+def deck_version(ids) -> str:
+    return content_hash("deck", *ids)[:16]
+
+
+def remap_positions(old_ids, new_ids) -> list[int]:
+    """``mapping[old_position]`` is the verse's new position, or -1 when it is gone.
+
+    Duplicate IDs (the same verse twice in a deck) pair up in order.
+    """
+    positions: dict[str, list[int]] = {}
+    for position, vid in enumerate(new_ids):
+        positions.setdefault(vid, []).append(position)
+    for queue in positions.values():
+        queue.reverse()
+    return [positions[vid].pop() if positions.get(vid) else -1 for vid in old_ids]
+
+
+class DeckIdRegistry:
+    """ID lists of every deck version seen, kept on disk for later remaps."""
+
+    def __init__(self, directory: str = DECK_IDS_DIR):
+        self.directory = directory
+        self._cache: dict[str, tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, version: str) -> str:
+        return os.path.join(self.directory, f"{version}.json")
+
+    def register(self, ids) -> str:
+        """Save ``ids`` (once) and return their deck version."""
+        ids = tuple(ids)
+        version = deck_version(ids)
+        with self._lock:
+            if version in self._cache:
+                return version
+            self._cache[version] = ids
+        if not os.path.exists(self._path(version)):
+            atomic_write(self._path(version), json.dumps(ids, ensure_ascii=False).encode("utf-8"))
+        return version
+
+    def ids(self, version: str) -> tuple[str, ...] | None:
+        with self._lock:
+            ids = self._cache.get(version)
+        if ids is None:
+            try:
+                with open(self._path(version), encoding="utf-8") as f:
+                    ids = tuple(json.load(f))
+            except (OSError, ValueError):
+                return None
+            with self._lock:
+                self._cache[version] = ids
+        return ids
+
+    def mapping(self, old_version: str, new_ids) -> list[int] | None:
+        """Old-to-new positions from ``old_version`` to ``new_ids`` (None if unknown)."""
+        old_ids = self.ids(old_version)
+        return None if old_ids is None else remap_positions(old_ids, new_ids)
@@ -0,0 +1,157 @@
+"""Substring and fuzzy search over every known verse, for the deck builder.
+
+The corpus is every verse deck in ``data/`` plus an optional local Bible in
+``BANKI_BIBLE_DIR`` (default ``.banki/bible/``; CSV files with the deck
+columns ``location,verse_krv,verse_niv``). Each verse is folded with
+``answer_key`` (spaces and punctuation dropped, case folded) and split into
+character bigrams. An inverted index maps each bigram to the sorted ids of
+the verses that contain it.
+
+* substring: intersect the postings of the query's bigrams, smallest first,
+  then confirm with ``in`` on the few survivors
+* fuzzy: keep verses sharing at least ``FUZZY_MIN_OVERLAP`` of the query's
+  bigrams (typos, missing particles). Such a verse must contain one of the
+  query's rarest ``n - needed + 1`` bigrams, so only those postings are read
+
+Tens of thousands of verses answer either in a few milliseconds.
+"""
+import csv
+import io
+import math
+import os
+import re
+from array import array
+
+from loaders import VERSE_REQUIRED_COLUMNS, read_csv_file
+from normalize import answer_key
+from storage import DATA_DIR, STATE_DIR
+
+BIBLE_DIR = os.environ.get("BANKI_BIBLE_DIR", os.path.join(STATE_DIR, "bible"))
+DECK_COLUMNS = ("location", "verse_krv", "verse_niv")
+FUZZY_MIN_OVERLAP = 0.7
+_NON_WORD = re.compile(r"\W")
+
+
+def search_key(text: str) -> str:
+    return _NON_WORD.sub("", answer_key(text))
+
+
+def _bigrams(key: str) -> set[str]:
+    return {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+def corpus_files(data_dir: str = DATA_DIR, bible_dir: str = BIBLE_DIR) -> list[str]:
+    """Verse CSVs to index: the decks first, then the local Bible if present."""
+    files = []
+    for directory in (data_dir, bible_dir):
+        if os.path.isdir(directory):
+            files += [os.path.join(directory, f) for f in sorted(os.listdir(directory))
+                      if f.endswith(".csv") and not f.startswith("bible_books_")]
+    return files
+
+
+class VerseIndex:
+    """Bigram inverted index over (location, verse_krv, verse_niv, source) records."""
+
+    __slots__ = ("records", "_keys", "_postings")
+
+    def __init__(self, records):
+        self.records = []
+        self._keys = []
+        postings: dict[str, list[int]] = {}
+        seen = set()
+        for record in records:
+            identity = record[:3]
+            if identity in seen:
+                continue
+            seen.add(identity)
+            doc_id = len(self.records)
+            self.records.append(record)
+            # Fields are joined with a separator no query can contain, so no
+            # bigram spans two fields.
+            key = "\x1f".join(search_key(field) for field in identity)
+            self._keys.append(key)
+            for gram in _bigrams(key):
+                postings.setdefault(gram, []).append(doc_id)
+        self._postings = {gram: array("I", ids) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def substring(self, query: str, limit: int = 50) -> list[int]:
+        key = search_key(query)
+        if not key:
+            return []
+        grams = _bigrams(key)
+        if not grams:
+            candidates = range(len(self._keys))
+        else:
+            lists = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+            if not lists[0]:
+                return []
+            candidates = set(lists[0])
+            for posting in lists[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    return []
+            candidates = sorted(candidates)
+        hits = []
+        for doc_id in candidates:
+            if key in self._keys[doc_id]:
+                hits.append(doc_id)
+                if len(hits) >= limit:
+                    break
+        return hits
+
+    def fuzzy(self, query: str, limit: int = 50) -> list[int]:
+        grams = sorted(_bigrams(search_key(query)), key=lambda gram: len(self._postings.get(gram, ())))
+        if not grams:
+            return []
+        needed = math.ceil(FUZZY_MIN_OVERLAP * len(grams))
+        candidates = set()
+        for gram in grams[:len(grams) - needed + 1]:
+            candidates.update(self._postings.get(gram, ()))
+        ranked = []
+        for doc_id in candidates:
+            key = self._keys[doc_id]
+            count = sum(gram in key for gram in grams)
+            if count >= needed:
+                ranked.append((-count, doc_id))
+        ranked.sort()
+        return [doc_id for _, doc_id in ranked[:limit]]
+
+    def search(self, query: str, limit: int = 50) -> list[int]:
+        """Exact substring hits first, then fuzzy matches not already listed."""
+        hits = self.substring(query, limit)
+        if len(hits) < limit:
+            found = set(hits)
+            hits += [doc_id for doc_id in self.fuzzy(query, limit) if doc_id not in found][:limit - len(hits)]
+        return hits
+
+
+def load_corpus_records(files) -> list[tuple[str, str, str, str]]:
+    records = []
+    for file_path in files:
+        try:
+            columns = read_csv_file(file_path, VERSE_REQUIRED_COLUMNS)
+        except (OSError, ValueError):
+            continue
+        source = os.path.splitext(os.path.basename(file_path))[0]
+        empty = ("",) * len(columns["location"])
+        records += zip(columns["location"], columns.get("verse_krv", empty),
+                       columns.get("verse_niv", empty), [source] * len(empty))
+    return records
+
+
+def build_verse_index(files=None) -> VerseIndex:
+    return VerseIndex(load_corpus_records(corpus_files() if files is None else files))
+
+
+def export_deck_csv(records) -> bytes:
+    """Encode records as a deck CSV (UTF-8 with BOM so Excel opens it)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(DECK_COLUMNS)
+    for record in records:
+        writer.writerow(record[:3])
+    return buf.getvalue().encode("utf-8-sig")
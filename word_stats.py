@@ -0,0 +1,206 @@
+"""Per-word dictation error counts, aggregated over every learner.
+
+Each (deck, version) gets a ``WordErrorStats``: the verses' words are laid
+out in one flat slot range (``offsets[card] + position``) and three
+``uint32`` NumPy arrays count, per slot, how often the word was dictated,
+left out (nothing typed at that position) and substituted (something else
+typed). A submission adds to in-memory deltas. A daemon thread flushes
+dirty decks every ``FLUSH_INTERVAL_SECONDS``, and once more at exit: it
+re-reads the file on disk (other workers flush into it too), adds the
+deltas and writes it back atomically, under an ``flock`` where the
+platform has one. Files live in ``STATE_DIR/word_stats/``, one per deck
+file and version, and carry the verse IDs (``verse_ids.py``) their slots
+were laid out for. When the deck is edited, the counts of unchanged verses
+move to their new positions; only removed or edited verses start over.
+
+The counts drive the leader heatmap and the weighted hint words.
+"""
+import atexit
+import io
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from scoring import split_words
+from storage import STATE_DIR, atomic_write, content_hash
+from verse_ids import remap_positions
+
+try:
+    import fcntl
+except ImportError:  # Windows: flushes from several workers may race.
+    fcntl = None
+
+WORD_STATS_DIR = os.path.join(STATE_DIR, "word_stats")
+FLUSH_INTERVAL_SECONDS = 30
+ATTEMPTS, MISSED, SUBSTITUTED = range(3)
+
+
+class WordErrorStats:
+    """Attempt / miss / substitution counters for every word of one deck version."""
+
+    __slots__ = ("path", "ids", "words", "offsets", "_base", "_delta", "_lock", "_dirty")
+
+    def __init__(self, name: str, texts, ids, directory: str = WORD_STATS_DIR):
+        """``name`` identifies the deck version (e.g. file and column); ``ids`` are its verse IDs."""
+        self.path = os.path.join(directory, f"{content_hash('word_stats', name)[:32]}.npz")
+        self.ids = tuple(ids)
+        self.words = [split_words(text) for text in texts]
+        self.offsets = np.zeros(len(self.words) + 1, dtype=np.int64)
+        np.cumsum([len(words) for words in self.words], out=self.offsets[1:])
+        self._delta = np.zeros((3, int(self.offsets[-1])), dtype=np.uint32)
+        self._base = self._read()
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def _read(self) -> np.ndarray:
+        """Counts on disk, moved onto this deck's layout if it was saved for another."""
+        counts = np.zeros_like(self._delta)
+        try:
+            with np.load(self.path) as saved:
+                saved_counts, saved_ids, saved_offsets = saved["counts"], saved["ids"].tolist(), saved["offsets"]
+        except (OSError, ValueError, KeyError):
+            return counts
+        if tuple(saved_ids) == self.ids and np.array_equal(saved_offsets, self.offsets):
+            return saved_counts if saved_counts.shape == counts.shape else counts
+        for old, new in enumerate(remap_positions(saved_ids, self.ids)):
+            if new < 0:
+                continue
+            start, end = self.offsets[new], self.offsets[new + 1]
+            saved_start, saved_end = saved_offsets[old], saved_offsets[old + 1]
+            # Same ID means the same words, but files saved under older IDs
+            # may disagree on the word count; those verses start over.
+            if end - start == saved_end - saved_start:
+                counts[:, start:end] = saved_counts[:, saved_start:saved_end]
+        return counts
+
+    def record(self, card: int, result: dict):
+        """Add one ``compute_word_match`` result for ``card``."""
+        total = min(result["total_words"], len(self.words[card]))
+        if not total:
+            return
+        word_results = result["word_results"][:total]
+        missed = np.fromiter((not wr["match"] and not wr["user"] for wr in word_results), bool, total)
+        substituted = np.fromiter((not wr["match"] and bool(wr["user"]) for wr in word_results), bool, total)
+        start = int(self.offsets[card])
+        with self._lock:
+            self._delta[ATTEMPTS, start:start + total] += 1
+            self._delta[MISSED, start:start + total] += missed
+            self._delta[SUBSTITUTED, start:start + total] += substituted
+            self._dirty = True
+
+    def counts(self, card: int) -> np.ndarray:
+        """``(3, words)`` counts of ``card``: attempts, missed, substituted."""
+        start, end = self.offsets[card], self.offsets[card + 1]
+        with self._lock:
+            return self._base[:, start:end] + self._delta[:, start:end]
+
+    def error_rates(self, card: int, prior: float = 1.0) -> np.ndarray:
+        """Smoothed share of attempts each word of ``card`` was gotten wrong.
+
+        ``prior`` pseudo-attempts with a 50% error rate keep a word seen once
+        from jumping to 0% or 100%.
+        """
+        attempts, missed, substituted = self.counts(card).astype(np.float64)
+        return (missed + substituted + prior / 2) / (attempts + prior)
+
+    def hint_word(self, card: int, rng=random) -> str:
+        """A word of ``card`` drawn with weight on the words people get wrong."""
+        words = self.words[card]
+        if not words:
+            return ""
+        rates = self.error_rates(card)
+        return rng.choices(words, weights=(rates * rates).tolist())[0]
+
+    def hardest(self, limit: int | None = None) -> list[tuple[int, float]]:
+        """``(card, mean error rate)`` of attempted verses, hardest first."""
+        rows = []
+        for card in range(len(self.words)):
+            attempts = self.counts(card)[ATTEMPTS]
+            if attempts.any():
+                rows.append((card, float(self.error_rates(card).mean())))
+        rows.sort(key=lambda row: -row[1])
+        return rows[:limit]
+
+    def flush(self):
+        """Merge pending deltas into the file shared by all workers and pick up theirs."""
+        with self._lock:
+            delta, dirty = self._delta, self._dirty
+            if dirty:
+                self._delta = np.zeros_like(delta)
+                self._dirty = False
+        if dirty:
+            with _file_lock(f"{self.path}.lock"):
+                merged = self._read() + delta
+                buf = io.BytesIO()
+                np.savez(buf, counts=merged, ids=np.array(self.ids, dtype=str), offsets=self.offsets)
+                atomic_write(self.path, buf.getvalue())
+        else:
+            merged = self._read()
+        with self._lock:
+            self._base = merged
+
+
+@contextmanager
+def _file_lock(path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class WordStatsRegistry:
+    """Process-wide ``WordErrorStats`` by deck version, flushed in the background."""
+
+    def __init__(self, directory: str = WORD_STATS_DIR):
+        self.directory = directory
+        self._stats: dict[str, WordErrorStats] = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def get(self, name: str, texts, ids) -> WordErrorStats:
+        """Stats of deck version ``name`` for the current ``texts``/``ids``.
+
+        When the deck changed since the last call, the old instance is
+        flushed and a new one picks its counts up by verse ID.
+        """
+        ids = tuple(ids)
+        with self._lock:
+            stats = self._stats.get(name)
+        if stats is not None and stats.ids == ids:
+            return stats
+        if stats is not None:
+            stats.flush()
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None or stats.ids != ids:
+                stats = self._stats[name] = WordErrorStats(name, texts, ids, self.directory)
+        return stats
+
+    def flush(self):
+        with self._lock:
+            stats = list(self._stats.values())
+        for item in stats:
+            item.flush()
+
+    def start_flusher(self, interval: float = FLUSH_INTERVAL_SECONDS):
+        """Run ``flush`` every ``interval`` seconds on a daemon thread, and once at exit."""
+        if self._flusher is not None:
+            return
+        atexit.register(self.flush)
+
+        def run():
+            while True:
+                time.sleep(interval)
+                self.flush()
+
+        self._flusher = threading.Thread(target=run, name="banki-word-stats-flusher", daemon=True)
+        self._flusher.start()